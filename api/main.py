@@ -1,17 +1,73 @@
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    StreamingResponse,
+)
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
 import uvicorn
 from datetime import datetime, timedelta
-import json
+import hashlib
+import importlib
 import os
+import sys
+import threading
+import time
 from typing import List, Optional
 from pydantic import BaseModel
 
 # Import our existing modules
-from scripts.main import fetch_top_repos, update_history, generate_chart
+from scripts.chart_render import chart_series, series_hash
+from scripts.database import STORAGE_BACKEND, database
+from scripts.event_stream import event_hub, snapshot_deltas
+from scripts.main import run_refresh
+from scripts.history_store import (
+    body_etag,
+    dumps_json,
+    encode_response,
+    history_store,
+)
+from scripts.jobs import job_manager, training_jobs
+from scripts.movers import movers_engine
+from scripts.rollups import DEFAULT_POINTS, rollup_store
+from scripts.shared_cache import shared_cache
+
+# Seconds SQL-backed responses stay in the shared cache (an ingest clears them)
+SNAPSHOT_CACHE_TTL = float(os.getenv("SNAPSHOT_CACHE_TTL", "60"))
+
+# Preload the ML stack in the background once the server is up (API_WARMUP=1)
+API_WARMUP = os.getenv("API_WARMUP", "0") == "1"
+
+
+def warm_up():
+    """Import the ML module and load the active model and snapshot index"""
+    start = time.perf_counter()
+    try:
+        predictor = get_predictor()
+        predictor.registry.get_active()
+        predictor.repository_index().items()
+        print(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if API_WARMUP:
+        # A thread, so startup completes and requests are served meanwhile
+        threading.Thread(target=warm_up, name="stellar-warmup", daemon=True).start()
+    if STORAGE_BACKEND == "database":
+        # One pool per worker process, opened after the fork
+        await database.connect()
+    yield
+    await database.close()
+
 
 app = FastAPI(
     title="StellarNexus API",
@@ -19,6 +75,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -31,9 +88,47 @@ app.add_middleware(
 )
 
 
+# Revalidate the chart every few minutes; unchanged files answer 304
+STATIC_CACHE_CONTROL = "public, max-age=300, must-revalidate"
+
+
+class CachedStaticFiles(StaticFiles):
+    """Static files served with content-hash ETags and a Cache-Control policy"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # path -> (mtime_ns, size, etag): files are hashed once per change
+        self._etags = {}
+
+    def _content_etag(self, full_path, stat_result) -> str:
+        cached = self._etags.get(full_path)
+        if cached and cached[:2] == (stat_result.st_mtime_ns, stat_result.st_size):
+            return cached[2]
+        with open(full_path, "rb") as f:
+            etag = f'"{hashlib.sha256(f.read()).hexdigest()[:32]}"'
+        self._etags[full_path] = (stat_result.st_mtime_ns, stat_result.st_size, etag)
+        return etag
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = FileResponse(
+            full_path, status_code=status_code, stat_result=stat_result
+        )
+        response.headers["etag"] = self._content_etag(full_path, stat_result)
+        response.headers["cache-control"] = STATIC_CACHE_CONTROL
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+# Mount static files (the rendered trend chart)
+if os.path.exists("docs/assets"):
+    app.mount("/static", CachedStaticFiles(directory="docs/assets"), name="static")
+
+
 # Pydantic models
 class Repository(BaseModel):
     name: str
+    full_name: Optional[str] = None
     stars: int
     rank: int
     url: str
@@ -45,13 +140,35 @@ class DailyData(BaseModel):
     repositories: List[Repository]
 
 
+class Gainer(Repository):
+    stars_gained: int
+
+
 class AnalyticsResponse(BaseModel):
     total_repositories: int
     avg_stars: float
-    top_gainer: Optional[Repository] = None
+    top_gainer: Optional[Gainer] = None
     last_updated: str
 
 
+class Mover(BaseModel):
+    name: str
+    stars: int
+    rank: int
+    star_delta: int
+    stars_per_day: Optional[float] = None
+    acceleration: Optional[float] = None
+    rank_change: int
+
+
+class MoversResponse(BaseModel):
+    window: str
+    as_of: Optional[str] = None
+    since: Optional[str] = None
+    sort: str
+    movers: List[Mover]
+
+
 # Routes
 @app.get("/", response_class=HTMLResponse)
 async def root():
@@ -95,63 +212,103 @@ async def root():
             async function loadData() {
                 try {
                     const response = await fetch('/api/analytics');
-                    const data = await response.json();
-
-                    document.getElementById('repo-count').textContent = data.total_repositories;
-                    document.getElementById('avg-stars').textContent = data.avg_stars.toLocaleString();
-                    document.getElementById('last-update').textContent = new Date(data.last_updated).toLocaleString();
+                    showAnalytics(await response.json());
                 } catch (error) {
                     console.error('Error loading data:', error);
                 }
             }
 
+            function showAnalytics(data) {
+                if (!data) return;
+                document.getElementById('repo-count').textContent = data.total_repositories;
+                document.getElementById('avg-stars').textContent = data.avg_stars.toLocaleString();
+                document.getElementById('last-update').textContent = new Date(data.last_updated).toLocaleString();
+            }
+
+            // Updates are pushed over SSE; poll only if the stream is unavailable
+            let pollTimer = null;
+            function startPolling() {
+                if (!pollTimer) pollTimer = setInterval(loadData, 30000);
+            }
+
             loadData();
-            setInterval(loadData, 30000); // Refresh every 30 seconds
+            if (window.EventSource) {
+                const stream = new EventSource('/api/stream');
+                stream.addEventListener('snapshot', e => showAnalytics(JSON.parse(e.data).analytics));
+                stream.addEventListener('update', e => showAnalytics(JSON.parse(e.data).analytics));
+                stream.onopen = () => {
+                    clearInterval(pollTimer);
+                    pollTimer = null;
+                };
+                stream.onerror = () => {
+                    if (stream.readyState === EventSource.CLOSED) startPolling();
+                };
+            } else {
+                startPolling();
+            }
         </script>
     </body>
     </html>
     """
 
 
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the client's ``If-None-Match`` already names ``etag``"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def encoded_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serve pre-encoded JSON bytes, or 304 if the client's copy is current"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def database_response(key: str, query) -> Optional[tuple]:
+    """Encoded body and ETag of a database read, shared across workers"""
+    # Redis calls are blocking socket I/O; keep them off the event loop
+    body = await run_in_threadpool(shared_cache.get, f"snapshot:{key}")
+    if body is None:
+        result = await query()
+        if result is None:
+            return None
+        body = dumps_json(result)
+        await run_in_threadpool(
+            shared_cache.set, f"snapshot:{key}", body, SNAPSHOT_CACHE_TTL
+        )
+    return body, body_etag(body)
+
+
 @app.get("/api/top-repos", response_model=List[Repository])
-async def get_top_repositories():
-    """Get current top 10 repositories"""
+async def get_top_repositories(request: Request, limit: int = Query(10, ge=1, le=1000)):
+    """Get current top repositories (top 10 by default)"""
     try:
-        # Load latest data from JSON
-        if os.path.exists("data/top_repos_history.json"):
-            with open("data/top_repos_history.json", "r") as f:
-                history = json.load(f)
-                if history:
-                    latest_data = history[-1]
-                    return latest_data["repositories"]
-        return []
+        if STORAGE_BACKEND == "database":
+            body, etag = await database_response(
+                f"top_repos:{limit}", lambda: database.top_repos(limit)
+            )
+        else:
+            body, etag = history_store.get_top_repos_response(limit)
+        return encoded_response(request, body, etag)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/analytics", response_model=AnalyticsResponse)
-async def get_analytics():
+async def get_analytics(request: Request):
     """Get analytics summary"""
     try:
-        if os.path.exists("data/top_repos_history.json"):
-            with open("data/top_repos_history.json", "r") as f:
-                history = json.load(f)
-                if history:
-                    latest_data = history[-1]
-                    repos = latest_data["repositories"]
-
-                    total_stars = sum(repo["stars"] for repo in repos)
-                    avg_stars = total_stars / len(repos) if repos else 0
-
-                    # Find top gainer (simplified - in real app would compare with previous day)
-                    top_gainer = max(repos, key=lambda x: x["stars"]) if repos else None
-
-                    return AnalyticsResponse(
-                        total_repositories=len(repos),
-                        avg_stars=round(avg_stars, 2),
-                        top_gainer=top_gainer,
-                        last_updated=latest_data["date"],
-                    )
+        if STORAGE_BACKEND == "database":
+            encoded = await database_response("analytics", database.analytics)
+        else:
+            encoded = history_store.get_analytics_response()
+        if encoded:
+            return encoded_response(request, *encoded)
 
         return AnalyticsResponse(
             total_repositories=0, avg_stars=0, last_updated=datetime.now().isoformat()
@@ -160,23 +317,150 @@ async def get_analytics():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/refresh-data")
-async def refresh_data():
-    """Manually trigger data refresh"""
+@app.get("/api/analytics/movers", response_model=MoversResponse)
+def get_movers(
+    request: Request, window: str = "7d", limit: int = 10, sort: str = "stars"
+):
+    """Biggest star gains, rank climbs or accelerations over a window"""
     try:
-        print("Starting data refresh...")
-        top_repos = fetch_top_repos()
-        today_data = update_history(top_repos)
-        generate_chart()
-        print("Data refresh completed!")
-        return {
-            "message": "Data refreshed successfully",
-            "timestamp": datetime.now().isoformat(),
-        }
+        body, etag = encode_response(movers_engine.movers(window, limit, sort))
+        return encoded_response(request, body, etag)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def refresh_job():
+    """Refresh data, then drop predictions computed from the old snapshot"""
+    summary = run_refresh()
+    # Nothing can be cached before the ML module has been loaded
+    if "scripts.ml_predictor" in sys.modules:
+        get_predictor().prediction_cache.invalidate()
+    return summary
+
+
+# Job handlers read and publish state through the shared cache (Redis or
+# files), so they are plain ``def`` and run in the threadpool
+@app.post("/api/refresh-data", status_code=202)
+def refresh_data():
+    """Queue a data refresh; concurrent requests share one in-flight run"""
+    job = job_manager.submit("refresh", refresh_job, dedupe_key="refresh")
+    return {
+        "message": "Data refresh queued",
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job_status(job_id: str):
+    """Get status and timing of a background job"""
+    job = job_manager.status(job_id) or training_jobs.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a queued or running background job"""
+    job = job_manager.cancel(job_id) or training_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if job["status"] == "running" and not job["cancellable"]:
+        raise HTTPException(
+            status_code=409, detail=f"Job '{job_id}' is running and cannot be cancelled"
+        )
+    return job
+
+
+@app.get("/api/chart/series")
+def get_chart_series(request: Request, top: int = 10, days: int = 90):
+    """Star series of the top repositories for client-side charts"""
+    try:
+        data = chart_series(top, days)
+        if data is None:
+            raise HTTPException(status_code=404, detail="No historical data")
+
+        headers = {"ETag": f'"{series_hash(data)[:32]}"', "Cache-Control": "no-cache"}
+        if etag_matches(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(data, headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/history")
+def get_history(
+    request: Request,
+    repos: Optional[str] = None,
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+    resolution: str = "day",
+    points: int = DEFAULT_POINTS,
+    downsample: str = "lttb",
+):
+    """Star history from the rollup tiers, downsampled to ``points`` per repo"""
+    try:
+        names = [name for name in repos.split(",") if name] if repos else None
+        result = rollup_store.history(names, start, end, resolution, points, downsample)
+        body, etag = encode_response(result)
+        return encoded_response(request, body, etag)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def snapshot_event_body() -> bytes:
+    """Current analytics and top repositories, spliced from pre-encoded bytes"""
+    analytics = history_store.get_analytics_response()
+    repositories, _ = history_store.get_top_repos_response()
+    return b'{"analytics":%s,"repositories":%s}' % (
+        analytics[0] if analytics else b"null",
+        repositories,
+    )
+
+
+def broadcast_snapshot(previous: Optional[dict], latest: dict):
+    """History listener: push analytics and top-repo deltas to the stream"""
+    analytics = history_store.get_analytics_response()
+    event_hub.publish(
+        "update",
+        b'{"date":%s,"analytics":%s,"deltas":%s}'
+        % (
+            dumps_json(latest["date"]),
+            analytics[0] if analytics else b"null",
+            dumps_json(snapshot_deltas(previous, latest)),
+        ),
+    )
+
+
+history_store.add_listener(broadcast_snapshot)
+
+
+@app.get("/api/stream")
+async def stream_updates(request: Request):
+    """Server-Sent Events: a snapshot on connect, then updates as they land"""
+    subscriber = event_hub.subscribe(request.headers.get("last-event-id"))
+    return StreamingResponse(
+        event_hub.stream(
+            subscriber,
+            snapshot=snapshot_event_body,
+            is_disconnected=request.is_disconnected,
+            # Heartbeats also notice snapshots written by other processes
+            on_idle=history_store.get_latest,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
@@ -188,7 +472,15 @@ async def health_check():
 
 
 # AI/ML Endpoints
-from scripts.ml_predictor import predictor, get_ml_insights
+# These load models and run pandas/scikit-learn, so they are plain ``def``
+# handlers: FastAPI runs them in its threadpool instead of on the event loop.
+def ml():
+    """ML module, imported on first use (it pulls in pandas and scikit-learn)"""
+    return importlib.import_module("scripts.ml_predictor")
+
+
+def get_predictor():
+    return ml().get_predictor()
 
 
 class MLPredictionResponse(BaseModel):
@@ -209,42 +501,61 @@ class MLInsightsResponse(BaseModel):
     timestamp: str
 
 
+def _indexed_prediction(repo_data: dict) -> dict:
+    prediction = get_predictor().predict_indexed(repo_data)
+    if "error" in prediction:
+        raise HTTPException(status_code=500, detail=prediction["error"])
+    return prediction
+
+
 @app.get("/api/ml/predict/{repo_name}", response_model=MLPredictionResponse)
-async def predict_repository_growth(repo_name: str):
-    """Predict growth for a specific repository"""
+def predict_repository_growth(repo_name: str):
+    """Predict growth for a repository by its short name"""
     try:
-        # Load repository data
-        if os.path.exists("data/github_top_20250907_124243.json"):
-            with open("data/github_top_20250907_124243.json", "r") as f:
-                repos_data = json.load(f)
-
-            # Find repository
-            repo_data = None
-            for repo in repos_data:
-                if repo["name"].lower() == repo_name.lower():
-                    repo_data = repo
-                    break
-
-            if repo_data:
-                prediction = predictor.predict_future_growth(repo_data)
-                if "error" in prediction:
-                    raise HTTPException(status_code=500, detail=prediction["error"])
-                return prediction
-            else:
-                raise HTTPException(
-                    status_code=404, detail=f"Repository '{repo_name}' not found"
-                )
-        else:
+        index = get_predictor().repository_index()
+        if index.snapshot is None:
             raise HTTPException(status_code=404, detail="Repository data not available")
+
+        matches = index.find_by_name(repo_name)
+        if not matches:
+            raise HTTPException(
+                status_code=404, detail=f"Repository '{repo_name}' not found"
+            )
+        if len(matches) > 1:
+            full_names = ", ".join(repo["full_name"] for repo in matches)
+            raise HTTPException(
+                status_code=409,
+                detail=f"'{repo_name}' is ambiguous ({full_names}); "
+                "use /api/ml/predict/{owner}/{repo}",
+            )
+        return _indexed_prediction(matches[0])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/ml/predict/{owner}/{repo}", response_model=MLPredictionResponse)
+def predict_repository_growth_by_full_name(owner: str, repo: str):
+    """Predict growth for a repository by ``owner/repo``"""
+    try:
+        repo_data = get_predictor().repository_index().get(f"{owner}/{repo}")
+        if repo_data is None:
+            raise HTTPException(
+                status_code=404, detail=f"Repository '{owner}/{repo}' not found"
+            )
+        return _indexed_prediction(repo_data)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/ml/insights", response_model=MLInsightsResponse)
-async def get_ml_insights_endpoint():
+def get_ml_insights_endpoint():
     """Get comprehensive ML insights and predictions"""
     try:
-        insights = get_ml_insights()
+        insights = ml().get_ml_insights()
         if "error" in insights:
             raise HTTPException(status_code=500, detail=insights["error"])
         return insights
@@ -253,56 +564,46 @@ async def get_ml_insights_endpoint():
 
 
 @app.get("/api/ml/top-predictions", response_model=List[MLPredictionResponse])
-async def get_top_predictions(limit: int = 10):
+def get_top_predictions(limit: int = 10):
     """Get top predicted performers"""
     try:
-        df = predictor.load_historical_data()
-        if df.empty:
-            return []
-
-        predictions = predictor.predict_top_performers(df, limit)
-        return predictions
+        return get_predictor().cached_top_predictions(limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/ml/trends")
-async def get_ml_trends():
+def get_ml_trends():
     """Get ML-powered trend analysis"""
     try:
-        df = predictor.load_historical_data()
-        if df.empty:
-            raise HTTPException(status_code=404, detail="No data available")
-
-        trends = predictor.analyze_trends(df)
+        trends = get_predictor().cached_trends()
+        if "error" in trends:
+            raise HTTPException(status_code=404, detail=trends["error"])
         return trends
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/ml/train")
-async def train_ml_model():
-    """Train ML models with latest data"""
-    try:
-        df = predictor.load_historical_data()
-        if df.empty:
-            raise HTTPException(
-                status_code=404, detail="No data available for training"
-            )
+@app.get("/api/ml/cache-stats")
+def get_prediction_cache_stats():
+    """Hit ratio and compute time of the prediction cache"""
+    return get_predictor().prediction_cache.metrics()
 
-        results = predictor.train_growth_prediction_model(df)
-        return {
-            "message": "ML model training completed",
-            "results": results,
-            "timestamp": datetime.now().isoformat(),
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/ml/train", status_code=202)
+def train_ml_model(n_jobs: Optional[int] = None):
+    """Queue ML model training; candidate models fit in parallel processes"""
+    job = ml().submit_training(n_jobs)
+    return {
+        "message": "ML model training queued",
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+        "timestamp": datetime.now().isoformat(),
+    }
 
-if __name__ == "__main__":
-    # Mount static files
-    if os.path.exists("docs/assets"):
-        app.mount("/static", StaticFiles(directory="docs/assets"), name="static")
 
+if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
@@ -0,0 +1,99 @@
+"""
+Startup Benchmark for StellarNexus
+Measures cold import time of the API and its heavy dependencies
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What an API worker imports at startup, then what loads on first use
+MODULES = [
+    "api.main",
+    "scripts.main",
+    "scripts.ml_predictor",
+    "fastapi",
+    "numpy",
+    "pandas",
+    "sklearn.ensemble",
+    "matplotlib.pyplot",
+]
+
+
+def import_seconds(module: str) -> float:
+    """Import ``module`` in a fresh interpreter and return the elapsed time"""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, top: int = 10):
+    """Largest self-time contributors reported by ``-X importtime``"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def run(modules, repeat: int = 3) -> dict:
+    """Median cold import time per module, in seconds"""
+    return {
+        module: round(
+            statistics.median(import_seconds(module) for _ in range(repeat)), 4
+        )
+        for module in modules
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print JSON only")
+    parser.add_argument(
+        "--detail", action="store_true", help="list the slowest nested imports"
+    )
+    args = parser.parse_args()
+
+    timings = run(args.modules, args.repeat)
+    if args.json:
+        print(json.dumps(timings, indent=2))
+        return
+
+    print(f"{'module':<28}{'import (s)':>12}")
+    for module, seconds in timings.items():
+        print(f"{module:<28}{seconds:>12.3f}")
+
+    if args.detail:
+        for module in args.modules:
+            print(f"\nSlowest imports under {module} (self / cumulative ms):")
+            for self_us, cumulative_us, name in slowest_imports(module):
+                print(f"  {self_us / 1000:8.1f} {cumulative_us / 1000:9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Chart Rendering for StellarNexus
+Star-trend series export and a hash-skipping PNG render stage
+"""
+
+import hashlib
+import json
+import math
+import os
+import subprocess
+import sys
+from typing import Dict, Optional
+
+try:
+    from scripts.history_store import history_log, repo_key
+    from scripts.timeseries_store import star_matrix
+except ImportError:  # executed directly as ``python scripts/chart_render.py``
+    from history_store import history_log, repo_key
+    from timeseries_store import star_matrix
+
+CHART_FILE = "docs/assets/stars_trend.png"
+# Hash of the series the PNG was drawn from; rendering is skipped while it matches
+CHART_HASH_FILE = f"{CHART_FILE}.sha256"
+CHART_DAYS = 90
+CHART_TOP = 10
+RENDER_TIMEOUT = 120
+
+
+def chart_series(
+    top: int = CHART_TOP, days: int = CHART_DAYS, entry: Optional[Dict] = None
+) -> Optional[Dict]:
+    """Star series of today's top repositories, ready to serialise.
+
+    Days on which a repository was outside the tracked list are ``None``
+    gaps rather than shifted values. Passing the just-recorded ``entry``
+    skips reading it back from the history log.
+    """
+    # Read-only: update_history keeps the star matrix in step with the log
+    if not history_log.exists():
+        return None
+
+    if entry is None:
+        latest = history_log.read_tail(1)
+        if not latest:
+            return None
+        entry = latest[-1]
+
+    names = [repo_key(repo) for repo in entry["repositories"][:top]]
+    dates, series = star_matrix.series(names, last_days=days)
+    return {
+        "dates": list(dates),
+        "series": {
+            name: [None if math.isnan(v) else int(v) for v in values]
+            for name, values in series.items()
+        },
+    }
+
+
+def series_hash(data: Dict) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def _stored_hash() -> Optional[str]:
+    try:
+        with open(CHART_HASH_FILE, "r") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def render_png(data: Dict, path: Optional[str] = None):
+    """Draw the series with matplotlib (imported only when rendering)"""
+    path = path or CHART_FILE
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    df = pd.DataFrame(data["series"], index=pd.to_datetime(data["dates"]), dtype=float)
+
+    plt.figure(figsize=(12, 8))
+    for column in df.columns:
+        plt.plot(df.index, df[column], label=column, marker="o")
+
+    plt.title("GitHub Top Repositories Star Growth")
+    plt.xlabel("Date")
+    plt.ylabel("Stars")
+    plt.legend(bbox_to_anchor=(1.05, 1), loc="upper left")
+    plt.tight_layout()
+
+    # Write beside the target and swap, so the static mount never serves a
+    # half-written PNG
+    tmp_path = f"{path}.tmp.png"
+    plt.savefig(tmp_path)
+    plt.close()
+    os.replace(tmp_path, path)
+
+
+def render_chart(force: bool = False, entry: Optional[Dict] = None) -> bool:
+    """Render the trend PNG unless the series is unchanged; True if drawn"""
+    data = chart_series(entry=entry)
+    if data is None:
+        print("No historical data found. Skipping chart generation.")
+        return False
+
+    digest = series_hash(data)
+    if not force and digest == _stored_hash() and os.path.exists(CHART_FILE):
+        print("Chart data unchanged. Skipping chart generation.")
+        return False
+
+    os.makedirs(os.path.dirname(CHART_FILE), exist_ok=True)
+    render_png(data)
+    with open(CHART_HASH_FILE, "w") as f:
+        f.write(digest)
+    print(f"Chart saved to {CHART_FILE}")
+    return True
+
+
+def render_in_subprocess(timeout: float = RENDER_TIMEOUT) -> bool:
+    """Render in a fresh interpreter so matplotlib never loads in the caller.
+
+    A render that outlives ``timeout`` is killed and reported as skipped, so
+    the update carries on without a new chart.
+    """
+    try:
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__)],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        # run() has already killed and reaped the child
+        print(f"Chart rendering timed out after {timeout}s; skipped")
+        return False
+    if result.returncode != 0:
+        print(f"Chart rendering failed: {result.stderr.strip()}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    render_chart(force="--force" in sys.argv)
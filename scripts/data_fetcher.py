@@ -1,33 +1,51 @@
-import requests
 import json
 from datetime import datetime
 import os
 
+try:
+    from scripts.github_search import GitHubSearchFetcher
+    from scripts.http_cache import ConditionalCache
+    from scripts.snapshot_archive import SnapshotArchive
+except ImportError:  # executed directly as ``python scripts/data_fetcher.py``
+    from github_search import GitHubSearchFetcher
+    from http_cache import ConditionalCache
+    from snapshot_archive import SnapshotArchive
 
-def fetch_github_data():
-    """Получение данных о топ-10 репозиториях с GitHub"""
-    url = "https://api.github.com/search/repositories?q=stars:>0&sort=stars&order=desc&per_page=10"
+MAX_REPOSITORIES = int(os.getenv("MAX_REPOSITORIES", "10"))
+# "archive" keeps slim compressed snapshots; "raw" dumps the full API payload
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "archive")
+
+
+def fetch_github_data(limit=MAX_REPOSITORIES):
+    """Получение данных о топ-N (до 1000) репозиториях с GitHub"""
+    fetcher = GitHubSearchFetcher(token=os.getenv("GH_TOKEN"), cache=ConditionalCache())
 
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
+        return fetcher.search(limit)
     except Exception as e:
         print(f"Ошибка при получении данных: {e}")
         return None
 
 
-def save_data(data):
-    """Сохранение данных в JSON файл"""
+def save_data(data, snapshot_format=SNAPSHOT_FORMAT, archive=None):
+    """Сохранение данных: сжатый архив снимков или исходный JSON"""
     if not data:
         return
 
+    if snapshot_format == "archive":
+        archive = archive or SnapshotArchive()
+        entry = archive.write(data.get("items", []))
+        print(f"Данные сохранены в {os.path.join(archive.directory, entry['path'])}")
+        return entry
+
     filename = f"data/github_top_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
     with open(filename, "w") as f:
         json.dump(data, f, indent=2)
 
     print(f"Данные сохранены в {filename}")
+    # Catalog the dump too, so latest() and the ML path see this snapshot
+    return (archive or SnapshotArchive()).import_raw(filename)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,374 @@
+"""
+Database Storage for StellarNexus
+Async persistence of snapshots into the init.sql schema, with batched upserts
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import asyncpg
+except ImportError:  # optional: only needed for postgresql:// URLs
+    asyncpg = None
+
+# "json" keeps the file-backed reads; "database" serves them from DATABASE_URL
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+DATABASE_POOL_MIN = int(os.getenv("DATABASE_POOL_MIN", "1"))
+DATABASE_POOL_MAX = int(os.getenv("DATABASE_POOL_MAX", "10"))
+
+# Statements are written for PostgreSQL; the SQLite stand-in rewrites
+# ``$n`` parameters and drops ``::type`` casts
+UPSERT_REPOSITORIES = """
+INSERT INTO repositories (
+    github_id, name, full_name, description, html_url, stars_count,
+    forks_count, language, created_at, updated_at, pushed_at, size,
+    archived, disabled
+)
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+ON CONFLICT (github_id) DO UPDATE SET
+    name = excluded.name,
+    full_name = excluded.full_name,
+    description = excluded.description,
+    html_url = excluded.html_url,
+    stars_count = excluded.stars_count,
+    forks_count = excluded.forks_count,
+    language = excluded.language,
+    updated_at = excluded.updated_at,
+    pushed_at = excluded.pushed_at,
+    size = excluded.size,
+    archived = excluded.archived,
+    disabled = excluded.disabled,
+    updated = CURRENT_TIMESTAMP
+"""
+
+# stars_gained is measured against the repository's previous stored day
+UPSERT_DAILY_STATS = """
+INSERT INTO daily_stats (
+    repository_id, date, stars_count, forks_count, stars_gained, rank
+)
+SELECT
+    r.id, $2::date, $3::integer, $4::integer,
+    $3::integer - COALESCE(
+        (
+            SELECT p.stars_count FROM daily_stats p
+            WHERE p.repository_id = r.id AND p.date < $2::date
+            ORDER BY p.date DESC LIMIT 1
+        ),
+        $3::integer
+    ),
+    $5::integer
+FROM repositories r
+WHERE r.github_id = $1
+ON CONFLICT (repository_id, date) DO UPDATE SET
+    stars_count = excluded.stars_count,
+    forks_count = excluded.forks_count,
+    stars_gained = excluded.stars_gained,
+    rank = excluded.rank
+"""
+
+# Hot read queries; constant text keeps them in each connection's
+# prepared-statement cache
+LATEST_DATE = "(SELECT max(date) FROM daily_stats)"
+
+TOP_REPOS = f"""
+SELECT r.name, r.full_name, ds.stars_count AS stars, ds.rank, r.html_url AS url,
+       r.description
+FROM daily_stats ds
+JOIN repositories r ON r.id = ds.repository_id
+WHERE ds.date = {LATEST_DATE}
+ORDER BY ds.rank
+LIMIT $1
+"""
+
+ANALYTICS = f"""
+SELECT count(*) AS total_repositories,
+       coalesce(sum(ds.stars_count), 0) AS total_stars,
+       max(ds.date) AS last_updated
+FROM daily_stats ds
+WHERE ds.date = {LATEST_DATE}
+"""
+
+# Only repositories with an earlier stored day have a gain; on the first
+# ingested day there is no top gainer, as in the JSON backend
+TOP_GAINER = f"""
+SELECT r.name, r.full_name, ds.stars_count AS stars, ds.rank, r.html_url AS url,
+       r.description, ds.stars_gained
+FROM daily_stats ds
+JOIN repositories r ON r.id = ds.repository_id
+WHERE ds.date = {LATEST_DATE}
+  AND EXISTS (
+      SELECT 1 FROM daily_stats p
+      WHERE p.repository_id = ds.repository_id AND p.date < ds.date
+  )
+ORDER BY ds.stars_gained DESC, ds.rank
+LIMIT 1
+"""
+
+# The tables of init.sql for the SQLite stand-in (no extensions, view or
+# trigger; ids are random hex instead of UUIDs)
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repositories (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    github_id INTEGER UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    description TEXT,
+    html_url TEXT NOT NULL,
+    stars_count INTEGER NOT NULL DEFAULT 0,
+    forks_count INTEGER NOT NULL DEFAULT 0,
+    language TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    pushed_at TEXT,
+    size INTEGER,
+    archived BOOLEAN DEFAULT FALSE,
+    disabled BOOLEAN DEFAULT FALSE,
+    created TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS daily_stats (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    repository_id TEXT REFERENCES repositories(id),
+    date TEXT NOT NULL,
+    stars_count INTEGER NOT NULL,
+    forks_count INTEGER NOT NULL,
+    stars_gained INTEGER DEFAULT 0,
+    rank INTEGER,
+    created TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(repository_id, date)
+);
+CREATE INDEX IF NOT EXISTS idx_repositories_stars
+    ON repositories(stars_count DESC);
+CREATE INDEX IF NOT EXISTS idx_daily_stats_date ON daily_stats(date DESC);
+CREATE INDEX IF NOT EXISTS idx_daily_stats_repository_date
+    ON daily_stats(repository_id, date);
+"""
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    # fromisoformat only accepts a "Z" suffix from Python 3.11
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def repository_rows(items: List[Dict]) -> List[Tuple]:
+    """Parameters of UPSERT_REPOSITORIES for fetched GitHub items"""
+    return [
+        (
+            item["id"],
+            item["name"],
+            item.get("full_name") or item["name"],
+            item.get("description"),
+            item["html_url"],
+            item["stargazers_count"],
+            item.get("forks_count", 0),
+            item.get("language"),
+            _timestamp(item.get("created_at")),
+            _timestamp(item.get("updated_at")),
+            _timestamp(item.get("pushed_at")),
+            item.get("size"),
+            item.get("archived", False),
+            item.get("disabled", False),
+        )
+        for item in items
+    ]
+
+
+def daily_stat_rows(items: List[Dict], day: date) -> List[Tuple]:
+    """Parameters of UPSERT_DAILY_STATS; rank is the position in ``items``"""
+    return [
+        (item["id"], day, item["stargazers_count"], item.get("forks_count", 0), rank)
+        for rank, item in enumerate(items, 1)
+    ]
+
+
+def sqlite_statement(sql: str) -> str:
+    """PostgreSQL statement text rewritten for sqlite3"""
+    sql = re.sub(r"::\w+", "", sql)
+    return re.sub(r"\$(\d+)", r"?\1", sql)
+
+
+def _sqlite_value(value):
+    # Stored as ISO text, which also compares correctly
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class PostgresDriver:
+    """asyncpg connection pool"""
+
+    def __init__(self, url: str, min_size: int, max_size: int):
+        if asyncpg is None:
+            raise RuntimeError("asyncpg is required for PostgreSQL storage")
+        self.url = url
+        self.min_size = min_size
+        self.max_size = max_size
+        self.pool = None
+
+    async def connect(self):
+        self.pool = await asyncpg.create_pool(
+            self.url, min_size=self.min_size, max_size=self.max_size
+        )
+
+    async def close(self):
+        await self.pool.close()
+
+    async def fetch(self, sql: str, *args) -> List[Dict]:
+        return [dict(row) for row in await self.pool.fetch(sql, *args)]
+
+    async def execute_batches(self, batches: Sequence[Tuple[str, List[Tuple]]]):
+        """Run each (statement, rows) batch with executemany in one transaction"""
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                for sql, rows in batches:
+                    await connection.executemany(sql, rows)
+
+
+class SQLiteDriver:
+    """Stand-in for tests and single-host setups: sqlite3 on one worker thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = None
+        self._connection = None
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.path)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.executescript(SQLITE_SCHEMA)
+
+    async def connect(self):
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="stellar-sqlite")
+        await self._run(self._open)
+
+    async def close(self):
+        await self._run(self._connection.close)
+        self._executor.shutdown()
+
+    def _fetch(self, sql: str, args) -> List[Dict]:
+        cursor = self._connection.execute(
+            sqlite_statement(sql), [_sqlite_value(v) for v in args]
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    async def fetch(self, sql: str, *args) -> List[Dict]:
+        return await self._run(self._fetch, sql, args)
+
+    def _execute_batches(self, batches):
+        with self._connection:
+            for sql, rows in batches:
+                self._connection.executemany(
+                    sqlite_statement(sql),
+                    [[_sqlite_value(v) for v in row] for row in rows],
+                )
+
+    async def execute_batches(self, batches: Sequence[Tuple[str, List[Tuple]]]):
+        await self._run(self._execute_batches, batches)
+
+
+class Database:
+    """Snapshot ingest and dashboard reads over the configured driver.
+
+    ``postgresql://`` URLs use an asyncpg pool; ``sqlite:///path`` uses the
+    sqlite3 stand-in. The driver connects on first use (or explicitly from
+    the API's lifespan) and must be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        url: str = DATABASE_URL,
+        min_size: int = DATABASE_POOL_MIN,
+        max_size: int = DATABASE_POOL_MAX,
+    ):
+        self.url = url
+        self.min_size = min_size
+        self.max_size = max_size
+        self._driver = None
+        self._lock = None
+
+    def _create_driver(self):
+        if self.url.startswith(("postgresql://", "postgres://")):
+            return PostgresDriver(self.url, self.min_size, self.max_size)
+        if self.url.startswith("sqlite:///"):
+            return SQLiteDriver(self.url[len("sqlite:///") :])
+        raise ValueError(f"Unsupported DATABASE_URL: {self.url!r}")
+
+    async def connect(self):
+        if self._driver is not None:
+            return self._driver
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:  # concurrent first requests share one pool
+            if self._driver is None:
+                driver = self._create_driver()
+                await driver.connect()
+                self._driver = driver
+        return self._driver
+
+    async def close(self):
+        if self._driver is not None:
+            driver, self._driver = self._driver, None
+            await driver.close()
+
+    async def ingest(self, items: List[Dict], day: Optional[date] = None) -> int:
+        """Upsert a fetched snapshot into both tables; returns its row count"""
+        day = day or date.today()
+        driver = await self.connect()
+        await driver.execute_batches(
+            [
+                (UPSERT_REPOSITORIES, repository_rows(items)),
+                (UPSERT_DAILY_STATS, daily_stat_rows(items, day)),
+            ]
+        )
+        return len(items)
+
+    async def top_repos(self, limit: int) -> List[Dict]:
+        """Latest day's repositories in rank order, shaped like /api/top-repos"""
+        driver = await self.connect()
+        return await driver.fetch(TOP_REPOS, limit)
+
+    async def analytics(self) -> Optional[Dict]:
+        """Summary of the latest day, shaped like /api/analytics"""
+        driver = await self.connect()
+        summary = (await driver.fetch(ANALYTICS))[0]
+        if not summary["total_repositories"]:
+            return None
+
+        gainer = await driver.fetch(TOP_GAINER)
+        total = summary["total_repositories"]
+        return {
+            "total_repositories": total,
+            "avg_stars": round(summary["total_stars"] / total, 2),
+            "top_gainer": gainer[0] if gainer else None,
+            "last_updated": str(summary["last_updated"]),
+        }
+
+
+def ingest_snapshot(items: List[Dict], day: Optional[date] = None, url=None) -> int:
+    """Blocking ingest for the update scripts, on a short-lived connection"""
+
+    async def run():
+        db = Database(url or DATABASE_URL, min_size=1, max_size=1)
+        try:
+            return await db.ingest(items, day)
+        finally:
+            await db.close()
+
+    return asyncio.run(run())
+
+
+# Global database shared by the API when STORAGE_BACKEND is "database"
+database = Database()
@@ -0,0 +1,425 @@
+"""
+Repository Enrichment for StellarNexus
+Async crawl of per-repo stargazer, commit, release and contributor metadata
+"""
+
+import asyncio
+import json
+import math
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import httpx
+except ImportError:  # optional: only the crawl itself needs it
+    httpx = None
+
+try:
+    from scripts.github_search import GITHUB_API_URL
+    from scripts.history_store import repo_key
+except ImportError:  # executed directly from the scripts directory
+    from github_search import GITHUB_API_URL
+    from history_store import repo_key
+
+ENRICHMENT_FILE = "data/enrichment/enrichment.jsonl"
+# Requests in flight at once, across every repository of a crawl
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "8"))
+# Sustained requests per second (the REST core limit is 5000/hour) and burst
+ENRICH_RATE = float(os.getenv("ENRICH_RATE", "1.2"))
+ENRICH_BURST = int(os.getenv("ENRICH_BURST", "10"))
+# Records younger than this are reused instead of crawled again
+ENRICH_MAX_AGE_DAYS = int(os.getenv("ENRICH_MAX_AGE_DAYS", "7"))
+# Window for "recent" commits, releases and star velocity
+RECENT_DAYS = 90
+# Stargazer pages sampled per repo, spread from the first to the newest
+STARGAZER_SAMPLE_PAGES = 3
+STARGAZER_PAGE_SIZE = 100
+# The stargazers listing stops after this many entries
+STARGAZER_LIMIT = 40000
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def last_page(response) -> Optional[int]:
+    """Page number of the ``rel="last"`` link, if the listing has several pages"""
+    url = response.links.get("last", {}).get("url")
+    if not url:
+        return None
+    return int(parse_qs(urlparse(url).query)["page"][0])
+
+
+def sample_pages(pages: int, samples: int = STARGAZER_SAMPLE_PAGES) -> List[int]:
+    """Evenly spread page numbers from 1 to ``pages``, always including both"""
+    if pages <= samples:
+        return list(range(1, pages + 1))
+    step = (pages - 1) / (samples - 1)
+    return sorted({round(1 + i * step) for i in range(samples)})
+
+
+def stargazer_velocity(
+    samples: List[List], stars: int, capped: bool, now: datetime
+) -> Optional[float]:
+    """Recent stars per day from ``[star number, starred_at]`` samples.
+
+    Uses the newest sample against the oldest one within ``RECENT_DAYS`` of
+    it. When the listing was capped the newest sample is old, so the rate is
+    the average from it up to ``stars`` today.
+    """
+    if not samples:
+        return None
+    newest_index, newest_at = samples[-1][0], _parse_time(samples[-1][1])
+    if capped:
+        days = max((now - newest_at).total_seconds() / 86400, 1.0)
+        return round((stars - newest_index) / days, 4)
+
+    window_start = newest_at - timedelta(days=RECENT_DAYS)
+    recent = [s for s in samples[:-1] if _parse_time(s[1]) >= window_start]
+    oldest = recent[0] if recent else (samples[-2] if len(samples) > 1 else None)
+    if oldest is None:
+        return None
+    days = max((newest_at - _parse_time(oldest[1])).total_seconds() / 86400, 1.0)
+    return round((newest_index - oldest[0]) / days, 4)
+
+
+class TokenBucket:
+    """Request budget shared by every task of a crawl.
+
+    Holds up to ``capacity`` tokens refilled at ``rate`` per second; waiters
+    queue on one lock, so the budget is handed out in arrival order. A
+    primary rate-limit reset drains it with ``block``.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep=asyncio.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await self.sleep((1 - self.tokens) / self.rate)
+
+    def block(self, seconds: float):
+        """Hand out nothing for the next ``seconds``"""
+        self._refill()
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class EnrichmentStore:
+    """Crawl checkpoint and feature source: JSON Lines, newest record per repo.
+
+    Each repository's record is appended as soon as it is crawled, so an
+    interrupted crawl keeps its progress. ``load`` is cached until the file
+    changes.
+    """
+
+    def __init__(self, path: str = ENRICHMENT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cached = (None, {})
+        self.lines = 0
+
+    def _file_signature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @property
+    def signature(self) -> Optional[tuple]:
+        """Signature of the file on disk (None before the first crawl)"""
+        return self._file_signature()
+
+    def load(self) -> Dict[str, Dict]:
+        signature = self._file_signature()
+        with self._lock:
+            if signature == self._cached[0]:
+                return self._cached[1]
+        records, lines = {}, 0
+        if signature is not None:
+            with open(self.path, "r") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    records[record["full_name"]] = record
+        with self._lock:
+            self._cached = (signature, records)
+            self.lines = lines
+        return records
+
+    def append(self, record: Dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def compact(self):
+        """Rewrite the file with one record per repository"""
+        records = self.load()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            for record in records.values():
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+class EnrichmentCrawler:
+    """Crawls per-repository metadata from the REST API with asyncio.
+
+    Every request waits for a token from one shared bucket and then for a
+    slot of a semaphore sized like the connection pool, so a crawl of
+    thousands of repositories keeps ``concurrency`` requests in flight at
+    ``rate`` per second. Throttling and server errors are retried with
+    backoff. Repositories with a fresh record in the store are skipped, and
+    a failed repository is simply crawled again by the next run.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = GITHUB_API_URL,
+        store: Optional[EnrichmentStore] = None,
+        concurrency: int = ENRICH_CONCURRENCY,
+        rate: float = ENRICH_RATE,
+        burst: int = ENRICH_BURST,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        max_wait: float = 300.0,
+        timeout: float = 30.0,
+        page_size: int = STARGAZER_PAGE_SIZE,
+        sleep=asyncio.sleep,
+        now: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.store = store or EnrichmentStore()
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.page_size = page_size
+        self.sleep = sleep
+        self.now = now
+        self.stats = {"requests": 0, "retries": 0}
+
+    def _retry_delay(self, response, attempt: int) -> Optional[float]:
+        """Seconds before retrying, or None when the response is final"""
+        retry_after = response.headers.get("Retry-After")
+        exhausted = response.headers.get("X-RateLimit-Remaining") == "0"
+        if response.status_code in (403, 429) and retry_after is not None:
+            return float(retry_after)
+        if response.status_code in (403, 429) and exhausted:
+            reset = float(response.headers.get("X-RateLimit-Reset", 0))
+            return max(0.0, reset - time.time())
+        if response.status_code >= 500:
+            return self.backoff * (2**attempt)
+        return None
+
+    async def _get(self, client, path: str, params=None, headers=None):
+        """GET with the shared rate limit, bounded concurrency and retries"""
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    self.stats["requests"] += 1
+                    response = await client.get(path, params=params, headers=headers)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+                self.stats["retries"] += 1
+                await self.sleep(min(self.backoff * (2**attempt), self.max_wait))
+                continue
+
+            delay = self._retry_delay(response, attempt)
+            if delay is None or attempt == self.max_retries:
+                return response
+            delay = min(delay, self.max_wait)
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                # Every task is out of quota, not just this one
+                self._bucket.block(delay)
+            self.stats["retries"] += 1
+            await self.sleep(delay)
+        return response
+
+    async def _count(self, client, path: str, params: Dict) -> int:
+        """Size of a listing from one ``per_page=1`` request and its Link header"""
+        response = await self._get(client, path, {**params, "per_page": 1})
+        if response.status_code in (204, 409):  # empty repository
+            return 0
+        response.raise_for_status()
+        return last_page(response) or len(response.json())
+
+    async def _stargazer_samples(self, client, full_name: str, stars: int):
+        accessible = min(stars, STARGAZER_LIMIT)
+        pages = sample_pages(math.ceil(accessible / self.page_size))
+        responses = await asyncio.gather(
+            *(
+                self._get(
+                    client,
+                    f"/repos/{full_name}/stargazers",
+                    {"per_page": self.page_size, "page": page},
+                    {"Accept": "application/vnd.github.star+json"},
+                )
+                for page in pages
+            )
+        )
+        samples = []
+        for page, response in zip(pages, responses):
+            response.raise_for_status()
+            entries = response.json()
+            # First and last star of each page are enough to place it in time
+            for offset in sorted({0, len(entries) - 1}):
+                if 0 <= offset < len(entries):
+                    number = (page - 1) * self.page_size + offset + 1
+                    samples.append([number, entries[offset]["starred_at"]])
+        return samples, stars > STARGAZER_LIMIT
+
+    async def _releases(self, client, full_name: str, since: datetime) -> int:
+        response = await self._get(
+            client, f"/repos/{full_name}/releases", {"per_page": 100}
+        )
+        response.raise_for_status()
+        return sum(
+            1
+            for release in response.json()
+            if release.get("published_at")
+            and _parse_time(release["published_at"]) >= since
+        )
+
+    async def enrich(self, client, repo: Dict) -> Dict:
+        """One repository's record"""
+        full_name = repo["full_name"]
+        stars = repo.get("stargazers_count") or 0
+        now = self.now()
+        since = now - timedelta(days=RECENT_DAYS)
+
+        (samples, capped), commits, releases, contributors = await asyncio.gather(
+            self._stargazer_samples(client, full_name, stars),
+            self._count(
+                client,
+                f"/repos/{full_name}/commits",
+                {"since": since.strftime("%Y-%m-%dT%H:%M:%SZ")},
+            ),
+            self._releases(client, full_name, since),
+            self._count(client, f"/repos/{full_name}/contributors", {"anon": 1}),
+        )
+        return {
+            "full_name": full_name,
+            "fetched_at": now.strftime("%Y-%m-%d"),
+            "stargazers_count": stars,
+            "stargazer_samples": samples,
+            "stargazer_velocity": stargazer_velocity(samples, stars, capped, now),
+            "recent_commits": commits,
+            "recent_releases": releases,
+            "contributors": contributors,
+        }
+
+    def is_fresh(self, record: Optional[Dict]) -> bool:
+        if record is None:
+            return False
+        cutoff = self.now() - timedelta(days=ENRICH_MAX_AGE_DAYS)
+        return record["fetched_at"] >= cutoff.strftime("%Y-%m-%d")
+
+    async def crawl(self, repos: List[Dict]) -> Dict:
+        """Enrich every repo without a fresh record; returns a crawl summary"""
+        if httpx is None:
+            raise RuntimeError("the httpx package is required for enrichment")
+
+        existing = self.store.load()
+        pending = [r for r in repos if not self.is_fresh(existing.get(r["full_name"]))]
+        # Created inside the running loop (asyncio primitives bind to it)
+        self._bucket = TokenBucket(self.rate, self.burst)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        failed = []
+
+        async def run(client, repo):
+            try:
+                self.store.append(await self.enrich(client, repo))
+            except Exception as e:
+                print(f"Enrichment failed for {repo['full_name']}: {e}")
+                failed.append(repo["full_name"])
+
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.token:
+            headers["Authorization"] = f"token {self.token}"
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency,
+        )
+        async with httpx.AsyncClient(
+            base_url=self.base_url, headers=headers, limits=limits, timeout=self.timeout
+        ) as client:
+            await asyncio.gather(*(run(client, repo) for repo in pending))
+
+        # Refreshed records leave stale lines behind
+        if self.store.lines > 2 * len(self.store.load()):
+            self.store.compact()
+        return {
+            "repositories": len(repos),
+            "skipped": len(repos) - len(pending),
+            "enriched": len(pending) - len(failed),
+            "failed": failed,
+            **self.stats,
+        }
+
+
+def targets_from_entry(entry: Dict) -> List[Dict]:
+    """Crawl targets for a history snapshot, keyed like the star series"""
+    return [
+        {
+            "full_name": repo_key(repo),
+            "stargazers_count": repo["stars"],
+        }
+        for repo in entry["repositories"]
+    ]
+
+
+def enrich_repositories(repos: List[Dict], **kwargs) -> Dict:
+    """Blocking crawl for the update scripts"""
+    return asyncio.run(EnrichmentCrawler(**kwargs).crawl(repos))
+
+
+if __name__ == "__main__":
+    try:
+        from scripts.snapshot_archive import snapshot_archive
+    except ImportError:
+        from snapshot_archive import snapshot_archive
+
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    items = snapshot_archive.latest_items() or []
+    summary = enrich_repositories(items[:limit], token=os.getenv("GH_TOKEN"))
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,185 @@
+"""
+Event Stream for StellarNexus
+Asyncio broadcast hub behind the /api/stream Server-Sent Events channel
+"""
+
+import asyncio
+import threading
+import uuid
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+try:
+    from scripts.history_store import DEFAULT_TOP_LIMIT, REPOSITORY_FIELDS, repo_key
+except ImportError:  # executed directly from the scripts directory
+    from history_store import DEFAULT_TOP_LIMIT, REPOSITORY_FIELDS, repo_key
+
+HEARTBEAT_SECONDS = 15.0
+RETRY_MILLISECONDS = 5000
+# Events kept for clients reconnecting with Last-Event-ID
+REPLAY_EVENTS = 100
+SUBSCRIBER_QUEUE_SIZE = 32
+
+
+def format_event(event_id: str, event: str, data: bytes) -> bytes:
+    """One SSE message; ``data`` is a single line of JSON"""
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+        event_id.encode(),
+        event.encode(),
+        data,
+    )
+
+
+def snapshot_deltas(
+    previous: Optional[Dict], current: Dict, limit: int = DEFAULT_TOP_LIMIT
+) -> Dict:
+    """Repositories whose stars or rank changed, entered or left the top list"""
+
+    def project(repo):
+        return {field: repo.get(field) for field in REPOSITORY_FIELDS}
+
+    old = {repo_key(r): r for r in previous["repositories"][:limit]} if previous else {}
+    new = current["repositories"][:limit]
+    new_keys = {repo_key(r) for r in new}
+
+    changed, entered = [], []
+    for repo in new:
+        before = old.get(repo_key(repo))
+        if before is None:
+            entered.append(project(repo))
+        elif (before["stars"], before["rank"]) != (repo["stars"], repo["rank"]):
+            changed.append(project(repo))
+
+    return {
+        "changed": changed,
+        "entered": entered,
+        "left": [key for key in old if key not in new_keys],
+    }
+
+
+class Subscriber:
+    """One connected client: its queue and the loop that drains it"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(queue_size)
+        self.replay: List[bytes] = []
+        self.needs_snapshot = True
+
+
+class BroadcastHub:
+    """Fans published events out to every subscriber's asyncio queue.
+
+    ``publish`` may be called from any thread (refresh jobs run on worker
+    threads); delivery is handed to each subscriber's event loop. Event ids
+    carry a per-process token, so a Last-Event-ID from another worker or an
+    earlier run is recognised and answered with a full snapshot instead of a
+    replay. A subscriber that falls ``queue_size`` events behind is
+    disconnected and catches up by reconnecting.
+    """
+
+    def __init__(
+        self, replay: int = REPLAY_EVENTS, queue_size: int = SUBSCRIBER_QUEUE_SIZE
+    ):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._token = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._buffer: "deque[tuple]" = deque(maxlen=replay)
+        self._subscribers = set()
+
+    @property
+    def last_event_id(self) -> str:
+        return f"{self._token}-{self._seq}"
+
+    def _parse_id(self, event_id: Optional[str]) -> Optional[int]:
+        token, _, seq = (event_id or "").partition("-")
+        if token != self._token or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """Register a client (call from its event loop)"""
+        subscriber = Subscriber(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            seen = self._parse_id(last_event_id)
+            oldest = self._buffer[0][0] if self._buffer else self._seq + 1
+            if seen is not None and oldest - 1 <= seen <= self._seq:
+                subscriber.needs_snapshot = False
+                subscriber.replay = [msg for seq, msg in self._buffer if seq > seen]
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data: bytes) -> str:
+        """Broadcast an event to all subscribers; returns its id"""
+        with self._lock:
+            self._seq += 1
+            event_id = self.last_event_id
+            message = format_event(event_id, event, data)
+            self._buffer.append((self._seq, message))
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(self._offer, subscriber, message)
+            except RuntimeError:  # its loop has shut down
+                self.unsubscribe(subscriber)
+        return event_id
+
+    def _offer(self, subscriber: Subscriber, message: bytes):
+        try:
+            subscriber.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too slow: end its stream; the client reconnects and replays
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(None)
+            self.unsubscribe(subscriber)
+
+    async def stream(
+        self,
+        subscriber: Subscriber,
+        snapshot: Callable[[], bytes],
+        is_disconnected: Callable[[], Awaitable[bool]],
+        on_idle: Optional[Callable[[], None]] = None,
+        heartbeat: Optional[float] = None,
+    ) -> AsyncIterator[bytes]:
+        """SSE body for one subscriber.
+
+        Starts with the reconnect delay and either a full ``snapshot`` event
+        or the replay of missed events, then relays published events. Idle
+        periods produce heartbeat comments and call ``on_idle``.
+        """
+        heartbeat = heartbeat or HEARTBEAT_SECONDS
+        try:
+            yield b"retry: %d\n\n" % RETRY_MILLISECONDS
+            if subscriber.needs_snapshot:
+                yield format_event(self.last_event_id, "snapshot", snapshot())
+            for message in subscriber.replay:
+                yield message
+
+            while not await is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    if on_idle is not None:
+                        on_idle()
+                    yield b": heartbeat\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+
+# Global hub shared by the API's stream endpoint and snapshot listeners
+event_hub = BroadcastHub()
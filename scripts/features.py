@@ -0,0 +1,144 @@
+"""
+Feature Pipeline for StellarNexus
+Single vectorised feature computation shared by training, prediction and trends
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import pandas as pd
+
+# Features for prediction
+FEATURE_COLUMNS = [
+    "days_since_creation",
+    "stars_per_day",
+    "growth_rate",
+    "language_encoded",
+    "has_description",
+    "description_length",
+]
+
+# Per-repo metadata joined in from the enrichment crawl (0 where not crawled)
+ENRICHMENT_COLUMNS = [
+    "stargazer_velocity",
+    "recent_commits",
+    "recent_releases",
+    "contributors",
+]
+MODEL_COLUMNS = FEATURE_COLUMNS + ENRICHMENT_COLUMNS
+
+# Language encoding
+LANGUAGE_MAP = {
+    "JavaScript": 1,
+    "Python": 2,
+    "Java": 3,
+    "TypeScript": 4,
+    "C++": 5,
+    "C#": 6,
+    "PHP": 7,
+    "Ruby": 8,
+    "Go": 9,
+    "Rust": 10,
+    "Other": 11,
+}
+OTHER_LANGUAGE = LANGUAGE_MAP["Other"]
+
+# Raw columns the features depend on; the snapshot hash covers exactly these
+SOURCE_COLUMNS = ["name", "stargazers_count", "created_at", "language", "description"]
+
+
+def utc_now() -> pd.Timestamp:
+    """Current time as naive UTC, matching the normalised ``created_at``"""
+    return pd.Timestamp.now(tz="UTC").tz_localize(None)
+
+
+def snapshot_hash(df: pd.DataFrame) -> str:
+    """Row-order-sensitive hash of the raw columns that feed the pipeline"""
+    columns = [c for c in SOURCE_COLUMNS if c in df.columns]
+    hashed = pd.util.hash_pandas_object(df[columns].astype(str), index=False)
+    return hashlib.sha1(hashed.values.tobytes()).hexdigest()
+
+
+class FeaturePipeline:
+    """Computes the ML feature matrix for a snapshot once and caches it.
+
+    ``transform`` returns a copy of the input with ``created_at`` normalised
+    to naive UTC and every derived column added. Results are cached per
+    (snapshot, UTC day) because ``days_since_creation`` only changes daily;
+    the cache keeps the ``max_entries`` most recently used snapshots. A
+    snapshot is identified by the id its caller passes (the archive
+    checksum), or else by hashing its source columns. Cached frames are
+    shared, so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def compute(df: pd.DataFrame, now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Vectorised feature computation (no caching)"""
+        now = now if now is not None else utc_now()
+        out = df.copy()
+
+        # Add time-based features - handle timezone issues
+        out["created_at"] = pd.to_datetime(out["created_at"], utc=True).dt.tz_localize(
+            None
+        )
+        out["days_since_creation"] = (now - out["created_at"]).dt.days
+        out["stars_per_day"] = out["stargazers_count"] / out[
+            "days_since_creation"
+        ].clip(lower=1)
+
+        # Add growth rate features
+        out["growth_rate"] = out["stargazers_count"] / (out["days_since_creation"] + 1)
+
+        out["language_encoded"] = (
+            out["language"].map(LANGUAGE_MAP).fillna(OTHER_LANGUAGE)
+        )
+
+        # Add repository quality features
+        out["has_description"] = out["description"].notna().astype(int)
+        out["description_length"] = out["description"].fillna("").str.len()
+
+        return out
+
+    def transform(
+        self, df: pd.DataFrame, snapshot_id: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Feature frame for ``df``, served from cache for a known snapshot"""
+        now = utc_now()
+        key = (snapshot_id or snapshot_hash(df), now.strftime("%Y-%m-%d"))
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        features = self.compute(df, now)
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = features
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return features
+
+    def feature_matrix(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Model input columns only, with gaps (and missing enrichment) filled"""
+        if not all(column in df.columns for column in FEATURE_COLUMNS):
+            df = self.transform(df).assign(
+                **{c: df[c].to_numpy() for c in ENRICHMENT_COLUMNS if c in df.columns}
+            )
+        return df.reindex(columns=MODEL_COLUMNS).fillna(0)
+
+
+# Global pipeline shared by training, inference and trend analysis
+feature_pipeline = FeaturePipeline()
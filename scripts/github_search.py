@@ -0,0 +1,250 @@
+"""
+GitHub Search Fetcher for StellarNexus
+Paginated, concurrent retrieval of the top-starred repositories
+"""
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Collection, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from scripts.http_cache import ConditionalCache
+except ImportError:  # executed directly from the scripts directory
+    from http_cache import ConditionalCache
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+# The Search API never returns more than 1000 results per query
+SEARCH_RESULT_CAP = 1000
+MAX_PER_PAGE = 100
+
+
+class GitHubSearchFetcher:
+    """Fetches up to 1000 top repositories over a pooled HTTP session.
+
+    Page 1 is requested first to learn ``total_count``; the remaining pages are
+    then requested concurrently, and ``iter_pages`` streams them as they land.
+    Primary rate limits (``X-RateLimit-Remaining`` / ``X-RateLimit-Reset``)
+    pause every worker until the reset time, and secondary limits
+    (``Retry-After``) or server errors are retried with exponential backoff.
+    With a ``cache``, requests carry ``If-None-Match`` / ``If-Modified-Since``
+    and a 304 (free of rate-limit cost) is answered from the cached body.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = GITHUB_API_URL,
+        max_workers: int = 4,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        max_wait: float = 300.0,
+        timeout: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+        cache: Optional[ConditionalCache] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.sleep = sleep
+        self.cache = cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept"] = "application/vnd.github+json"
+        if token:
+            self.session.headers["Authorization"] = f"token {token}"
+
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+
+    def _wait_for_quota(self):
+        """Sleep while the primary rate limit is exhausted"""
+        with self._lock:
+            wait = self._blocked_until - time.time()
+        if wait > 0:
+            self.sleep(min(wait, self.max_wait))
+
+    def _record_quota(self, response: requests.Response):
+        """Remember the reset time once the remaining quota hits zero"""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining == "0" and reset:
+            with self._lock:
+                self._blocked_until = max(self._blocked_until, float(reset))
+
+    def _retry_delay(self, response: requests.Response, attempt: int) -> float:
+        """Seconds to wait before retrying a throttled or failed request"""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            return float(retry_after)
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = float(response.headers.get("X-RateLimit-Reset", 0))
+            return max(0.0, reset - time.time())
+        return self.backoff * (2**attempt)
+
+    @staticmethod
+    def _cached_response(not_modified: requests.Response, body: bytes):
+        """Turn a 304 into a 200 response carrying the cached body"""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.headers = not_modified.headers
+        response.url = not_modified.url
+        response.encoding = "utf-8"
+        return response
+
+    def _request(self, url: str, params: Optional[Dict], headers: Dict):
+        """GET with rate-limit handling and retries"""
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_quota()
+            response = self.session.get(
+                url, params=params, headers=headers, timeout=self.timeout
+            )
+            self._record_quota(response)
+
+            throttled = response.status_code in (403, 429) and (
+                "Retry-After" in response.headers
+                or response.headers.get("X-RateLimit-Remaining") == "0"
+            )
+            if (throttled or response.status_code >= 500) and (
+                attempt < self.max_retries
+            ):
+                self.sleep(min(self._retry_delay(response, attempt), self.max_wait))
+                continue
+            break
+
+        return response
+
+    def get(self, path: str, params: Optional[Dict] = None) -> requests.Response:
+        """GET through the conditional cache (when configured)"""
+        url = f"{self.base_url}{path}"
+        if self.cache is None:
+            response = self._request(url, params, {})
+            response.raise_for_status()
+            return response
+
+        key = self.cache.make_key(url, params)
+        response = self._request(url, params, self.cache.conditional_headers(key))
+        if response.status_code == 304:
+            body = self.cache.read_body(key)
+            if body is not None:
+                return self._cached_response(response, body)
+            # The cached body vanished; repeat the request unconditionally
+            response = self._request(url, params, {})
+        else:
+            self.cache.record_miss()
+
+        response.raise_for_status()
+        self.cache.store(
+            key,
+            url,
+            response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return response
+
+    def _search_page(self, query: str, page: int, per_page: int) -> Dict:
+        params = {
+            "q": query,
+            "sort": "stars",
+            "order": "desc",
+            "per_page": per_page,
+            "page": page,
+        }
+        return self.get("/search/repositories", params).json()
+
+    @staticmethod
+    def page_size(limit: int) -> Tuple[int, int]:
+        """(clamped limit, results per page) for a top-``limit`` query"""
+        limit = max(1, min(limit, SEARCH_RESULT_CAP))
+        return limit, min(MAX_PER_PAGE, limit)
+
+    @classmethod
+    def page_count(cls, first: Dict, limit: int) -> int:
+        """Pages needed for the top ``limit`` results, from page 1's payload"""
+        limit, per_page = cls.page_size(limit)
+        available = min(first.get("total_count", 0), SEARCH_RESULT_CAP, limit)
+        return max(1, math.ceil(available / per_page))
+
+    def iter_pages(
+        self,
+        limit: int = 10,
+        query: str = "stars:>0",
+        pages: Optional[int] = None,
+        skip: Collection[int] = (),
+    ) -> Iterator[Tuple[int, Dict]]:
+        """Yield ``(page, payload)`` for each search page as it arrives.
+
+        Page 1 comes first when ``pages`` is unknown, since its
+        ``total_count`` sets how many follow. At most ``max_workers``
+        requests are in flight and a new one is only started when the
+        consumer takes a page, so a slow consumer throttles the fetch.
+        Pages in ``skip`` (already fetched by an interrupted run) are not
+        requested.
+        """
+        limit, per_page = self.page_size(limit)
+        if pages is None:
+            first = self._search_page(query, 1, per_page)
+            pages = self.page_count(first, limit)
+            skip = set(skip) | {1}
+            yield 1, first
+
+        pending = iter([page for page in range(1, pages + 1) if page not in skip])
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            in_flight = {}
+
+            def submit_next():
+                page = next(pending, None)
+                if page is not None:
+                    future = pool.submit(self._search_page, query, page, per_page)
+                    in_flight[future] = page
+
+            for _ in range(self.max_workers):
+                submit_next()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page = in_flight.pop(future)
+                    yield page, future.result()
+                    submit_next()
+
+    def search(self, limit: int = 10, query: str = "stars:>0") -> Dict:
+        """Return a search payload holding the top ``limit`` unique repositories"""
+        limit, _ = self.page_size(limit)
+        results = dict(self.iter_pages(limit, query))
+        first = results[1]
+
+        # Rankings shift while pages are in flight, so the same repository can
+        # show up on two pages
+        items = []
+        seen = set()
+        for page in sorted(results):
+            for item in results[page].get("items", []):
+                if item["id"] not in seen:
+                    seen.add(item["id"])
+                    items.append(item)
+
+        return {
+            "total_count": first.get("total_count", len(items)),
+            "incomplete_results": any(
+                r.get("incomplete_results") for r in results.values()
+            ),
+            "items": items[:limit],
+        }
+
+    def fetch_top(self, limit: int = 10, query: str = "stars:>0") -> List[Dict]:
+        """Return the top ``limit`` repositories (at most 1000)"""
+        return self.search(limit, query)["items"]
@@ -0,0 +1,410 @@
+"""
+History Store for StellarNexus
+Append-only JSON Lines history log and the in-memory snapshot cache built on it
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is the fallback encoder
+    orjson = None
+
+DATA_FILE = "data/top_repos_history.jsonl"
+LEGACY_DATA_FILE = "data/top_repos_history.json"
+
+# Fields of a repository in API responses, and the default /api/top-repos size
+REPOSITORY_FIELDS = ("name", "full_name", "stars", "rank", "url", "description")
+GAINER_FIELDS = REPOSITORY_FIELDS + ("stars_gained",)
+DEFAULT_TOP_LIMIT = 10
+
+# Prefix of repository URLs, whose path is the full name
+GITHUB_URL = "https://github.com/"
+
+# Bytes read per backwards step when tailing the log
+TAIL_BLOCK_SIZE = 8192
+
+
+def repo_key(repo: Dict) -> str:
+    """Identity of a history repository: its ``owner/name``.
+
+    Entries recorded before ``full_name`` was stored fall back to the path
+    of their GitHub URL, then to the short name.
+    """
+    if repo.get("full_name"):
+        return repo["full_name"]
+    url = repo.get("url") or ""
+    if url.startswith(GITHUB_URL):
+        return url[len(GITHUB_URL) :].strip("/")
+    return repo["name"]
+
+
+def dumps_json(obj) -> bytes:
+    """Encode a response body, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag derived from a response body"""
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def encode_response(obj) -> Tuple[bytes, str]:
+    """Response body plus a strong ETag derived from its bytes"""
+    body = dumps_json(obj)
+    return body, body_etag(body)
+
+
+class HistoryLog:
+    """Append-only history backend storing one daily snapshot per line.
+
+    Appends are a single ``O_APPEND`` write of one complete line followed by
+    ``fsync``, so a crash can at worst leave a partial trailing line. Readers
+    skip such a line and the next append truncates it before writing.
+    """
+
+    def __init__(self, path: str = DATA_FILE, legacy_path: str = LEGACY_DATA_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+
+    def exists(self) -> bool:
+        """Check whether the log (or a not-yet-migrated legacy file) exists"""
+        return os.path.exists(self.path) or os.path.exists(self.legacy_path)
+
+    def migrate_legacy(self) -> int:
+        """One-time conversion of the legacy JSON array file to JSON Lines.
+
+        Returns the number of migrated snapshots. The legacy file is renamed to
+        ``*.bak`` afterwards so the migration never runs twice.
+        """
+        if os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return 0
+
+        with open(self.legacy_path, "r") as f:
+            history = json.load(f)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            for entry in history:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.path)
+        os.replace(self.legacy_path, f"{self.legacy_path}.bak")
+        return len(history)
+
+    def _repair_tail(self, fd: int):
+        """Drop a partial trailing line left behind by an interrupted append"""
+        size = os.fstat(fd).st_size
+        if size == 0 or os.pread(fd, 1, size - 1) == b"\n":
+            return
+
+        offset = size
+        while offset > 0:
+            start = max(0, offset - TAIL_BLOCK_SIZE)
+            block = os.pread(fd, offset - start, start)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                os.ftruncate(fd, start + newline + 1)
+                return
+            offset = start
+        os.ftruncate(fd, 0)
+
+    def append(self, entry: Dict):
+        """Atomically append one snapshot to the log"""
+        self.migrate_legacy()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            self._repair_tail(fd)
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _parse_lines(lines: List[bytes]) -> List[Dict]:
+        """Decode complete lines, skipping blanks and torn writes"""
+        entries = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    def read_tail(self, n: int = 1) -> List[Dict]:
+        """Return the latest ``n`` snapshots (oldest first) by seeking from the end"""
+        self.migrate_legacy()
+        if n <= 0 or not os.path.exists(self.path):
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            blocks = []
+            newlines = 0
+            # The first buffered line may be cut by the block boundary, so n
+            # complete lines need n + 1 newlines
+            while offset > 0 and newlines <= n:
+                step = min(TAIL_BLOCK_SIZE, offset)
+                offset -= step
+                f.seek(offset)
+                block = f.read(step)
+                blocks.append(block)
+                newlines += block.count(b"\n")
+
+        lines = b"".join(reversed(blocks)).split(b"\n")
+        if offset > 0:
+            lines = lines[1:]  # first line is cut by the block boundary
+        return self._parse_lines(lines)[-n:]
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """Stream every snapshot from oldest to newest"""
+        self.migrate_legacy()
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as f:
+            for line in f:
+                yield from self._parse_lines([line])
+
+
+class HistoryStore:
+    """Keeps the latest history snapshot and its aggregates resident in memory.
+
+    The history file is only re-parsed when its (mtime, size) signature changes
+    or when a writer calls ``publish``/``invalidate``. The signature itself is
+    checked at most once every ``check_interval`` seconds, so steady-state reads
+    are a couple of attribute lookups. The API responses for a snapshot are
+    encoded once, when it is installed, and served as ready-made bytes.
+    """
+
+    def __init__(self, log: Optional[HistoryLog] = None, check_interval: float = 1.0):
+        self.log = log or HistoryLog()
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._signature = None
+        self._next_check = 0.0
+        # (latest snapshot, aggregates, encoded responses, previous day's
+        # snapshot) swapped as one reference so readers never mix snapshots
+        self._state = (None, None, {}, None)
+        self._loaded = False
+        self.reloads = 0
+        self._listeners: List[Callable[[Optional[Dict], Dict], None]] = []
+
+    def _file_signature(self) -> Optional[tuple]:
+        """Return the (mtime_ns, size) pair of the history file"""
+        try:
+            stat = os.stat(self.log.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_latest(self) -> Optional[Dict]:
+        """Return the last entry of the history log"""
+        tail = self.log.read_tail(1)
+        return tail[-1] if tail else None
+
+    def _read_previous(self, date: str) -> Optional[Dict]:
+        """Newest logged snapshot dated before ``date``"""
+        n = 2
+        while True:
+            tail = self.log.read_tail(n)
+            earlier = [entry for entry in tail if entry["date"] < date]
+            if earlier:
+                return earlier[-1]
+            if len(tail) < n:
+                return None
+            n *= 2  # same-day re-runs: look further back
+
+    @staticmethod
+    def top_gainer(entry: Dict, previous: Optional[Dict]) -> Optional[Dict]:
+        """Repository with the largest star gain since ``previous``"""
+        if not previous:
+            return None
+        before = {repo_key(repo): repo["stars"] for repo in previous["repositories"]}
+        gains = [
+            (repo["stars"] - before[repo_key(repo)], -repo["rank"], i)
+            for i, repo in enumerate(entry["repositories"])
+            if repo_key(repo) in before
+        ]
+        if not gains:
+            return None
+        gained, _, i = max(gains)
+        return {**entry["repositories"][i], "stars_gained": gained}
+
+    @classmethod
+    def compute_aggregates(
+        cls, entry: Optional[Dict], previous: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """Precompute the analytics summary for a snapshot"""
+        if not entry:
+            return None
+
+        repos = entry.get("repositories", [])
+        total_stars = sum(repo["stars"] for repo in repos)
+        avg_stars = total_stars / len(repos) if repos else 0
+
+        # Largest gain against the previous day (None without one)
+        top_gainer = cls.top_gainer(entry, previous)
+
+        return {
+            "total_repositories": len(repos),
+            "total_stars": total_stars,
+            "avg_stars": round(avg_stars, 2),
+            "top_gainer": top_gainer,
+            "last_updated": entry["date"],
+        }
+
+    @staticmethod
+    def _top_repos(entry: Dict, limit: int) -> List[Dict]:
+        return [
+            {field: repo.get(field) for field in REPOSITORY_FIELDS}
+            for repo in entry["repositories"][:limit]
+        ]
+
+    @classmethod
+    def _build_state(cls, entry: Optional[Dict], previous: Optional[Dict]) -> tuple:
+        """Aggregates and pre-encoded responses for a snapshot"""
+        aggregates = cls.compute_aggregates(entry, previous)
+        responses = {}
+        if entry:
+            responses[("top_repos", DEFAULT_TOP_LIMIT)] = encode_response(
+                cls._top_repos(entry, DEFAULT_TOP_LIMIT)
+            )
+            gainer = aggregates["top_gainer"]
+            responses["analytics"] = encode_response(
+                {
+                    "total_repositories": aggregates["total_repositories"],
+                    "avg_stars": aggregates["avg_stars"],
+                    "top_gainer": (
+                        {field: gainer.get(field) for field in GAINER_FIELDS}
+                        if gainer
+                        else None
+                    ),
+                    "last_updated": aggregates["last_updated"],
+                }
+            )
+        return entry, aggregates, responses, previous
+
+    def add_listener(self, callback: Callable[[Optional[Dict], Dict], None]):
+        """Call ``callback(previous, latest)`` whenever a new snapshot lands"""
+        self._listeners.append(callback)
+
+    def _notify(self, previous: Optional[Dict], latest: Optional[Dict]):
+        if latest is None or latest == previous:
+            return
+        for callback in self._listeners:
+            try:
+                callback(previous, latest)
+            except Exception as e:
+                print(f"History listener failed: {e}")
+
+    def _refresh_if_stale(self):
+        """Reload the snapshot if the file changed since the last check"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+
+        previous = latest = None
+        notify = False
+        with self._lock:
+            if now < self._next_check:
+                return
+
+            self.log.migrate_legacy()
+            signature = self._file_signature()
+            if signature != self._signature:
+                # The first load at startup is not news to anyone
+                notify = self._loaded
+                previous = self._state[0]
+                latest = self._read_latest() if signature else None
+                self._state = self._build_state(
+                    latest, self._read_previous(latest["date"]) if latest else None
+                )
+                self._signature = signature
+                self._loaded = True
+                self.reloads += 1
+
+            self._next_check = now + self.check_interval
+
+        # Outside the lock: listeners may read the store
+        if notify:
+            self._notify(previous, latest)
+
+    def get_latest(self) -> Optional[Dict]:
+        """Return the most recent snapshot, or None when there is no history"""
+        self._refresh_if_stale()
+        return self._state[0]
+
+    def get_repositories(self) -> List[Dict]:
+        """Return the repositories of the most recent snapshot"""
+        latest = self.get_latest()
+        return latest["repositories"] if latest else []
+
+    def get_aggregates(self) -> Optional[Dict]:
+        """Return the precomputed aggregates of the most recent snapshot"""
+        self._refresh_if_stale()
+        return self._state[1]
+
+    def get_top_repos_response(
+        self, limit: int = DEFAULT_TOP_LIMIT
+    ) -> Tuple[bytes, str]:
+        """Encoded ``/api/top-repos`` body and ETag for ``limit`` rows"""
+        self._refresh_if_stale()
+        latest, _, responses, _ = self._state
+        # Limits past the end give the same body; share one entry for them
+        limit = min(limit, len(latest["repositories"]) if latest else 0)
+        key = ("top_repos", limit)
+        cached = responses.get(key)
+        if cached is None:
+            # Other limits are encoded on first request, once per snapshot
+            cached = encode_response(self._top_repos(latest, limit) if latest else [])
+            responses[key] = cached
+        return cached
+
+    def get_analytics_response(self) -> Optional[Tuple[bytes, str]]:
+        """Encoded ``/api/analytics`` body and ETag, None without history"""
+        self._refresh_if_stale()
+        return self._state[2].get("analytics")
+
+    def publish(self, entry: Dict):
+        """Install a freshly written snapshot without re-reading the file"""
+        with self._lock:
+            previous, prior = self._state[0], self._state[3]
+            if previous and previous["date"] < entry["date"]:
+                prior = previous
+            elif not previous or previous["date"] > entry["date"]:
+                prior = self._read_previous(entry["date"])
+            self._state = self._build_state(entry, prior)
+            self._loaded = True
+            self._signature = self._file_signature()
+            self._next_check = time.monotonic() + self.check_interval
+        self._notify(previous, entry)
+
+    def invalidate(self):
+        """Force the next read to re-check the history file"""
+        with self._lock:
+            self._signature = None
+            self._next_check = 0.0
+
+
+# Global log and store shared by the API and the update scripts
+history_log = HistoryLog()
+history_store = HistoryStore(history_log)
@@ -0,0 +1,163 @@
+"""
+HTTP Response Cache for StellarNexus
+On-disk ETag / Last-Modified cache for conditional GitHub API requests
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+HTTP_CACHE_DIR = "data/cache/http"
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+class ConditionalCache:
+    """Size-bounded LRU cache of response bodies and their validators.
+
+    Each entry is a ``<key>.json`` metadata file (ETag, Last-Modified, URL)
+    next to a ``<key>.body`` file. Recency is tracked in memory and mirrored
+    to the body file's mtime, so the LRU order survives restarts.
+    """
+
+    def __init__(
+        self, directory: str = HTTP_CACHE_DIR, max_bytes: int = HTTP_CACHE_MAX_BYTES
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._loaded = False
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """Stable key for a URL plus its (order-independent) query parameters"""
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return f"{base}.json", f"{base}.body"
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files on disk (oldest first)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.isdir(self.directory):
+            return
+
+        entries = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".body"):
+                continue
+            stat = os.stat(os.path.join(self.directory, filename))
+            entries.append((stat.st_mtime, filename[: -len(".body")], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._size += size
+
+    def _remove(self, key: str):
+        self._size -= self._entries.pop(key, 0)
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Return the stored validators (no body) for ``key``"""
+        with self._lock:
+            self._load_index()
+            if key not in self._entries:
+                return None
+            meta_path, _ = self._paths(key)
+            try:
+                with open(meta_path, "r") as f:
+                    return json.load(f)
+            except (FileNotFoundError, ValueError):
+                self._remove(key)
+                return None
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """Headers that turn the request into a conditional one"""
+        meta = self.lookup(key)
+        if not meta:
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def read_body(self, key: str) -> Optional[bytes]:
+        """Serve a cached body after a 304 and mark it most recently used"""
+        with self._lock:
+            self._load_index()
+            _, body_path = self._paths(key)
+            try:
+                with open(body_path, "rb") as f:
+                    body = f.read()
+            except FileNotFoundError:
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            os.utime(body_path)
+            self.stats["hits"] += 1
+            return body
+
+    def record_miss(self):
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def store(
+        self,
+        key: str,
+        url: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        """Persist a 200 response that carries at least one validator"""
+        if not etag and not last_modified:
+            return
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._load_index()
+            os.makedirs(self.directory, exist_ok=True)
+            meta_path, body_path = self._paths(key)
+
+            tmp_body = f"{body_path}.tmp"
+            with open(tmp_body, "wb") as f:
+                f.write(body)
+            os.replace(tmp_body, body_path)
+
+            tmp_meta = f"{meta_path}.tmp"
+            with open(tmp_meta, "w") as f:
+                json.dump({"url": url, "etag": etag, "last_modified": last_modified}, f)
+            os.replace(tmp_meta, meta_path)
+
+            self._size -= self._entries.pop(key, 0)
+            self._entries[key] = len(body)
+            self._size += len(body)
+            self.stats["stores"] += 1
+
+            while self._size > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+
+    def hit_ratio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
@@ -63,18 +63,20 @@ LEFT JOIN daily_stats ds ON r.id = ds.repository_id
     AND ds.date = CURRENT_DATE
 ORDER BY r.stars_count DESC;
 
--- Create function to update repository
+-- Fill in stars gained since the repository's previous stored day when the
+-- writer leaves it NULL (the application's batched upsert supplies it)
 CREATE OR REPLACE FUNCTION update_repository_stats()
 RETURNS TRIGGER AS $$
 BEGIN
-    -- Calculate stars gained compared to yesterday
-    IF OLD.stars_count IS NOT NULL THEN
-        NEW.stars_gained = NEW.stars_count - OLD.stars_count;
+    IF NEW.stars_gained IS NULL THEN
+        NEW.stars_gained = NEW.stars_count - COALESCE(
+            (SELECT ds.stars_count FROM daily_stats ds
+             WHERE ds.repository_id = NEW.repository_id AND ds.date < NEW.date
+             ORDER BY ds.date DESC LIMIT 1),
+            NEW.stars_count
+        );
     END IF;
 
-    -- Update the updated timestamp
-    NEW.updated = NOW();
-
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
@@ -0,0 +1,263 @@
+"""
+Background Jobs for StellarNexus
+Thread-pool job runner with status tracking and single-flight submission
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+try:
+    from scripts.shared_cache import decode_value, encode_value, shared_cache
+except ImportError:  # executed directly from the scripts directory
+    from shared_cache import decode_value, encode_value, shared_cache
+
+# Finished jobs kept around for status lookups
+MAX_JOB_HISTORY = 100
+# Seconds a job's status stays readable by the other workers
+JOB_STATE_TTL = 86400
+
+
+def _state_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _cancel_key(job_id: str) -> str:
+    return f"job-cancel:{job_id}"
+
+
+class JobCancelled(Exception):
+    """Raised by job functions that notice their cancellation request"""
+
+
+class Job:
+    """A unit of background work and its lifecycle timestamps"""
+
+    def __init__(
+        self,
+        kind: str,
+        dedupe_key: Optional[str] = None,
+        shared=None,
+        cancellable: bool = False,
+    ):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.dedupe_key = dedupe_key
+        self.status = "queued"
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.duration_seconds = None
+        self.result = None
+        self.error = None
+        self.progress: Dict = {}
+        self.cancel_event = threading.Event()
+        self.shared = shared
+        # Only jobs that poll ``cancel_requested`` can stop once running
+        self.cancellable = cancellable
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    @property
+    def cancel_requested(self) -> bool:
+        # Another worker may have received the cancel request
+        if not self.cancel_event.is_set() and self.shared is not None:
+            if self.shared.get(_cancel_key(self.id)) is not None:
+                self.cancel_event.set()
+                if self.status == "running":
+                    self.status = "cancelling"
+                    self.publish()
+        return self.cancel_event.is_set()
+
+    def publish(self):
+        """Make the current status visible to every worker"""
+        if self.shared is not None:
+            body = encode_value(self.to_dict())
+            self.shared.set(_state_key(self.id), body, JOB_STATE_TTL)
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": self.duration_seconds,
+            "result": self.result,
+            "error": self.error,
+            "progress": self.progress,
+            "cancellable": self.cancellable,
+        }
+
+
+class JobManager:
+    """Runs callables on worker threads, off the request event loop.
+
+    Submissions sharing a ``dedupe_key`` collapse into the job already queued
+    or running under that key, so a burst of identical requests triggers a
+    single run. Jobs submitted with ``pass_job=True`` receive their ``Job``
+    as a ``job`` keyword to report ``progress`` and poll ``cancel_requested``.
+
+    With a ``shared`` cache every status change is published there, so any
+    worker can report on (or cancel) a job that runs in another one. The
+    thread pool starts on first use, never before a fork.
+    """
+
+    def __init__(self, max_workers: int = 2, shared=None):
+        self.max_workers = max_workers
+        self.shared = shared
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._inflight: Dict[str, Job] = {}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            # A forked child inherits the object but not the threads
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="stellar-job"
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable,
+        *args,
+        dedupe_key: Optional[str] = None,
+        pass_job: bool = False,
+    ) -> Job:
+        """Queue ``func(*args)`` and return its job (or the in-flight duplicate)"""
+        with self._lock:
+            if dedupe_key is not None:
+                existing = self._inflight.get(dedupe_key)
+                if existing is not None and not existing.done:
+                    return existing
+
+            job = Job(kind, dedupe_key, self.shared, cancellable=pass_job)
+            self._jobs[job.id] = job
+            if dedupe_key is not None:
+                self._inflight[dedupe_key] = job
+            self._trim()
+
+        job.publish()
+        self._pool().submit(self._run, job, func, args, pass_job)
+        return job
+
+    def _trim(self):
+        """Drop the oldest finished jobs beyond the history limit"""
+        excess = len(self._jobs) - MAX_JOB_HISTORY
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].done:
+                del self._jobs[job_id]
+                excess -= 1
+
+    def _release(self, job: Job):
+        with self._lock:
+            if self._inflight.get(job.dedupe_key) is job:
+                del self._inflight[job.dedupe_key]
+
+    def _run(self, job: Job, func: Callable, args: tuple, pass_job: bool):
+        with self._lock:
+            if job.cancel_requested:
+                # Cancelled while still queued: never started
+                if not job.done:
+                    job.status = "cancelled"
+                    job.finished_at = datetime.now().isoformat()
+                cancelled = True
+            else:
+                cancelled = False
+                job.status = "running"
+                job.started_at = datetime.now().isoformat()
+        if cancelled:
+            self._release(job)
+            job.publish()
+            return
+        job.publish()
+
+        start = time.perf_counter()
+        try:
+            job.result = func(*args, job=job) if pass_job else func(*args)
+            job.status = "succeeded"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.duration_seconds = round(time.perf_counter() - start, 3)
+            job.finished_at = datetime.now().isoformat()
+            self._release(job)
+            job.publish()
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """Request cancellation of a queued or running job; returns its status.
+
+        Queued jobs are cancelled immediately and never start; running jobs
+        report ``cancelling`` until they stop at a ``cancel_requested`` check.
+        A running job that is not ``cancellable`` is left alone. A job owned
+        by another worker is flagged in the shared cache for its owner to
+        pick up.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and self._stoppable(job.to_dict()):
+                job.cancel_event.set()
+                if job.status == "queued":
+                    job.status = "cancelled"
+                    job.finished_at = datetime.now().isoformat()
+                elif job.status == "running":
+                    job.status = "cancelling"
+                if self._inflight.get(job.dedupe_key) is job:
+                    del self._inflight[job.dedupe_key]
+        if job is not None:
+            job.publish()
+            return job.to_dict()
+
+        status = self.status(job_id)
+        if status is not None and self._stoppable(status):
+            self.shared.set(_cancel_key(job_id), b"1", JOB_STATE_TTL)
+            if status["status"] == "running":
+                # Only the owner publishes the record, so it can't be overwritten
+                # with "cancelling" after the job has already stopped
+                status = {**status, "status": "cancelling"}
+        return status
+
+    @staticmethod
+    def _stoppable(status: Dict) -> bool:
+        if status["status"] == "queued":
+            return True
+        return status["status"] == "running" and status.get("cancellable", False)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Status of a job run by this worker or, via the shared cache, another"""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.shared is None:
+            return None
+        body = self.shared.get(_state_key(job_id))
+        return decode_value(body) if body is not None else None
+
+
+# Global job managers used by the API; training runs one job at a time so
+# further requests queue up behind it
+job_manager = JobManager(shared=shared_cache)
+training_jobs = JobManager(max_workers=1, shared=shared_cache)
@@ -1,46 +1,75 @@
-import requests
-import json
 from datetime import datetime
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from scripts.chart_render import render_chart, render_in_subprocess
+    from scripts.database import STORAGE_BACKEND, ingest_snapshot
+    from scripts.enrichment import enrich_repositories, targets_from_entry
+    from scripts.github_search import GitHubSearchFetcher
+    from scripts.history_store import history_log, history_store, repo_key
+    from scripts.http_cache import ConditionalCache
+    from scripts.pipeline import PIPELINE_DIR, Checkpoint, Pipeline, PipelineError
+    from scripts.rollups import rollup_store
+    from scripts.shared_cache import distributed_lock, shared_cache
+    from scripts.snapshot_archive import ARCHIVE_FIELDS, snapshot_archive
+    from scripts.timeseries_store import star_matrix
+except ImportError:  # executed directly as ``python scripts/main.py``
+    from chart_render import render_chart, render_in_subprocess
+    from database import STORAGE_BACKEND, ingest_snapshot
+    from enrichment import enrich_repositories, targets_from_entry
+    from github_search import GitHubSearchFetcher
+    from history_store import history_log, history_store, repo_key
+    from http_cache import ConditionalCache
+    from pipeline import PIPELINE_DIR, Checkpoint, Pipeline, PipelineError
+    from rollups import rollup_store
+    from shared_cache import distributed_lock, shared_cache
+    from snapshot_archive import ARCHIVE_FIELDS, snapshot_archive
+    from timeseries_store import star_matrix
 
 # Configuration
 GH_TOKEN = os.getenv("GH_TOKEN")
-HEADERS = {"Authorization": f"token {GH_TOKEN}"} if GH_TOKEN else {}
-DATA_FILE = "data/top_repos_history.json"
-CHART_FILE = "docs/assets/stars_trend.png"
-
-
-def fetch_top_repos():
-    """Fetches top 10 repos from GitHub API."""
-    url = (
-        "https://api.github.com/search/repositories"
-        "?q=stars:>0&sort=stars&order=desc&per_page=10"
-    )
-    response = requests.get(url, headers=HEADERS)
-    response.raise_for_status()
-    data = response.json()
-    return data["items"]
-
+# Number of repositories tracked per snapshot (the Search API caps at 1000)
+MAX_REPOSITORIES = int(os.getenv("MAX_REPOSITORIES", "10"))
+# Rows shown in the README ranking table
+DISPLAY_TOP = 10
+# Top repositories crawled for per-repo ML metadata after each update (0: off)
+ENRICH_REPOSITORIES = int(os.getenv("ENRICH_REPOSITORIES", "0"))
+# Upper bound on one refresh; a crashed holder's lock expires after it
+REFRESH_LOCK_TIMEOUT = 600
+# Search item fields carried through the pipeline: the archive's plus SQL columns
+PIPELINE_FIELDS = ARCHIVE_FIELDS + [
+    "updated_at",
+    "pushed_at",
+    "size",
+    "archived",
+    "disabled",
+]
+
+search_fetcher = GitHubSearchFetcher(token=GH_TOKEN, cache=ConditionalCache())
+
+
+def fetch_top_repos(limit=MAX_REPOSITORIES):
+    """Fetches the top ``limit`` repos (up to 1000) from GitHub API."""
+    try:
+        return search_fetcher.fetch_top(limit)
+    except Exception as e:
+        print(f"Error fetching repositories: {e}")
+        return None
 
-def update_history(items):
-    """Appends a new daily snapshot to the history JSON file."""
-    date_today = datetime.now().strftime("%Y-%m-%d")
 
-    # Load existing history or create empty list
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            history = json.load(f)
-    else:
-        history = []
+def update_history(items, top_n=MAX_REPOSITORIES):
+    """Appends a new daily snapshot to the history JSON Lines log."""
+    now = datetime.now()
+    date_today = now.strftime("%Y-%m-%d")
 
     # Create today's entry
     today_entry = {"date": date_today, "repositories": []}
 
-    for i, repo in enumerate(items[:10], 1):  # Top 10
+    for i, repo in enumerate(items[:top_n], 1):
         repo_data = {
             "name": repo["name"],
+            "full_name": repo["full_name"],
             "stars": repo["stargazers_count"],
             "rank": i,
             "url": repo["html_url"],
@@ -48,65 +77,49 @@ def update_history(items):
         }
         today_entry["repositories"].append(repo_data)
 
-    # Append to history
-    history.append(today_entry)
+    # Catch the columnar store up with the log (no-op once it is in step)
+    star_matrix.sync(history_log)
+
+    # Append to history (a single atomic line write)
+    history_log.append(today_entry)
 
-    # Save back to file
-    with open(DATA_FILE, "w") as f:
-        json.dump(history, f, indent=2)
+    # One column write per day in the columnar store
+    star_matrix.append_snapshot(today_entry)
+
+    # Hand the new snapshot to the API cache instead of letting it re-parse
+    history_store.publish(today_entry)
+
+    # Catalog the full fetched set so the ML models see the new snapshot
+    snapshot_archive.write(items)
+
+    # Batched upsert into repositories/daily_stats when the API reads from SQL
+    if STORAGE_BACKEND == "database":
+        ingest_snapshot(items, now.date())
+        # Workers and replicas cache the SQL-backed responses; drop them
+        shared_cache.delete_prefix("snapshot:")
 
     return today_entry
 
 
-def generate_chart():
-    """Reads historical data and generates a line chart of star growth."""
-    if not os.path.exists(DATA_FILE):
-        print("No historical data found. Skipping chart generation.")
-        return
+def generate_chart(today_data=None):
+    """Renders the star growth chart (skipped when its data is unchanged)."""
+    return render_chart(entry=today_data)
 
-    with open(DATA_FILE, "r") as f:
-        history = json.load(f)
 
-    if not history:
-        print("No data to plot.")
-        return
+def update_rollups(today_data=None):
+    """Rolls the new day into the weekly and monthly tiers."""
+    rollup_store.sync()
 
-    # Prepare data for plotting
-    dates = []
-    repo_data = {}
-
-    for entry in history:
-        date = entry["date"]
-        dates.append(date)
-        for repo in entry["repositories"]:
-            name = repo["name"]
-            stars = repo["stars"]
-            if name not in repo_data:
-                repo_data[name] = []
-            repo_data[name].append(stars)
-
-    # Create DataFrame
-    df_data = {"date": dates}
-    for name, stars_list in repo_data.items():
-        df_data[name] = stars_list
-
-    df = pd.DataFrame(df_data)
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.set_index("date")
-
-    # Plot
-    plt.figure(figsize=(12, 8))
-    for column in df.columns:
-        plt.plot(df.index, df[column], label=column, marker="o")
-
-    plt.title("GitHub Top Repositories Star Growth")
-    plt.xlabel("Date")
-    plt.ylabel("Stars")
-    plt.legend(bbox_to_anchor=(1.05, 1), loc="upper left")
-    plt.tight_layout()
-    plt.savefig(CHART_FILE)
-    plt.close()
-    print(f"Chart saved to {CHART_FILE}")
+
+def enrich_top_repos(today_data):
+    """Crawls stargazer, commit, release and contributor data for the top repos."""
+    targets = targets_from_entry(today_data)[:ENRICH_REPOSITORIES]
+    summary = enrich_repositories(targets, token=GH_TOKEN)
+    print(
+        f"Enriched {summary['enriched']} repositories "
+        f"({summary['skipped']} fresh, {len(summary['failed'])} failed)"
+    )
+    return summary
 
 
 def update_readme(today_data):
@@ -121,25 +134,15 @@ def update_readme(today_data):
 
     # Calculate star gains (if previous data exists)
     star_gains = {}
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            history = json.load(f)
-        if len(history) > 1:
-            prev_entry = history[-2]  # Previous day
-            prev_stars = {
-                repo["name"]: repo["stars"] for repo in prev_entry["repositories"]
-            }
-            for repo in today_data["repositories"]:
-                name = repo["name"]
-                current = repo["stars"]
-                previous = prev_stars.get(name, current)
-                star_gains[name] = current - previous
+    if history_log.exists():
+        star_matrix.sync(history_log)
+        star_gains = star_matrix.deltas(1)
 
     # Generate table
     table_lines = ["| Rank | Repository | Stars | Stars Gained | Description |"]
     table_lines.append("|------|------------|-------|--------------|-------------|")
 
-    for repo in today_data["repositories"]:
+    for repo in today_data["repositories"][:DISPLAY_TOP]:
         name = repo["name"]
         stars = repo["stars"]
         rank = repo["rank"]
@@ -149,7 +152,7 @@ def update_readme(today_data):
             if len(repo["description"]) > 100
             else repo["description"]
         )
-        gain = star_gains.get(name, 0)
+        gain = star_gains.get(repo_key(repo), 0)
         table_lines.append(
             f"| {rank} | [{name}]({url}) | {stars:,} | +{gain} | {desc} |"
         )
@@ -170,13 +173,164 @@ def update_readme(today_data):
     print("README.md updated with current rankings.")
 
 
+def normalize_item(item: Dict) -> Dict:
+    """Project a search item down to the fields the pipeline stores"""
+    return {field: item[field] for field in PIPELINE_FIELDS if field in item}
+
+
+def fetch_stage(checkpoint: Checkpoint, limit: int):
+    """Search pages as they arrive; pages spooled by a failed run are replayed"""
+
+    def stage(_):
+        if checkpoint.get("persisted"):
+            return
+        done = checkpoint.get("pages", [])
+        for page in done:
+            yield page, checkpoint.read_spool(f"page-{page}")
+
+        pages = checkpoint.get("page_count")
+        for page, payload in search_fetcher.iter_pages(limit, pages=pages, skip=done):
+            if pages is None:
+                pages = search_fetcher.page_count(payload, limit)
+                checkpoint.save(page_count=pages)
+            yield page, payload.get("items", [])
+
+    return stage
+
+
+def normalize_stage(pages):
+    for page, items in pages:
+        yield page, [normalize_item(item) for item in items]
+
+
+def persist_stage(checkpoint: Checkpoint, limit: int):
+    """Spool each page as it lands, then record the assembled snapshot"""
+
+    def stage(pages):
+        received = {}
+        for page, items in pages:
+            if page not in checkpoint.get("pages", []):
+                checkpoint.write_spool(f"page-{page}", items)
+                checkpoint.mark("pages", page)
+            received[page] = items
+
+        if checkpoint.get("persisted"):
+            yield checkpoint.read_spool("entry")
+            return
+        if not received:
+            raise RuntimeError("No repositories fetched")
+
+        # Pages land out of order and rankings shift between them
+        items, seen = [], set()
+        for page in sorted(received):
+            for item in received[page]:
+                if item["id"] not in seen:
+                    seen.add(item["id"])
+                    items.append(item)
+
+        today_data = update_history(items[:limit], limit)
+        checkpoint.write_spool("entry", today_data)
+        checkpoint.save(persisted=True)
+        yield today_data
+
+    return stage
+
+
+def derive_stage(checkpoint: Checkpoint, outputs: List[Tuple[str, Callable]]):
+    """Build each derived output from the in-memory snapshot, once per run"""
+
+    def stage(entries):
+        for today_data in entries:
+            for name, build in outputs:
+                if name in checkpoint.get("derived", []):
+                    continue
+                build(today_data)
+                checkpoint.mark("derived", name)
+                yield name
+
+    return stage
+
+
+def run_pipeline(
+    limit: int = MAX_REPOSITORIES,
+    outputs: Optional[List[Tuple[str, Callable]]] = None,
+    directory: str = PIPELINE_DIR,
+):
+    """Stream a fetch through normalize, persist and derive; returns a summary.
+
+    Pages are normalized and spooled while later ones are still in flight.
+    A run that fails part-way leaves its checkpoint behind, and rerunning
+    the same day skips the pages, snapshot and outputs it already has.
+    """
+    if outputs is None:
+        outputs = [
+            ("rollups", update_rollups),
+            ("chart", generate_chart),
+            ("readme", update_readme),
+        ]
+        if ENRICH_REPOSITORIES > 0:
+            outputs.append(("enrichment", enrich_top_repos))
+    run_id = datetime.now().strftime("%Y-%m-%d")
+    checkpoint = Checkpoint(run_id, directory)
+    if checkpoint.resumed:
+        print(f"Resuming the {run_id} update from its checkpoint")
+
+    pipeline = Pipeline(
+        [
+            ("fetch", fetch_stage(checkpoint, limit)),
+            ("normalize", normalize_stage),
+            ("persist", persist_stage(checkpoint, limit)),
+            ("derive", derive_stage(checkpoint, outputs)),
+        ]
+    )
+    derived = pipeline.run()
+    today_data = checkpoint.read_spool("entry")
+    checkpoint.complete()
+    return {
+        "date": today_data["date"],
+        "repositories": len(today_data["repositories"]),
+        "derived": derived,
+        "stages": pipeline.report(),
+    }
+
+
+def print_stage_report(stages: List[Dict]):
+    for stats in stages:
+        print(
+            f"  {stats['stage']:<10} {stats['status']:<10} "
+            f"in={stats['items_in']:<5} out={stats['items_out']:<5} "
+            f"{stats['seconds']:.3f}s (+{stats['wait_seconds']:.3f}s waiting)"
+        )
+
+
+def run_refresh():
+    """Fetch, record and chart a fresh snapshot; returns a short summary.
+
+    Only one worker or replica refreshes at a time; the others skip.
+    """
+    with distributed_lock(shared_cache, "refresh", REFRESH_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            return {"skipped": True, "message": "Refresh already in progress"}
+        return _refresh()
+
+
+def _refresh():
+    # Keep matplotlib out of the serving process
+    return run_pipeline(
+        outputs=[
+            ("rollups", update_rollups),
+            ("chart", lambda today_data: render_in_subprocess()),
+        ]
+    )
+
+
 if __name__ == "__main__":
-    date_today = datetime.now().strftime("%Y-%m-%d")
     try:
-        top_repos = fetch_top_repos()
-        today_data = update_history(top_repos)
-        generate_chart()
-        update_readme(today_data)
+        summary = run_pipeline()
+        print_stage_report(summary["stages"])
         print("Data update successful!")
+    except PipelineError as e:
+        print_stage_report(e.stats)
+        print(f"Error: {e}")
     except Exception as e:
         print(f"Error: {e}")
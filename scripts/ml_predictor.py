@@ -10,14 +10,365 @@ from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.preprocessing import StandardScaler
+from collections import OrderedDict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
 from datetime import datetime, timedelta
+import hashlib
 import json
+import multiprocessing
 import os
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 import warnings
 
+try:
+    from scripts.enrichment import EnrichmentStore
+    from scripts.features import (
+        ENRICHMENT_COLUMNS,
+        FEATURE_COLUMNS,
+        MODEL_COLUMNS,
+        feature_pipeline,
+    )
+    from scripts.jobs import JobCancelled, training_jobs
+    from scripts.repo_index import RepositoryIndex
+    from scripts.shared_cache import (
+        decode_value,
+        distributed_lock,
+        encode_value,
+        shared_cache,
+    )
+    from scripts.snapshot_archive import SnapshotArchive
+except ImportError:  # executed directly as ``python scripts/ml_predictor.py``
+    from enrichment import EnrichmentStore
+    from features import (
+        ENRICHMENT_COLUMNS,
+        FEATURE_COLUMNS,
+        MODEL_COLUMNS,
+        feature_pipeline,
+    )
+    from jobs import JobCancelled, training_jobs
+    from repo_index import RepositoryIndex
+    from shared_cache import decode_value, distributed_lock, encode_value, shared_cache
+    from snapshot_archive import SnapshotArchive
+
 warnings.filterwarnings("ignore")
 
+# Prediction results cached per (snapshot, model version, params)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "64"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+
+
+def data_fingerprint(X: pd.DataFrame, y: pd.Series) -> str:
+    """Content hash of a training set, stored in the model manifest"""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def build_candidate_models(n_jobs: Optional[int] = None) -> Dict:
+    """Fresh, unfitted candidate models; ``n_jobs`` parallelises the forest"""
+    return {
+        "RandomForest": RandomForestRegressor(
+            n_estimators=100, random_state=42, n_jobs=n_jobs
+        ),
+        "GradientBoosting": GradientBoostingRegressor(
+            n_estimators=100, random_state=42
+        ),
+        "LinearRegression": LinearRegression(),
+    }
+
+
+def _fit_candidate(name, model, X_train, y_train, X_test, y_test) -> Tuple:
+    """Fit and score one candidate; module-level so process pools can run it"""
+    start = time.perf_counter()
+
+    # Train model
+    model.fit(X_train, y_train)
+
+    # Predictions
+    y_pred = model.predict(X_test)
+
+    # Metrics
+    metrics = {
+        "mae": mean_absolute_error(y_test, y_pred),
+        "mse": mean_squared_error(y_test, y_pred),
+        "r2": r2_score(y_test, y_pred),
+        "predictions": y_pred[:5].tolist(),  # Sample predictions
+        "actual": y_test[:5].tolist(),
+        "fit_seconds": round(time.perf_counter() - start, 3),
+    }
+    return name, model, metrics
+
+
+class ModelRegistry:
+    """Versioned store of trained pipelines (scaler + model) with manifests.
+
+    Each version lives in ``<directory>/<version>/`` as ``pipeline.joblib``
+    plus ``manifest.json`` (metrics, feature list, data fingerprint,
+    timestamp). ``ACTIVE`` names the version in use. The active pipeline is
+    kept resident and swapped as a single reference, so requests never see
+    a half-loaded model; other processes pick up a new ``ACTIVE`` pointer
+    within ``check_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        mmap_mode: Optional[str] = "r",
+        check_interval: float = 5.0,
+    ):
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._active = None  # (version, pipeline dict, manifest)
+        self._pointer_signature = None
+        self._next_check = 0.0
+
+    @property
+    def pointer_path(self) -> str:
+        return os.path.join(self.directory, "ACTIVE")
+
+    def _pointer(self) -> Tuple[Optional[str], Optional[tuple]]:
+        """Read the active version name and the pointer file's signature"""
+        try:
+            stat = os.stat(self.pointer_path)
+            with open(self.pointer_path, "r") as f:
+                return f.read().strip() or None, (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None, None
+
+    def _load_version(self, version: str) -> Tuple[Dict, Dict]:
+        """Load a pipeline (memory-mapping its arrays) and its manifest"""
+        import joblib
+
+        version_dir = os.path.join(self.directory, version)
+        with open(os.path.join(version_dir, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+        pipeline = joblib.load(
+            os.path.join(version_dir, "pipeline.joblib"), mmap_mode=self.mmap_mode
+        )
+        return pipeline, manifest
+
+    def register(
+        self,
+        name: str,
+        scaler,
+        model,
+        metrics: Dict,
+        features: List[str],
+        fingerprint: str,
+        activate: bool = True,
+    ) -> str:
+        """Persist a trained pipeline as a new version (and activate it)"""
+        import joblib
+
+        version = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{name}"
+        version_dir = os.path.join(self.directory, version)
+        os.makedirs(version_dir, exist_ok=True)
+
+        pipeline = {"scaler": scaler, "model": model, "features": list(features)}
+        # Uncompressed so large forests can be memory-mapped on load
+        joblib.dump(pipeline, os.path.join(version_dir, "pipeline.joblib"))
+
+        manifest = {
+            "version": version,
+            "model": name,
+            "metrics": metrics,
+            "features": list(features),
+            "data_fingerprint": fingerprint,
+            "trained_at": datetime.now().isoformat(),
+        }
+        with open(os.path.join(version_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        if activate:
+            self._activate(version, pipeline, manifest)
+        return version
+
+    def _activate(self, version: str, pipeline: Dict, manifest: Dict):
+        tmp_path = f"{self.pointer_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, self.pointer_path)
+
+        with self._lock:
+            self._active = (version, pipeline, manifest)
+            _, self._pointer_signature = self._pointer()
+            self._next_check = time.monotonic() + self.check_interval
+
+    def activate(self, version: str):
+        """Make an existing version the active one"""
+        pipeline, manifest = self._load_version(version)
+        self._activate(version, pipeline, manifest)
+
+    def get_active(self) -> Optional[Tuple[str, Dict, Dict]]:
+        """Return (version, pipeline, manifest) of the resident active model"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._active
+
+        with self._lock:
+            if now >= self._next_check:
+                version, signature = self._pointer()
+                if signature != self._pointer_signature:
+                    if version is None:
+                        self._active = None
+                    elif self._active is None or self._active[0] != version:
+                        pipeline, manifest = self._load_version(version)
+                        self._active = (version, pipeline, manifest)
+                    self._pointer_signature = signature
+                self._next_check = now + self.check_interval
+            return self._active
+
+    def list_versions(self) -> List[Dict]:
+        """Manifests of every registered version, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+
+        manifests = []
+        for entry in sorted(os.listdir(self.directory)):
+            manifest_path = os.path.join(self.directory, entry, "manifest.json")
+            if os.path.exists(manifest_path):
+                with open(manifest_path, "r") as f:
+                    manifests.append(json.load(f))
+        return manifests
+
+
+class PredictionCache:
+    """LRU cache of prediction results with a TTL and single-flight misses.
+
+    Keys are built by the predictor from (result kind, snapshot fingerprint,
+    model version, params), so a new snapshot or model naturally misses;
+    ``invalidate`` additionally drops everything when training or a refresh
+    completes. Concurrent misses on one key wait for a single computation.
+
+    With a ``shared`` cache (see shared_cache.py) local misses are looked up
+    there before computing, and computed results are written back, so other
+    workers and replicas reuse them. Its keys need no invalidation: they
+    already name the snapshot and model.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 64,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        shared=None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Tuple[float, object]]" = OrderedDict()
+        self._inflight: Dict[tuple, Future] = {}
+        self._generation = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "shared_hits": 0,
+            "computes": 0,
+            "compute_seconds": 0.0,
+        }
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], object]):
+        """Cached value for ``key``, computing it at most once at a time"""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and self.clock() < cached[0]:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached[1]
+
+            self.stats["misses"] += 1
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                owner, generation = True, self._generation
+            else:
+                owner = False
+
+        if not owner:
+            return pending.result()
+
+        start = time.perf_counter()
+        try:
+            value, computed = self._shared_get(key), False
+            if value is None:
+                value, computed = compute(), True
+                self._shared_set(key, value)
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            if computed:
+                self.stats["computes"] += 1
+                self.stats["compute_seconds"] += time.perf_counter() - start
+            else:
+                self.stats["shared_hits"] += 1
+            self._inflight.pop(key, None)
+            # Results computed across an invalidation may be stale: don't keep
+            if generation == self._generation:
+                self._entries[key] = (self.clock() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        pending.set_result(value)
+        return value
+
+    @staticmethod
+    def shared_key(key: tuple) -> str:
+        digest = hashlib.sha1(json.dumps(key, default=str).encode()).hexdigest()
+        return f"prediction:{key[0]}:{digest}"
+
+    def _shared_get(self, key: tuple):
+        if self.shared is None:
+            return None
+        data = self.shared.get(self.shared_key(key))
+        return decode_value(data) if data is not None else None
+
+    def _shared_set(self, key: tuple, value):
+        if self.shared is None:
+            return
+        try:
+            data = encode_value(value)
+        except (TypeError, ValueError) as e:
+            print(f"Prediction not shareable: {e}")
+            return
+        self.shared.set(self.shared_key(key), data, self.ttl)
+
+    def invalidate(self):
+        """Drop every locally cached result"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.stats["invalidations"] += 1
+
+    def metrics(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        computed = self.stats["computes"] or 1
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "avg_compute_seconds": round(self.stats["compute_seconds"] / computed, 6),
+        }
+
 
 class GitHubPredictor:
     """AI-powered predictor for GitHub repository growth"""
@@ -25,7 +376,17 @@ class GitHubPredictor:
     def __init__(self, data_path: str = "data"):
         self.data_path = data_path
         self.models = {}
-        self.scaler = StandardScaler()
+        self.registry = ModelRegistry(f"{data_path}/models")
+        self.snapshots = SnapshotArchive(f"{data_path}/snapshots")
+        self._repo_index = None
+        self.prediction_cache = PredictionCache(
+            max_entries=PREDICTION_CACHE_SIZE,
+            ttl=PREDICTION_CACHE_TTL,
+            shared=shared_cache,
+        )
+        self.features = feature_pipeline
+        self.enrichment = EnrichmentStore(f"{data_path}/enrichment/enrichment.jsonl")
+        self._enrichment_frame = (None, None)
         self.ensure_data_directory()
 
     def ensure_data_directory(self):
@@ -33,104 +394,122 @@ class GitHubPredictor:
         os.makedirs(self.data_path, exist_ok=True)
         os.makedirs(f"{self.data_path}/predictions", exist_ok=True)
 
-    def load_historical_data(self) -> pd.DataFrame:
-        """Load and preprocess historical repository data"""
-        try:
-            # Load current data
-            with open(f"{self.data_path}/github_top_20250907_124243.json", "r") as f:
-                current_data = json.load(f)
-
-            # Extract items from the API response
-            if "items" in current_data:
-                current_repos = current_data["items"]
-            else:
-                current_repos = current_data
+    def snapshot_catalog(self) -> SnapshotArchive:
+        """Catalog of archived snapshots, seeded from raw dumps on first use"""
+        if not self.snapshots.manifest():
+            self.snapshots.import_legacy(self.data_path)
+        return self.snapshots
+
+    def repository_index(self) -> RepositoryIndex:
+        """Lookup index over the newest snapshot, created on first use"""
+        if self._repo_index is None:
+            self._repo_index = RepositoryIndex(self.snapshot_catalog())
+        return self._repo_index
+
+    def enrichment_frame(self) -> Optional[pd.DataFrame]:
+        """Crawled per-repo columns indexed by full name (None before a crawl)"""
+        records = self.enrichment.load()
+        if self._enrichment_frame[0] is not records:
+            frame = None
+            if records:
+                frame = pd.DataFrame.from_dict(records, orient="index").reindex(
+                    columns=ENRICHMENT_COLUMNS
+                )
+            self._enrichment_frame = (records, frame)
+        return self._enrichment_frame[1]
+
+    def with_enrichment(self, df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` with the enrichment columns joined on ``full_name``"""
+        frame = self.enrichment_frame()
+        if frame is None or "full_name" not in df.columns:
+            return df
+        return df.drop(columns=ENRICHMENT_COLUMNS, errors="ignore").join(
+            frame, on="full_name"
+        )
 
-            # Convert to DataFrame
-            df_current = pd.DataFrame(current_repos)
+    def iter_snapshot_features(self, entries: List[Dict]) -> Iterator[pd.DataFrame]:
+        """Lazily yield the feature frame of each cataloged snapshot.
+
+        Only one raw snapshot is held at a time, and each yielded frame is
+        trimmed to the model inputs plus identifying columns.
+        """
+        catalog = self.snapshot_catalog()
+        keep = ["id", "name", "full_name", "stargazers_count", *MODEL_COLUMNS]
+        for entry in entries:
+            raw = pd.DataFrame(catalog.iter_items(entry))
+            if raw.empty:
+                continue
+            features = self.with_enrichment(self.features.compute(raw))
+            yield features[[c for c in keep if c in features.columns]].assign(
+                snapshot=entry["timestamp"]
+            )
 
-            # Load historical data if exists
+    def load_historical_data(
+        self,
+        start: Union[str, datetime, None] = None,
+        end: Union[str, datetime, None] = None,
+    ) -> pd.DataFrame:
+        """Load and preprocess repository data.
+
+        Without bounds this is the newest snapshot; with ``start``/``end`` every
+        cataloged snapshot in that range is streamed into one longitudinal
+        frame (one row per repository per snapshot).
+        """
+        catalog = self.snapshot_catalog()
+        if start is None and end is None:
+            latest = catalog.latest()
             try:
-                with open(f"{self.data_path}/top_repos_history.json", "r") as f:
-                    history_data = json.load(f)
-                    df_history = pd.DataFrame(history_data)
+                if latest is None:
+                    raise FileNotFoundError(catalog.manifest_path)
+                df_current = pd.DataFrame(catalog.iter_items(latest))
             except FileNotFoundError:
-                df_history = pd.DataFrame()
-
+                print("Historical data not found. Please run data collection first.")
+                return pd.DataFrame()
             # Process data for ML
-            return self._process_data_for_ml(df_current, df_history)
+            return self._process_data_for_ml(df_current, latest["checksum"])
 
-        except FileNotFoundError:
-            print("Historical data not found. Please run data collection first.")
+        frames = list(self.iter_snapshot_features(catalog.between(start, end)))
+        if not frames:
+            print("No snapshots found in the requested range.")
             return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
 
     def _process_data_for_ml(
-        self, current_df: pd.DataFrame, history_df: pd.DataFrame
+        self, current_df: pd.DataFrame, snapshot_id: Optional[str] = None
     ) -> pd.DataFrame:
         """Process data for machine learning models"""
-        # Add time-based features - handle timezone issues
-        current_df["created_at"] = pd.to_datetime(
-            current_df["created_at"], utc=True
-        ).dt.tz_localize(None)
-        now = pd.Timestamp.now()
-        current_df["days_since_creation"] = current_df["created_at"].apply(
-            lambda x: (now - x).days
-        )
-        current_df["stars_per_day"] = current_df["stargazers_count"] / current_df[
-            "days_since_creation"
-        ].clip(lower=1)
-
-        # Add growth rate features
-        current_df["growth_rate"] = current_df["stargazers_count"] / (
-            current_df["days_since_creation"] + 1
-        )
-
-        # Language encoding
-        language_map = {
-            "JavaScript": 1,
-            "Python": 2,
-            "Java": 3,
-            "TypeScript": 4,
-            "C++": 5,
-            "C#": 6,
-            "PHP": 7,
-            "Ruby": 8,
-            "Go": 9,
-            "Rust": 10,
-            "Other": 11,
-        }
-        current_df["language_encoded"] = (
-            current_df["language"].map(language_map).fillna(11)
-        )
-
-        # Add repository quality features
-        current_df["has_description"] = current_df["description"].notna().astype(int)
-        current_df["description_length"] = (
-            current_df["description"].fillna("").str.len()
-        )
-
-        return current_df
-
-    def train_growth_prediction_model(self, df: pd.DataFrame) -> Dict:
-        """Train model to predict future star growth"""
+        # Features come from the shared pipeline (cached per snapshot)
+        features = self.features.transform(current_df, snapshot_id)
+        return self.with_enrichment(features)
+
+    def train_growth_prediction_model(
+        self,
+        df: pd.DataFrame,
+        n_jobs: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        progress: Optional[Callable[[str, Dict], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ) -> Dict:
+        """Train model to predict future star growth.
+
+        With an ``executor`` (normally a process pool) the candidate models
+        fit in parallel; ``n_jobs`` is forwarded to the forest. ``progress``
+        is called with each finished model's metrics, and ``should_cancel`` is
+        polled while waiting and once more before registering, so a cancelled
+        job never activates a model. Fits already running in the pool cannot
+        be interrupted; a cancel waits for them to stop before raising.
+        """
         if df.empty:
             return {"error": "No data available for training"}
 
-        # Features for prediction
-        features = [
-            "days_since_creation",
-            "stars_per_day",
-            "growth_rate",
-            "language_encoded",
-            "has_description",
-            "description_length",
-        ]
+        # Features for prediction (enrichment columns are 0 when not crawled)
+        features = MODEL_COLUMNS
 
         # Target: predict stars in 30 days
         target = "stargazers_count"
 
         # Prepare data
-        X = df[features].fillna(0)
+        X = self.features.feature_matrix(df)
         y = df[target]
 
         # Split data
@@ -138,141 +517,226 @@ class GitHubPredictor:
             X, y, test_size=0.2, random_state=42
         )
 
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Scale features (a fresh scaler, persisted with the winning model)
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
 
         # Train multiple models
-        models = {
-            "RandomForest": RandomForestRegressor(n_estimators=100, random_state=42),
-            "GradientBoosting": GradientBoostingRegressor(
-                n_estimators=100, random_state=42
-            ),
-            "LinearRegression": LinearRegression(),
-        }
+        models = build_candidate_models(n_jobs)
+        fit_args = (X_train_scaled, y_train, X_test_scaled, y_test)
 
         results = {}
 
-        for name, model in models.items():
-            # Train model
-            model.fit(X_train_scaled, y_train)
-
-            # Predictions
-            y_pred = model.predict(X_test_scaled)
-
-            # Metrics
-            mae = mean_absolute_error(y_test, y_pred)
-            mse = mean_squared_error(y_test, y_pred)
-            r2 = r2_score(y_test, y_pred)
-
-            results[name] = {
-                "model": model,
-                "mae": mae,
-                "mse": mse,
-                "r2": r2,
-                "predictions": y_pred[:5].tolist(),  # Sample predictions
-                "actual": y_test[:5].tolist(),
-            }
-
+        def record(name, model, metrics):
+            results[name] = {"model": model, **metrics}
             self.models[name] = model
-
-        # Save best model (highest R²)
+            if progress is not None:
+                progress(name, metrics)
+
+        if executor is None:
+            for name, model in models.items():
+                if should_cancel is not None and should_cancel():
+                    raise JobCancelled()
+                record(*_fit_candidate(name, model, *fit_args))
+        else:
+            pending = {
+                executor.submit(_fit_candidate, name, model, *fit_args)
+                for name, model in models.items()
+            }
+            while pending:
+                if should_cancel is not None and should_cancel():
+                    for future in pending:
+                        future.cancel()
+                    wait(pending)
+                    raise JobCancelled()
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(*future.result())
+
+        # A cancel that arrived during the last fit must not swap models
+        if should_cancel is not None and should_cancel():
+            raise JobCancelled()
+
+        # Register and hot-swap the best model (highest R²)
         best_model_name = max(results.keys(), key=lambda x: results[x]["r2"])
-        self.save_model(best_model_name, results[best_model_name]["model"])
+        best = results[best_model_name]
+        version = self.registry.register(
+            best_model_name,
+            scaler,
+            best["model"],
+            metrics={"mae": best["mae"], "mse": best["mse"], "r2": best["r2"]},
+            features=features,
+            fingerprint=data_fingerprint(X, y),
+        )
+        # Cached predictions came from the previous model
+        self.prediction_cache.invalidate()
 
         return {
             "best_model": best_model_name,
+            "model_version": version,
             "results": results,
             "feature_importance": self.get_feature_importance(
                 best_model_name, features
             ),
         }
 
+    def _predict_stars(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        """Scale once and predict every row in one call with the active model"""
+        active = self.registry.get_active()
+        if active is None:
+            return None
+
+        _, pipeline, _ = active
+        X = self.features.feature_matrix(self.with_enrichment(df))
+        X = X[pipeline["features"]]
+        return pipeline["model"].predict(pipeline["scaler"].transform(X))
+
+    @staticmethod
+    def _growth_rates(current: np.ndarray, predicted: np.ndarray) -> np.ndarray:
+        """Predicted growth as a percentage of current stars (0 for no stars)"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = (predicted - current) / current * 100
+        return np.where(current > 0, rates, 0.0)
+
+    def predict_batch(
+        self,
+        df: pd.DataFrame,
+        days_ahead: int = 30,
+        top_n: Optional[int] = None,
+    ) -> List[Dict]:
+        """Predict future growth for every repository in ``df``.
+
+        With ``top_n`` only the highest predicted growth rates are returned,
+        selected with ``argpartition`` and sorted descending.
+        """
+        if df.empty:
+            return []
+
+        try:
+            predicted = self._predict_stars(df)
+        except Exception as e:
+            print(f"Batch prediction failed: {e}")
+            return []
+        if predicted is None:
+            return []
+
+        return self._prediction_records(df, predicted, days_ahead, top_n)
+
+    def _prediction_records(
+        self,
+        df: pd.DataFrame,
+        predicted: np.ndarray,
+        days_ahead: int,
+        top_n: Optional[int] = None,
+        sort: bool = True,
+    ) -> List[Dict]:
+        """Build response records, keeping only the top ``top_n`` growth rates.
+
+        With ``sort=False`` records keep the row order of ``df``.
+        """
+        current = df["stargazers_count"].to_numpy(dtype=float)
+        rates = np.round(self._growth_rates(current, predicted), 2)
+
+        if not sort:
+            order = np.arange(len(rates))
+        elif top_n is None or top_n >= len(rates):
+            order = np.argsort(-rates, kind="stable")
+        elif top_n <= 0:
+            return []
+        else:
+            order = np.argpartition(-rates, top_n - 1)[:top_n]
+            order = order[np.argsort(-rates[order], kind="stable")]
+
+        names = df["name"].to_numpy()
+        # Confidence intervals (simplified)
+        confidence_interval = predicted * 0.15  # 15% confidence interval
+        prediction_date = (datetime.now() + timedelta(days=days_ahead)).strftime(
+            "%Y-%m-%d"
+        )
+
+        return [
+            {
+                "repository": names[i],
+                "current_stars": int(current[i]),
+                "predicted_stars_30d": int(predicted[i]),
+                "predicted_growth": int(predicted[i] - current[i]),
+                "growth_rate_percent": float(rates[i]),
+                "confidence_interval": {
+                    "lower": int(predicted[i] - confidence_interval[i]),
+                    "upper": int(predicted[i] + confidence_interval[i]),
+                },
+                "days_ahead": days_ahead,
+                "prediction_date": prediction_date,
+            }
+            for i in order.tolist()
+        ]
+
     def predict_future_growth(
         self, repository_data: Dict, days_ahead: int = 30
     ) -> Dict:
         """Predict future growth for a specific repository"""
         try:
-            # Convert to DataFrame
             df = pd.DataFrame([repository_data])
-
-            # Process features
-            df["days_since_creation"] = (
-                pd.Timestamp.now() - pd.to_datetime(df["created_at"])
-            ).dt.days
-            df["stars_per_day"] = df["stargazers_count"] / df[
-                "days_since_creation"
-            ].clip(lower=1)
-            df["growth_rate"] = df["stargazers_count"] / (df["days_since_creation"] + 1)
-
-            # Language encoding
-            language_map = {
-                "JavaScript": 1,
-                "Python": 2,
-                "Java": 3,
-                "TypeScript": 4,
-                "C++": 5,
-                "C#": 6,
-                "PHP": 7,
-                "Ruby": 8,
-                "Go": 9,
-                "Rust": 10,
-            }
-            df["language_encoded"] = df["language"].map(language_map).fillna(11)
-
-            df["has_description"] = df["description"].notna().astype(int)
-            df["description_length"] = df["description"].fillna("").str.len()
-
-            # Features for prediction
-            features = [
-                "days_since_creation",
-                "stars_per_day",
-                "growth_rate",
-                "language_encoded",
-                "has_description",
-                "description_length",
-            ]
-
-            X = df[features].fillna(0)
-            X_scaled = self.scaler.transform(X)
-
-            # Load best model
-            best_model = self.load_best_model()
-            if best_model is None:
+            predicted = self._predict_stars(df)
+            if predicted is None:
                 return {"error": "No trained model available"}
+        except Exception as e:
+            return {"error": f"Prediction failed: {str(e)}"}
 
-            # Make prediction
-            current_stars = repository_data["stargazers_count"]
-            predicted_stars = best_model.predict(X_scaled)[0]
-
-            # Calculate growth metrics
-            predicted_growth = predicted_stars - current_stars
-            growth_rate = (
-                (predicted_growth / current_stars) * 100 if current_stars > 0 else 0
+        return self._prediction_records(df, predicted, days_ahead)[0]
+
+    def cached(self, kind: str, params: tuple, compute: Callable[[], object]):
+        """Serve ``compute()`` through the prediction cache.
+
+        The key pins the newest snapshot's checksum, the enrichment file and
+        the active model version, so results never outlive the data or model
+        they came from.
+        """
+        snapshot = self.snapshot_catalog().latest()
+        active = self.registry.get_active()
+        key = (
+            kind,
+            snapshot["checksum"] if snapshot else None,
+            self.enrichment.signature,
+            active[0] if active else None,
+            params,
+        )
+        return self.prediction_cache.get_or_compute(key, compute)
+
+    def predict_indexed(self, repository: Dict, days_ahead: int = 30) -> Dict:
+        """Prediction for a repository of the indexed snapshot.
+
+        The whole snapshot is predicted in one cached batch per (snapshot,
+        model version, horizon), so repeated lookups are a dict access.
+        """
+        index = self.repository_index()
+        if self.registry.get_active() is None:
+            return {"error": "No trained model available"}
+
+        def compute():
+            items = index.items()
+            if not items:
+                return {}
+            df = pd.DataFrame(items)
+            records = self._prediction_records(
+                df, self._predict_stars(df), days_ahead, sort=False
             )
-
-            # Confidence intervals (simplified)
-            confidence_interval = predicted_stars * 0.15  # 15% confidence interval
-
             return {
-                "repository": repository_data["name"],
-                "current_stars": int(current_stars),
-                "predicted_stars_30d": int(predicted_stars),
-                "predicted_growth": int(predicted_growth),
-                "growth_rate_percent": round(growth_rate, 2),
-                "confidence_interval": {
-                    "lower": int(predicted_stars - confidence_interval),
-                    "upper": int(predicted_stars + confidence_interval),
-                },
-                "days_ahead": days_ahead,
-                "prediction_date": (
-                    datetime.now() + timedelta(days=days_ahead)
-                ).strftime("%Y-%m-%d"),
+                item["full_name"].casefold(): record
+                for item, record in zip(items, records)
             }
 
+        try:
+            predictions = self.cached("indexed", (days_ahead,), compute)
         except Exception as e:
             return {"error": f"Prediction failed: {str(e)}"}
 
+        prediction = predictions.get(repository["full_name"].casefold())
+        if prediction is None:
+            return self.predict_future_growth(repository, days_ahead)
+        return prediction
+
     def get_feature_importance(self, model_name: str, features: List[str]) -> Dict:
         """Get feature importance for the model"""
         if model_name not in self.models:
@@ -289,37 +753,19 @@ class GitHubPredictor:
 
         return {}
 
-    def save_model(self, model_name: str, model):
-        """Save trained model"""
-        import joblib
-
-        os.makedirs(f"{self.data_path}/models", exist_ok=True)
-        joblib.dump(model, f"{self.data_path}/models/{model_name}.joblib")
-
     def load_best_model(self):
-        """Load the best performing model"""
-        import joblib
-
-        model_path = f"{self.data_path}/models"
-
-        if not os.path.exists(model_path):
-            return None
-
-        # Find model with highest R² (this is simplified - in practice you'd store metadata)
-        model_files = [f for f in os.listdir(model_path) if f.endswith(".joblib")]
-
-        if not model_files:
-            return None
-
-        # Load first available model (in practice, load the best one based on metadata)
-        best_model_path = f"{model_path}/{model_files[0]}"
-        return joblib.load(best_model_path)
+        """Return the active (best registered) model, kept resident in memory"""
+        active = self.registry.get_active()
+        return active[1]["model"] if active else None
 
     def analyze_trends(self, df: pd.DataFrame) -> Dict:
         """Analyze trends and patterns in repository data"""
         if df.empty:
             return {"error": "No data available for analysis"}
 
+        if "growth_rate" not in df.columns:
+            df = self.features.transform(df)
+
         # Language distribution
         language_dist = df["language"].value_counts().head(10).to_dict()
 
@@ -371,44 +817,157 @@ class GitHubPredictor:
 
     def predict_top_performers(self, df: pd.DataFrame, top_n: int = 10) -> List[Dict]:
         """Predict which repositories will be top performers in the future"""
-        if df.empty:
-            return []
+        return self.predict_batch(df, top_n=top_n)
+
+    def cached_top_predictions(self, top_n: int = 10) -> List[Dict]:
+        """Top predicted performers of the newest snapshot, cached"""
+        return self.cached(
+            "top_predictions",
+            (top_n,),
+            lambda: self.predict_top_performers(self.load_historical_data(), top_n),
+        )
 
-        predictions = []
+    def cached_trends(self) -> Dict:
+        """Trend analysis of the newest snapshot, cached"""
+        return self.cached(
+            "trends", (), lambda: self.analyze_trends(self.load_historical_data())
+        )
 
-        for _, repo in df.iterrows():
-            pred = self.predict_future_growth(repo.to_dict())
-            if "error" not in pred:
-                predictions.append(pred)
 
-        # Sort by predicted growth rate
-        predictions.sort(key=lambda x: x["growth_rate_percent"], reverse=True)
+# Global predictor instance, created on first use so importing this module
+# has no side effects (the constructor creates data directories)
+_predictor = None
+_predictor_lock = threading.Lock()
+
+
+def get_predictor() -> GitHubPredictor:
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                _predictor = GitHubPredictor()
+    return _predictor
+
+
+def __getattr__(name):
+    # ``ml_predictor.predictor`` keeps working for existing callers
+    if name == "predictor":
+        return get_predictor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Candidate models fit in separate worker processes; TRAINING_N_JOBS is the
+# forest's own n_jobs inside its worker
+TRAINING_PROCESSES = int(os.getenv("TRAINING_PROCESSES", "3"))
+TRAINING_N_JOBS = int(os.getenv("TRAINING_N_JOBS", "1"))
+# Days of archived snapshots used for training; 0 trains on the latest only
+TRAINING_HISTORY_DAYS = int(os.getenv("TRAINING_HISTORY_DAYS", "0"))
+# Upper bound on one training run; a crashed holder's lock expires after it
+TRAINING_LOCK_TIMEOUT = 3600
+_training_pool = None
+_training_pool_lock = threading.Lock()
+
+
+def get_training_pool() -> ProcessPoolExecutor:
+    """Lazily start the process pool used for model fitting"""
+    global _training_pool
+    with _training_pool_lock:
+        if _training_pool is None:
+            # spawn: forking a threaded server process is not safe
+            _training_pool = ProcessPoolExecutor(
+                max_workers=TRAINING_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _training_pool
 
-        return predictions[:top_n]
 
+def summarize_training(training: Dict) -> Dict:
+    """JSON-safe view of training results (fitted estimators dropped)"""
+    summary = {k: v for k, v in training.items() if k != "results"}
+    summary["results"] = {
+        name: {k: v for k, v in result.items() if k != "model"}
+        for name, result in training.get("results", {}).items()
+    }
+    summary["feature_importance"] = {
+        k: float(v) for k, v in training.get("feature_importance", {}).items()
+    }
+    return summary
 
-# Global predictor instance
-predictor = GitHubPredictor()
 
+def run_training_job(n_jobs: Optional[int] = None, job=None) -> Dict:
+    """Training job body; skipped while another worker or replica trains"""
+    with distributed_lock(shared_cache, "train", TRAINING_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            return {"skipped": True, "message": "Training already in progress"}
+        return _train(n_jobs, job)
 
-def get_ml_insights() -> Dict:
-    """Get comprehensive ML insights for the dashboard"""
-    df = predictor.load_historical_data()
 
+def _train(n_jobs: Optional[int] = None, job=None) -> Dict:
+    """Fit candidates in the process pool, reporting progress"""
+    predictor = get_predictor()
+    if TRAINING_HISTORY_DAYS > 0:
+        start = datetime.now() - timedelta(days=TRAINING_HISTORY_DAYS)
+        df = predictor.load_historical_data(start=start)
+    else:
+        df = predictor.load_historical_data()
     if df.empty:
+        raise RuntimeError("No data available for training")
+
+    models = {}
+    if job is not None:
+        job.progress = {"completed": 0, "total": 3, "models": models}
+
+    def progress(name, metrics):
+        models[name] = {"fit_seconds": metrics["fit_seconds"], "r2": metrics["r2"]}
+        if job is not None:
+            job.progress["completed"] = len(models)
+            job.publish()
+
+    training = predictor.train_growth_prediction_model(
+        df,
+        n_jobs=n_jobs if n_jobs is not None else TRAINING_N_JOBS,
+        executor=get_training_pool(),
+        progress=progress,
+        should_cancel=(lambda: job.cancel_requested) if job is not None else None,
+    )
+    if "error" in training:
+        raise RuntimeError(training["error"])
+    return summarize_training(training)
+
+
+def submit_training(n_jobs: Optional[int] = None, dedupe_key: Optional[str] = None):
+    """Queue a training job behind any job already running"""
+    return training_jobs.submit(
+        "train", run_training_job, n_jobs, dedupe_key=dedupe_key, pass_job=True
+    )
+
+
+def get_ml_insights() -> Dict:
+    """Get comprehensive ML insights for the dashboard"""
+    predictor = get_predictor()
+    if predictor.snapshot_catalog().latest() is None:
         return {"error": "No data available"}
 
-    # Train model if not exists
-    if not predictor.models:
-        training_results = predictor.train_growth_prediction_model(df)
+    # Never train inline: queue a (single) background job instead
+    active = predictor.registry.get_active()
+    if active is None:
+        job = submit_training(dedupe_key="auto-train")
+        training_results = {
+            "message": "No trained model yet; training queued",
+            "job_id": job.id,
+            "status": job.status,
+        }
     else:
-        training_results = {"message": "Using existing trained model"}
+        training_results = {
+            "message": "Using existing trained model",
+            "model_version": active[0],
+        }
 
     # Get predictions for top repos
-    top_predictions = predictor.predict_top_performers(df)
+    top_predictions = predictor.cached_top_predictions()
 
     # Get trend analysis
-    trends = predictor.analyze_trends(df)
+    trends = predictor.cached_trends()
 
     return {
         "training_results": training_results,
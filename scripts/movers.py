@@ -0,0 +1,169 @@
+"""
+Movement Analytics for StellarNexus
+Star velocity, acceleration and rank movement computed from the star matrix
+"""
+
+import threading
+from bisect import bisect_right
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from scripts.timeseries_store import star_matrix
+except ImportError:  # executed directly from the scripts directory
+    from timeseries_store import star_matrix
+
+# Windows exposed by /api/analytics/movers, in calendar days
+WINDOWS = {"1d": 1, "7d": 7, "30d": 30}
+SORT_KEYS = {
+    "stars": "star_delta",
+    "rank": "rank_change",
+    "acceleration": "acceleration",
+}
+
+
+def column_ranks(stars: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """1-based rank by stars within one day's column (0 where absent)"""
+    ids = np.flatnonzero(present)
+    order = ids[np.argsort(-stars[ids], kind="stable")]
+    ranks = np.zeros(len(stars), dtype=np.int64)
+    ranks[order] = np.arange(1, len(order) + 1)
+    return ranks
+
+
+def window_start(dates: List[str], end: int, days: int) -> Optional[int]:
+    """Index of the newest snapshot at least ``days`` before ``dates[end]``"""
+    cutoff = (date.fromisoformat(dates[end]) - timedelta(days=days)).isoformat()
+    index = bisect_right(dates, cutoff, 0, end) - 1
+    return index if index >= 0 else None
+
+
+def _elapsed(dates: List[str], start: int, end: int) -> int:
+    return (date.fromisoformat(dates[end]) - date.fromisoformat(dates[start])).days
+
+
+def window_movement(
+    stars: np.ndarray, mask: np.ndarray, dates: List[str], days: int
+) -> Optional[Dict]:
+    """Vectorised movement of every repo over one window ending today.
+
+    Reads at most three day columns (today, the window start and the start
+    of the window before it), so the cost is O(repos) however long the
+    history is. Values are NaN where a repo is missing from a needed day.
+    """
+    end = len(dates) - 1
+    start = window_start(dates, end, days) if end >= 0 else None
+    if start is None:
+        return None
+
+    now, then = stars[:, end].astype(float), stars[:, start].astype(float)
+    valid = mask[:, end] & mask[:, start]
+    delta = np.where(valid, now - then, np.nan)
+    velocity = delta / _elapsed(dates, start, end)
+
+    acceleration = np.full(len(now), np.nan)
+    before = window_start(dates, start, days)
+    if before is not None:
+        prior_valid = valid & mask[:, before]
+        prior_velocity = (then - stars[:, before]) / _elapsed(dates, before, start)
+        acceleration = np.where(prior_valid, velocity - prior_velocity, np.nan)
+
+    ranks_now = column_ranks(stars[:, end], mask[:, end])
+    ranks_then = column_ranks(stars[:, start], mask[:, start])
+    return {
+        "since": dates[start],
+        "valid": valid,
+        "star_delta": delta,
+        "stars_per_day": velocity,
+        "acceleration": acceleration,
+        "rank": ranks_now,
+        # Positive when the repo climbed
+        "rank_change": np.where(valid, ranks_then - ranks_now, 0),
+    }
+
+
+class MoversEngine:
+    """Movement metrics for every window, maintained as snapshots land.
+
+    Requests only read the star matrix, which the daily update writes;
+    whenever its index changes on disk (a new or replaced day) all windows
+    are recomputed in one pass over the few columns they need. Between
+    appends every request is served from the computed records.
+    """
+
+    def __init__(self, matrix=None):
+        self.matrix = matrix or star_matrix
+        self._lock = threading.Lock()
+        self._version = None
+        self._state = (None, {})  # (as of date, window -> movement records)
+        self.recomputes = 0
+
+    def _records(self, movement: Optional[Dict]) -> Dict:
+        if movement is None:
+            return {"since": None, "movers": []}
+
+        def number(value, digits):
+            return round(float(value), digits) if not np.isnan(value) else None
+
+        stars = self.matrix.stars[:, -1]
+        movers = [
+            {
+                "name": self.matrix.repos[i].rsplit("/", 1)[-1],
+                "full_name": self.matrix.repos[i],
+                "stars": int(stars[i]),
+                "rank": int(movement["rank"][i]),
+                "star_delta": int(movement["star_delta"][i]),
+                "stars_per_day": number(movement["stars_per_day"][i], 2),
+                "acceleration": number(movement["acceleration"][i], 2),
+                "rank_change": int(movement["rank_change"][i]),
+            }
+            for i in np.flatnonzero(movement["valid"]).tolist()
+        ]
+        return {"since": movement["since"], "movers": movers}
+
+    def _refresh(self):
+        self.matrix.load()
+        version = (self.matrix.signature, len(self.matrix.dates))
+        if version == self._version:
+            return
+
+        with self._lock:
+            if version == self._version:
+                return
+            stars, mask, dates = self.matrix.stars, self.matrix.mask, self.matrix.dates
+            windows = {
+                name: self._records(window_movement(stars, mask, dates, days))
+                for name, days in WINDOWS.items()
+            }
+            self._state = (dates[-1] if dates else None, windows)
+            self._version = version
+            self.recomputes += 1
+
+    def movers(self, window: str = "7d", limit: int = 10, sort: str = "stars") -> Dict:
+        """Top ``limit`` repos of a window, ordered by the ``sort`` metric"""
+        if window not in WINDOWS:
+            raise ValueError(f"window must be one of {', '.join(WINDOWS)}")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+
+        self._refresh()
+        as_of, windows = self._state
+        records = windows.get(window, {"since": None, "movers": []})
+        key = SORT_KEYS[sort]
+        ranked = sorted(
+            (m for m in records["movers"] if m[key] is not None),
+            key=lambda m: (-m[key], m["rank"]),
+        )
+        return {
+            "window": window,
+            "as_of": as_of,
+            "since": records["since"],
+            "sort": sort,
+            "movers": ranked[: max(limit, 0)],
+        }
+
+
+# Global engine shared by the API
+movers_engine = MoversEngine()
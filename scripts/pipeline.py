@@ -0,0 +1,252 @@
+"""
+Pipeline Runner for StellarNexus
+Generator stages joined by bounded queues, with per-stage stats and checkpoints
+"""
+
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+PIPELINE_DIR = "data/pipeline"
+# Items buffered between two stages; a full buffer blocks the producer
+PIPELINE_BUFFER = 4
+# How often blocked stages check whether another stage failed
+POLL_SECONDS = 0.1
+
+_DONE = object()
+_ABORTED = object()
+
+Stage = Tuple[str, Callable[[Iterator], Iterable]]
+
+
+class StageAborted(Exception):
+    """Raised inside a stage when another stage failed"""
+
+
+class PipelineError(RuntimeError):
+    """A stage failed; ``stats`` holds every stage's report"""
+
+    def __init__(self, stage: str, error: Exception, stats: List[Dict]):
+        super().__init__(f"Pipeline stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+        self.stats = stats
+
+
+class StageStats:
+    """Counts and timings of one stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "pending"
+        self.items_in = 0
+        self.items_out = 0
+        self.seconds = 0.0
+        self.wait_seconds = 0.0
+        self.error = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "stage": self.name,
+            "status": self.status,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "seconds": round(self.seconds, 4),
+            "wait_seconds": round(self.wait_seconds, 4),
+            "error": self.error,
+        }
+
+
+class Pipeline:
+    """Runs each stage on its own thread, streaming items between them.
+
+    A stage is ``(name, func)`` where ``func(items)`` takes an iterator of
+    the previous stage's output and yields its own; the first stage gets an
+    empty iterator. Queues between stages hold ``buffer_size`` items, so a
+    slow consumer holds back its producers. ``seconds`` is the time a stage
+    spent working; time blocked on its neighbours is ``wait_seconds``. When
+    a stage raises, the others stop at their next queue operation and
+    ``run`` raises ``PipelineError``.
+    """
+
+    def __init__(self, stages: List[Stage], buffer_size: int = PIPELINE_BUFFER):
+        self.stages = stages
+        self.buffer_size = buffer_size
+        self.stats = [StageStats(name) for name, _ in stages]
+        self._abort = threading.Event()
+        self._failure = None
+
+    def _get(self, source: queue.Queue):
+        while True:
+            try:
+                return source.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                if self._abort.is_set():
+                    return _ABORTED
+
+    def _put(self, sink: queue.Queue, item) -> bool:
+        while True:
+            try:
+                sink.put(item, timeout=POLL_SECONDS)
+                return True
+            except queue.Full:
+                if self._abort.is_set():
+                    return False
+
+    def _inputs(self, source: queue.Queue, stats: StageStats) -> Iterator:
+        while True:
+            start = time.perf_counter()
+            item = self._get(source)
+            stats.wait_seconds += time.perf_counter() - start
+            if item is _DONE:
+                return
+            if item is _ABORTED:
+                raise StageAborted()
+            stats.items_in += 1
+            yield item
+
+    def _run_stage(self, index: int, queues: List[queue.Queue], results: List):
+        name, func = self.stages[index]
+        stats = self.stats[index]
+        source = queues[index - 1] if index > 0 else None
+        sink = queues[index] if index < len(queues) else None
+
+        stats.status = "running"
+        start = time.perf_counter()
+        try:
+            items = self._inputs(source, stats) if source is not None else iter(())
+            for item in func(items):
+                stats.items_out += 1
+                if sink is None:
+                    results.append(item)
+                    continue
+                blocked = time.perf_counter()
+                if not self._put(sink, item):
+                    raise StageAborted()
+                stats.wait_seconds += time.perf_counter() - blocked
+            stats.status = "succeeded"
+            if sink is not None:
+                self._put(sink, _DONE)
+        except StageAborted:
+            stats.status = "aborted"
+        except Exception as e:
+            stats.status = "failed"
+            stats.error = str(e)
+            if self._failure is None:
+                self._failure = (name, e)
+            self._abort.set()
+        finally:
+            stats.seconds = time.perf_counter() - start - stats.wait_seconds
+
+    def run(self) -> List:
+        """Run to completion and return the last stage's output"""
+        queues = [queue.Queue(self.buffer_size) for _ in self.stages[1:]]
+        results: List = []
+        threads = [
+            threading.Thread(
+                target=self._run_stage,
+                args=(index, queues, results),
+                name=f"stellar-stage-{name}",
+                daemon=True,
+            )
+            for index, (name, _) in enumerate(self.stages)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._failure is not None:
+            raise PipelineError(*self._failure, self.report())
+        return results
+
+    def report(self) -> List[Dict]:
+        return [stats.to_dict() for stats in self.stats]
+
+
+class Checkpoint:
+    """Progress of one pipeline run, kept on disk until the run completes.
+
+    ``state`` is a JSON dict written atomically on every ``save``; ``spool``
+    stores larger intermediate results (fetched pages) as files beside it.
+    A later run with the same ``run_id`` resumes from them; one with another
+    id starts over.
+    """
+
+    def __init__(self, run_id: str, directory: str = PIPELINE_DIR):
+        self.run_id = run_id
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.state = self._load()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, "checkpoint.json")
+
+    @property
+    def spool_dir(self) -> str:
+        return os.path.join(self.directory, "spool")
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, "r") as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            state = None
+        if not state or state.get("run_id") != self.run_id:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+            return {"run_id": self.run_id}
+        return state
+
+    @property
+    def resumed(self) -> bool:
+        return len(self.state) > 1
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            return self.state.get(key, default)
+
+    def save(self, **changes):
+        """Merge ``changes`` into the state and persist it"""
+        with self._lock:
+            self.state.update(changes)
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.path)
+
+    def mark(self, key: str, value):
+        """Append ``value`` to the list stored under ``key``"""
+        with self._lock:
+            values = list(self.state.get(key, []))
+        if value not in values:
+            self.save(**{key: values + [value]})
+
+    def write_spool(self, name: str, data):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = os.path.join(self.spool_dir, f"{name}.json")
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(f"{path}.tmp", path)
+
+    def read_spool(self, name: str) -> Optional[object]:
+        try:
+            with open(os.path.join(self.spool_dir, f"{name}.json"), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def complete(self):
+        """Drop the checkpoint and spool once the run has fully succeeded"""
+        with self._lock:
+            self.state = {"run_id": self.run_id}
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,94 @@
+"""
+Repository Index for StellarNexus
+In-memory lookup of the latest snapshot's repositories by name, full name and id
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+try:
+    from scripts.snapshot_archive import SnapshotArchive
+except ImportError:  # executed directly from the scripts directory
+    from snapshot_archive import SnapshotArchive
+
+
+class RepositoryIndex:
+    """Dict-based lookups over the newest cataloged snapshot.
+
+    Short names are case-folded and map to every repository carrying that
+    name, since they collide across owners; ``full_name`` and ``id`` are
+    unique. The index is rebuilt when the catalog's latest entry changes,
+    which is checked at most once every ``check_interval`` seconds.
+    """
+
+    def __init__(self, catalog: SnapshotArchive, check_interval: float = 1.0):
+        self.catalog = catalog
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._entry = None
+        # (items, by name, by full name, by id) swapped as one reference
+        self._state = ([], {}, {}, {})
+        self.rebuilds = 0
+
+    @staticmethod
+    def build(items: List[Dict]):
+        by_name: Dict[str, List[Dict]] = {}
+        by_full_name: Dict[str, Dict] = {}
+        by_id: Dict[int, Dict] = {}
+        for item in items:
+            by_name.setdefault(item["name"].casefold(), []).append(item)
+            if item.get("full_name"):
+                by_full_name[item["full_name"].casefold()] = item
+            if item.get("id") is not None:
+                by_id[item["id"]] = item
+        return items, by_name, by_full_name, by_id
+
+    def _refresh_if_stale(self):
+        """Rebuild when a newer snapshot has been cataloged"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+
+        with self._lock:
+            if now < self._next_check:
+                return
+
+            entry = self.catalog.latest()
+            if entry != self._entry:
+                items = list(self.catalog.iter_items(entry)) if entry else []
+                self._state = self.build(items)
+                self._entry = entry
+                self.rebuilds += 1
+
+            self._next_check = now + self.check_interval
+
+    @property
+    def snapshot(self) -> Optional[Dict]:
+        """Catalog entry the index was built from"""
+        self._refresh_if_stale()
+        return self._entry
+
+    def items(self) -> List[Dict]:
+        self._refresh_if_stale()
+        return self._state[0]
+
+    def find_by_name(self, name: str) -> List[Dict]:
+        """All repositories whose short name matches, ignoring case"""
+        self._refresh_if_stale()
+        return self._state[1].get(name.casefold(), [])
+
+    def get(self, full_name: str) -> Optional[Dict]:
+        """Repository by ``owner/repo``, ignoring case"""
+        self._refresh_if_stale()
+        return self._state[2].get(full_name.casefold())
+
+    def get_by_id(self, repo_id: int) -> Optional[Dict]:
+        self._refresh_if_stale()
+        return self._state[3].get(repo_id)
+
+    def invalidate(self):
+        """Force a catalog check on the next lookup"""
+        with self._lock:
+            self._next_check = 0.0
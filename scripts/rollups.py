@@ -0,0 +1,349 @@
+"""
+History Rollups for StellarNexus
+Weekly and monthly star tiers over the star matrix, and downsampled range queries
+"""
+
+import os
+import tempfile
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scripts.history_store import history_log
+    from scripts.timeseries_store import star_matrix
+except ImportError:  # executed directly from the scripts directory
+    from history_store import history_log
+    from timeseries_store import star_matrix
+
+ROLLUP_DIR = "data/timeseries/rollups"
+RESOLUTIONS = ("day", "week", "month")
+DOWNSAMPLERS = ("lttb", "minmax")
+DEFAULT_POINTS = 500
+MAX_POINTS = 5000
+MAX_HISTORY_REPOS = 1000
+DEFAULT_HISTORY_REPOS = 10
+
+
+def bucket_start(day: str, resolution: str) -> str:
+    """Label of the week (Monday) or month (1st) containing ``day``"""
+    d = date.fromisoformat(day)
+    if resolution == "week":
+        return (d - timedelta(days=d.weekday())).isoformat()
+    if resolution == "month":
+        return d.replace(day=1).isoformat()
+    return day
+
+
+def rollup(
+    stars: np.ndarray, mask: np.ndarray, dates: List[str], resolution: str
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Close (last observed) stars per bucket and whether a repo was seen in it"""
+    labels, starts = [], []
+    for i, day in enumerate(dates):
+        label = bucket_start(day, resolution)
+        if not labels or labels[-1] != label:
+            labels.append(label)
+            starts.append(i)
+
+    rows = np.arange(stars.shape[0])
+    close = np.zeros((stars.shape[0], len(labels)), dtype=np.int64)
+    present = np.zeros((stars.shape[0], len(labels)), dtype=bool)
+    for b, (start, end) in enumerate(zip(starts, starts[1:] + [len(dates)])):
+        seen = mask[:, start:end]
+        # Last True per row: first True of the reversed bucket
+        last = end - 1 - seen[:, ::-1].argmax(axis=1)
+        present[:, b] = seen.any(axis=1)
+        close[:, b] = np.where(present[:, b], stars[rows, last], 0)
+    return labels, close, present
+
+
+def lttb_indices(values: np.ndarray, points: int) -> List[np.ndarray]:
+    """Largest-Triangle-Three-Buckets column picks for each row, vectorised.
+
+    All rows share the bucket grid, so each bucket is one numpy step over
+    every series. NaN gaps are never picked; a row's first and last
+    observed points are always kept.
+    """
+    n_rows, n = values.shape
+    valid = ~np.isnan(values)
+    if n <= points:
+        return [np.flatnonzero(row) for row in valid]
+
+    rows = np.arange(n_rows)
+    x = np.arange(n, dtype=float)
+    first = valid.argmax(axis=1)
+    last = n - 1 - valid[:, ::-1].argmax(axis=1)
+    ax, ay = first.astype(float), values[rows, first]
+    lx, ly = last.astype(float), values[rows, last]
+
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    chosen = np.full((n_rows, points - 2), -1)
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+
+        # Average of the next bucket (the row's last point if it is empty)
+        ahead = valid[:, end:next_end]
+        count = ahead.sum(axis=1)
+        has_ahead = count > 0
+        cx = np.where(has_ahead, (ahead * x[end:next_end]).sum(axis=1), lx)
+        cy = np.where(has_ahead, np.nansum(values[:, end:next_end], axis=1), ly)
+        cx = np.where(has_ahead, cx / np.maximum(count, 1), cx)
+        cy = np.where(has_ahead, cy / np.maximum(count, 1), cy)
+
+        by, bx = values[:, start:end], x[start:end]
+        area = np.abs(
+            (ax - cx)[:, None] * (by - ay[:, None])
+            - (ax[:, None] - bx[None, :]) * (cy - ay)[:, None]
+        )
+        area = np.where(valid[:, start:end], area, -1.0)
+        pick = area.argmax(axis=1)
+        picked = area[rows, pick] >= 0
+
+        column = start + pick
+        chosen[picked, i] = column[picked]
+        ax = np.where(picked, column, ax)
+        ay = np.where(picked, values[rows, column], ay)
+
+    # Picks are increasing by construction; only the endpoints can repeat
+    chosen[(chosen == first[:, None]) | (chosen == last[:, None])] = -1
+    indices = []
+    for r, picks in enumerate(chosen):
+        if not valid[r, first[r]]:
+            indices.append(np.array([], dtype=int))
+            continue
+        ends = [last[r]] if last[r] > first[r] else []
+        indices.append(np.concatenate(([first[r]], picks[picks >= 0], ends)))
+    return indices
+
+
+def minmax_indices(values: np.ndarray, points: int) -> List[np.ndarray]:
+    """Min and max of each of ``points // 2`` buckets, per row"""
+    n_rows, n = values.shape
+    valid = ~np.isnan(values)
+    if n <= points:
+        return [np.flatnonzero(row) for row in valid]
+
+    rows = np.arange(n_rows)
+    edges = np.linspace(0, n, max(points // 2, 1) + 1).astype(int)
+    chosen = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        segment, seen = values[:, start:end], valid[:, start:end]
+        low = np.where(seen, segment, np.inf).argmin(axis=1)
+        high = np.where(seen, segment, -np.inf).argmax(axis=1)
+        has = seen.any(axis=1)
+        chosen.append(np.where(has, start + low, -1))
+        chosen.append(np.where(has, start + high, -1))
+    chosen = np.stack(chosen, axis=1)
+    return [np.unique(chosen[r][chosen[r] >= 0]) for r in rows]
+
+
+class RollupStore:
+    """Weekly and monthly tiers of the star matrix, persisted beside it.
+
+    Each tier is an ``.npz`` of bucket labels, close values, a presence
+    mask and the matrix day it covers up to. ``sync`` is the writer, called
+    at ingest: it recomputes only from the bucket holding the last covered
+    day, so a daily append touches one week and one month. Tiers are rebuilt
+    in full when the matrix was rebuilt underneath them. Readers never
+    write: ``load`` re-reads the tier files when they change on disk.
+    """
+
+    def __init__(self, directory: str = ROLLUP_DIR, matrix=None, log=None):
+        self.directory = directory
+        self.matrix = matrix or star_matrix
+        self.log = log or history_log
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, Tuple] = {}
+        self._version = None
+        self._signature = None
+        self.rebuilt_buckets = 0
+
+    def path(self, resolution: str) -> str:
+        return os.path.join(self.directory, f"{resolution}.npz")
+
+    def _read(self, resolution: str) -> Optional[Tuple]:
+        try:
+            with np.load(self.path(resolution), allow_pickle=False) as data:
+                return (
+                    data["labels"].tolist(),
+                    data["repos"].tolist(),
+                    str(data["covered"]),
+                    data["close"],
+                    data["present"],
+                )
+        except FileNotFoundError:
+            return None
+
+    def _write(self, resolution: str, tier: Tuple):
+        labels, repos, covered, close, present = tier
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{resolution}.")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                labels=np.array(labels, dtype=str),
+                repos=np.array(repos, dtype=str),
+                covered=np.array(covered),
+                close=close,
+                present=present,
+            )
+        os.replace(tmp_path, self.path(resolution))
+
+    def _update(self, resolution: str, stored: Optional[Tuple]) -> Tuple:
+        """Bring one tier up to date with the matrix"""
+        stars, mask, dates = self.matrix.stars, self.matrix.mask, self.matrix.dates
+        repos = list(self.matrix.repos)
+
+        keep = 0
+        if stored is not None:
+            labels, stored_repos, covered, close, present = stored
+            if covered in dates and repos[: len(stored_repos)] == stored_repos:
+                # Recompute from the bucket holding the last covered day
+                keep = bisect_left(labels, bucket_start(covered, resolution))
+        start_day = bisect_left(dates, labels[keep]) if keep else 0
+
+        new_labels, new_close, new_present = rollup(
+            stars[:, start_day:], mask[:, start_day:], dates[start_day:], resolution
+        )
+        self.rebuilt_buckets += len(new_labels)
+
+        if keep:
+            pad = len(repos) - close.shape[0]
+            close = np.pad(close[:, :keep], ((0, pad), (0, 0)))
+            present = np.pad(present[:, :keep], ((0, pad), (0, 0)))
+            new_close = np.concatenate([close, new_close], axis=1)
+            new_present = np.concatenate([present, new_present], axis=1)
+            new_labels = labels[:keep] + new_labels
+
+        return new_labels, repos, dates[-1], new_close, new_present
+
+    def sync(self):
+        """Update the tiers if the star matrix changed (the ingest writer only)"""
+        if self.log.exists():
+            self.matrix.sync(self.log)
+        self.matrix.load()
+        version = (self.matrix.signature, len(self.matrix.dates))
+        if version == self._version:
+            return
+
+        with self._lock:
+            if version == self._version:
+                return
+            for resolution in ("week", "month"):
+                stored = self._read(resolution)
+                current = bool(self.matrix.dates) and stored is not None
+                if not (
+                    current
+                    and stored[2] == self.matrix.dates[-1]
+                    and stored[1] == list(self.matrix.repos)
+                ):
+                    if self.matrix.dates:
+                        self._write(resolution, self._update(resolution, stored))
+            self._version = version
+
+    def _tier_signature(self) -> tuple:
+        signature = []
+        for resolution in ("week", "month"):
+            try:
+                stat = os.stat(self.path(resolution))
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def load(self):
+        """Re-read the tier files if the writer replaced them since last time"""
+        signature = self._tier_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature != self._signature:
+                self._tiers = {
+                    resolution: self._read(resolution)
+                    for resolution in ("week", "month")
+                }
+                self._signature = signature
+
+    def tier(
+        self, resolution: str
+    ) -> Tuple[List[str], List[str], np.ndarray, np.ndarray]:
+        """(labels, repo names, stars, presence mask) of one tier"""
+        if resolution == "day":
+            matrix = self.matrix
+            return list(matrix.dates), list(matrix.repos), matrix.stars, matrix.mask
+
+        stored = self._tiers.get(resolution)
+        if stored is None:
+            return [], [], np.zeros((0, 0), dtype=np.int64), np.zeros((0, 0), bool)
+        labels, repos, _, close, present = stored
+        return labels, repos, close, present
+
+    def top_names(self, limit: int) -> List[str]:
+        """Names of the latest day's ``limit`` most-starred repositories"""
+        if not self.matrix.dates:
+            return []
+        stars, present = self.matrix.stars[:, -1], self.matrix.mask[:, -1]
+        order = np.argsort(-stars, kind="stable")
+        return [self.matrix.repos[i] for i in order if present[i]][:limit]
+
+    def history(
+        self,
+        names: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        resolution: str = "day",
+        points: int = DEFAULT_POINTS,
+        method: str = "lttb",
+    ) -> Dict:
+        """Star history of ``names`` between two dates, at most ``points`` each"""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+        if method not in DOWNSAMPLERS:
+            raise ValueError(f"downsample must be one of {', '.join(DOWNSAMPLERS)}")
+        if not 3 <= points <= MAX_POINTS:
+            raise ValueError(f"points must be between 3 and {MAX_POINTS}")
+        if names is not None and len(names) > MAX_HISTORY_REPOS:
+            raise ValueError(f"at most {MAX_HISTORY_REPOS} repos per query")
+
+        self.load()
+        labels, repos, stars, mask = self.tier(resolution)
+        if names is None:
+            names = self.top_names(DEFAULT_HISTORY_REPOS)
+
+        lo = bisect_left(labels, bucket_start(start, resolution)) if start else 0
+        hi = bisect_right(labels, end) if end else len(labels)
+        ids = {name: i for i, name in enumerate(repos)}
+        found = [name for name in names if name in ids]
+        selected = [ids[name] for name in found]
+        rows = np.where(mask[selected, lo:hi], stars[selected, lo:hi], np.nan).reshape(
+            len(selected), max(hi - lo, 0)
+        )
+        window = labels[lo:hi]
+
+        pick = lttb_indices if method == "lttb" else minmax_indices
+        window_labels = np.array(window, dtype=object)
+        series = {
+            name: {
+                "dates": window_labels[columns].tolist(),
+                "stars": rows[r, columns].astype(np.int64).tolist(),
+            }
+            for r, (name, columns) in enumerate(zip(found, pick(rows, points)))
+        }
+        return {
+            "resolution": resolution,
+            "from": window[0] if window else None,
+            "to": window[-1] if window else None,
+            "points": points,
+            "downsample": method,
+            "series": series,
+            "missing": [name for name in names if name not in ids],
+        }
+
+
+# Global rollups shared by the update scripts and the API
+rollup_store = RollupStore()
@@ -0,0 +1,337 @@
+"""
+Shared Cache for StellarNexus
+Cache tier and distributed lock shared by API workers and replicas
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, where there are no forked workers
+    fcntl = None
+
+try:
+    import redis
+except ImportError:  # optional: the in-process cache is the fallback
+    redis = None
+
+REDIS_URL = os.getenv("REDIS_URL", "")
+# Without Redis, processes on one host (pre-forked workers) share this directory
+SHARED_CACHE_DIR = os.getenv("SHARED_CACHE_DIR", "")
+# Every key is namespaced so the Redis instance can be shared
+KEY_PREFIX = "stellar:"
+# Commands fail fast so an unreachable Redis degrades to cache misses
+REDIS_TIMEOUT = 0.5
+
+# Compare-and-delete: only the holder's token releases a lock
+RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Compare-and-expire: only the holder's token extends a lock
+EXTEND_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def _json_default(value):
+    # numpy scalars from pandas aggregates
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode_value(value) -> bytes:
+    return json.dumps(value, default=_json_default).encode("utf-8")
+
+
+def decode_value(data: bytes):
+    return json.loads(data)
+
+
+class LocalCache:
+    """In-process stand-in for Redis: byte values with TTLs, and locks.
+
+    Only shares state between threads of one process, which is all a
+    single-worker deployment needs.
+    """
+
+    name = "local"
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._values: Dict[str, Tuple[float, bytes]] = {}
+        self._locks: Dict[str, Tuple[float, str]] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            if self.clock() >= entry[0]:
+                del self._values[key]
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._values[key] = (self.clock() + ttl, value)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._values if key.startswith(prefix)]
+            for key in keys:
+                del self._values[key]
+        return len(keys)
+
+    def acquire(self, name: str, token: str, timeout: float) -> bool:
+        with self._lock:
+            held = self._locks.get(name)
+            if held is not None and self.clock() < held[0]:
+                return False
+            self._locks[name] = (self.clock() + timeout, token)
+            return True
+
+    def extend(self, name: str, token: str, timeout: float) -> bool:
+        with self._lock:
+            held = self._locks.get(name)
+            if held is None or held[1] != token or self.clock() >= held[0]:
+                return False
+            self._locks[name] = (self.clock() + timeout, token)
+            return True
+
+    def release(self, name: str, token: str):
+        with self._lock:
+            held = self._locks.get(name)
+            if held is not None and held[1] == token:
+                del self._locks[name]
+
+
+class FileCache:
+    """Cache and locks kept in a directory, shared by processes on one host.
+
+    The stand-in for Redis when pre-forked workers must see each other's
+    state. A value is a file holding its expiry time and bytes, written to
+    a unique temp file and renamed into place; lock files are read and
+    written under an exclusive ``flock``.
+    """
+
+    name = "file"
+
+    def __init__(self, directory: str, clock=time.time):
+        if fcntl is None:
+            raise RuntimeError("the file cache needs fcntl (POSIX only)")
+        self.directory = directory
+        self.clock = clock
+        os.makedirs(os.path.join(directory, "locks"), exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, quote(key, safe=""))
+
+    def _lock_path(self, name: str) -> str:
+        return os.path.join(self.directory, "locks", quote(name, safe=""))
+
+    def _write(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _read(self, path: str) -> Optional[Tuple[float, bytes]]:
+        try:
+            with open(path, "rb") as f:
+                expires, _, value = f.read().partition(b"\n")
+            return float(expires), value
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._read(self._path(key))
+        if entry is None or self.clock() >= entry[0]:
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._write(self._path(key), b"%r\n" % (self.clock() + ttl) + value)
+
+    def delete_prefix(self, prefix: str) -> int:
+        quoted = quote(prefix, safe="")
+        deleted = 0
+        for name in os.listdir(self.directory):
+            if name.startswith(quoted):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    deleted += 1
+                except (FileNotFoundError, IsADirectoryError):
+                    pass
+        return deleted
+
+    @contextmanager
+    def _guard(self):
+        fd = os.open(os.path.join(self.directory, "locks", ".guard"), os.O_CREAT)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def acquire(self, name: str, token: str, timeout: float) -> bool:
+        path = self._lock_path(name)
+        with self._guard():
+            held = self._read(path)
+            if held is not None and self.clock() < held[0]:
+                return False
+            self._write(path, b"%r\n" % (self.clock() + timeout) + token.encode())
+            return True
+
+    def extend(self, name: str, token: str, timeout: float) -> bool:
+        path = self._lock_path(name)
+        with self._guard():
+            held = self._read(path)
+            if held is None or held[1] != token.encode() or self.clock() >= held[0]:
+                return False
+            self._write(path, b"%r\n" % (self.clock() + timeout) + token.encode())
+            return True
+
+    def release(self, name: str, token: str):
+        path = self._lock_path(name)
+        with self._guard():
+            held = self._read(path)
+            if held is not None and held[1] == token.encode():
+                os.remove(path)
+
+
+class RedisCache:
+    """Redis-backed cache shared by every process that uses the same server.
+
+    Cache errors are reported and treated as misses, so the API keeps
+    serving if Redis goes away. A lock that cannot reach Redis falls back to
+    a process-local one, so the guarded work still runs, serialised within
+    this process, instead of being skipped everywhere.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = REDIS_URL, client=None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("the redis package is required for REDIS_URL")
+            client = redis.Redis.from_url(
+                url, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT
+            )
+        self.client = client
+        self._fallback = LocalCache()
+        self._fallback_tokens = set()
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get(KEY_PREFIX + key)
+        except Exception as e:
+            print(f"Shared cache read failed: {e}")
+            return None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        try:
+            self.client.set(KEY_PREFIX + key, value, px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            print(f"Shared cache write failed: {e}")
+
+    def delete_prefix(self, prefix: str) -> int:
+        try:
+            keys = list(self.client.scan_iter(match=f"{KEY_PREFIX}{prefix}*"))
+            return self.client.delete(*keys) if keys else 0
+        except Exception as e:
+            print(f"Shared cache delete failed: {e}")
+            return 0
+
+    def acquire(self, name: str, token: str, timeout: float) -> bool:
+        try:
+            key = f"{KEY_PREFIX}lock:{name}"
+            return bool(self.client.set(key, token, nx=True, px=int(timeout * 1000)))
+        except Exception as e:
+            print(f"Shared lock unavailable, using a local lock: {e}")
+        if not self._fallback.acquire(name, token, timeout):
+            return False
+        self._fallback_tokens.add(token)
+        return True
+
+    def extend(self, name: str, token: str, timeout: float) -> bool:
+        if token in self._fallback_tokens:
+            return self._fallback.extend(name, token, timeout)
+        try:
+            key = f"{KEY_PREFIX}lock:{name}"
+            ttl = int(timeout * 1000)
+            return bool(self.client.eval(EXTEND_LOCK, 1, key, token, ttl))
+        except Exception as e:
+            print(f"Shared lock renewal failed: {e}")
+            return False
+
+    def release(self, name: str, token: str):
+        if token in self._fallback_tokens:
+            self._fallback_tokens.discard(token)
+            self._fallback.release(name, token)
+            return
+        try:
+            self.client.eval(RELEASE_LOCK, 1, f"{KEY_PREFIX}lock:{name}", token)
+        except Exception as e:
+            print(f"Shared lock release failed: {e}")
+
+
+@contextmanager
+def distributed_lock(cache, name: str, timeout: float) -> Iterator[bool]:
+    """Non-blocking lock, renewed while held, that expires ``timeout`` seconds
+    after its holder stops renewing it.
+
+    Yields whether it was acquired; callers skip their work when another
+    worker or replica already holds it. A background thread extends the
+    lock every third of the timeout, so work outliving the timeout keeps
+    it; the timeout only bounds how long a crashed holder blocks everyone.
+    """
+    token = uuid.uuid4().hex
+    acquired = cache.acquire(name, token, timeout)
+    stop = threading.Event()
+
+    def renew():
+        while not stop.wait(timeout / 3):
+            if not cache.extend(name, token, timeout):
+                print(f"Lost the '{name}' lock; another holder may start")
+                return
+
+    if acquired:
+        threading.Thread(target=renew, name=f"stellar-lock-{name}", daemon=True).start()
+    try:
+        yield acquired
+    finally:
+        stop.set()
+        if acquired:
+            cache.release(name, token)
+
+
+def create_shared_cache(url: str = REDIS_URL, directory: str = SHARED_CACHE_DIR):
+    """Redis (REDIS_URL), else a file cache (SHARED_CACHE_DIR), else in-process"""
+    if url and redis is not None:
+        return RedisCache(url)
+    if url:
+        print("REDIS_URL is set but redis is not installed; using a local cache")
+    if directory and fcntl is not None:
+        return FileCache(directory)
+    return LocalCache()
+
+
+# Global cache shared by the API, predictor and update jobs
+shared_cache = create_shared_cache()
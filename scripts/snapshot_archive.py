@@ -0,0 +1,253 @@
+"""
+Snapshot Archive for StellarNexus
+Slimmed, compressed JSON Lines storage and catalog of GitHub search snapshots
+"""
+
+import bisect
+import glob
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip is always available
+    zstandard = None
+
+ARCHIVE_DIR = "data/snapshots"
+MANIFEST_FILE = "manifest.jsonl"
+
+# The only fields the ML and API paths read from a search item
+ARCHIVE_FIELDS = [
+    "id",
+    "name",
+    "full_name",
+    "stargazers_count",
+    "forks_count",
+    "language",
+    "created_at",
+    "description",
+    "html_url",
+]
+
+EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+# Raw full-payload dumps written by ``data_fetcher.save_data`` in raw mode
+RAW_SNAPSHOT_PATTERN = "github_top_*.json"
+RAW_TIMESTAMP_FORMAT = "github_top_%Y%m%d_%H%M%S.json"
+
+
+def slim_item(item: Dict) -> Dict:
+    """Project a search result item down to the archived fields"""
+    return {field: item.get(field) for field in ARCHIVE_FIELDS}
+
+
+def default_compression() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _open_write(path: str, compression: str):
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        raw = open(path, "wb")
+        return zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+    return gzip.open(path, "wb", compresslevel=6)
+
+
+def _file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _as_timestamp(value: Union[str, datetime, None]) -> Optional[str]:
+    """Manifest timestamps are ISO strings, so they order lexicographically"""
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    return value
+
+
+def _open_read(path: str):
+    if path.endswith(EXTENSIONS["zstd"]):
+        if zstandard is None:
+            raise RuntimeError("reading .zst snapshots requires 'zstandard'")
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), closefd=True
+        )
+    return gzip.open(path, "rb")
+
+
+class SnapshotArchive:
+    """Writes each fetched snapshot as one compressed JSON Lines file.
+
+    Every write appends a line to ``manifest.jsonl`` (timestamp, file name,
+    row count, checksum, compression). The manifest is the catalog: it is
+    kept in memory, re-read only when the file changes, and answers
+    ``latest`` and ``between`` queries without listing the directory.
+    """
+
+    def __init__(self, directory: str = ARCHIVE_DIR, compression: Optional[str] = None):
+        self.directory = directory
+        self.compression = compression or default_compression()
+        self._lock = threading.Lock()
+        self._signature = None
+        self._entries: List[Dict] = []
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    def write(self, items: List[Dict], fetched_at: Optional[datetime] = None) -> Dict:
+        """Archive slimmed ``items`` and record the snapshot in the manifest"""
+        fetched_at = fetched_at or datetime.now()
+        os.makedirs(self.directory, exist_ok=True)
+
+        filename = self._reserve(fetched_at)
+        path = os.path.join(self.directory, filename)
+        tmp_path = f"{path}.tmp"
+
+        with _open_write(tmp_path, self.compression) as f:
+            for item in items:
+                f.write(json.dumps(slim_item(item), separators=(",", ":")).encode())
+                f.write(b"\n")
+        os.replace(tmp_path, path)
+
+        entry = {
+            "timestamp": _as_timestamp(fetched_at),
+            "path": filename,
+            "rows": len(items),
+            "checksum": _file_checksum(path),
+            "compression": self.compression,
+        }
+        with self._lock:
+            with open(self.manifest_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        return entry
+
+    def _reserve(self, fetched_at: datetime) -> str:
+        """Claim an unused file name; writes within one second get a counter"""
+        stem = f"github_top_{fetched_at.strftime('%Y%m%d_%H%M%S')}"
+        extension = EXTENSIONS[self.compression]
+        for counter in itertools.count():
+            suffix = f"_{counter}" if counter else ""
+            filename = f"{stem}{suffix}{extension}"
+            flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY
+            try:
+                fd = os.open(os.path.join(self.directory, filename), flags)
+            except FileExistsError:
+                continue
+            os.close(fd)
+            return filename
+
+    def _manifest_signature(self):
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def manifest(self) -> List[Dict]:
+        """All manifest entries, ordered by snapshot timestamp"""
+        with self._lock:
+            signature = self._manifest_signature()
+            if signature != self._signature:
+                entries = []
+                if signature is not None:
+                    with open(self.manifest_path, "r") as f:
+                        entries = self._parse_lines(f)
+                # Imports of old raw dumps may land after newer snapshots
+                entries.sort(key=lambda entry: entry["timestamp"])
+                self._entries = entries
+                self._signature = signature
+            return self._entries
+
+    @staticmethod
+    def _parse_lines(lines: Iterable[str]) -> List[Dict]:
+        """Decode complete lines, skipping blanks and a torn trailing write"""
+        entries = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    def latest(self) -> Optional[Dict]:
+        """Manifest entry of the newest snapshot"""
+        entries = self.manifest()
+        return entries[-1] if entries else None
+
+    def between(
+        self,
+        start: Union[str, datetime, None] = None,
+        end: Union[str, datetime, None] = None,
+    ) -> List[Dict]:
+        """Entries with ``start <= timestamp <= end`` (either bound optional)"""
+        entries = self.manifest()
+        timestamps = [entry["timestamp"] for entry in entries]
+        start, end = _as_timestamp(start), _as_timestamp(end)
+        lo = bisect.bisect_left(timestamps, start) if start else 0
+        # A bare date as ``end`` should include that whole day
+        hi = bisect.bisect_right(timestamps, f"{end}\uffff") if end else len(entries)
+        return entries[lo:hi]
+
+    def verify(self, entry: Dict) -> bool:
+        """Check an archived file against its recorded checksum"""
+        path = os.path.join(self.directory, entry["path"])
+        return os.path.exists(path) and _file_checksum(path) == entry["checksum"]
+
+    def iter_items(self, entry: Dict) -> Iterator[Dict]:
+        """Stream the repositories of one archived snapshot"""
+        with _open_read(os.path.join(self.directory, entry["path"])) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def latest_items(self) -> Optional[List[Dict]]:
+        """Repositories of the newest snapshot, or None when nothing is archived"""
+        entry = self.latest()
+        if entry is None:
+            return None
+        return list(self.iter_items(entry))
+
+    def import_raw(self, path: str) -> Optional[Dict]:
+        """Catalog a raw ``github_top_<ts>.json`` dump written before archiving"""
+        try:
+            fetched_at = datetime.strptime(os.path.basename(path), RAW_TIMESTAMP_FORMAT)
+        except ValueError:
+            return None
+        if any(
+            entry["timestamp"] == _as_timestamp(fetched_at) for entry in self.manifest()
+        ):
+            return None
+
+        with open(path, "r") as f:
+            data = json.load(f)
+        items = data["items"] if isinstance(data, dict) else data
+        return self.write(items, fetched_at)
+
+    def import_legacy(self, data_dir: str) -> List[Dict]:
+        """One-time scan for raw dumps in ``data_dir`` when the catalog is empty"""
+        if self.manifest():
+            return []
+        imported = []
+        for path in sorted(glob.glob(os.path.join(data_dir, RAW_SNAPSHOT_PATTERN))):
+            entry = self.import_raw(path)
+            if entry is not None:
+                print(f"Imported raw snapshot {path} into {self.directory}")
+                imported.append(entry)
+        return imported
+
+
+# Global snapshot catalog used by the daily update
+snapshot_archive = SnapshotArchive()
@@ -0,0 +1,286 @@
+"""
+Time-Series Store for StellarNexus
+Columnar repo x day star matrix persisted as memory-mapped NumPy arrays
+"""
+
+import json
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scripts.history_store import repo_key
+except ImportError:  # executed directly from the scripts directory
+    from history_store import repo_key
+
+TIMESERIES_DIR = "data/timeseries"
+
+# Initial capacity; both axes double when exhausted so appends stay amortised O(1)
+INITIAL_REPO_CAPACITY = 64
+INITIAL_DAY_CAPACITY = 64
+# What the repo axis is keyed on; an index written under another key is rebuilt
+REPO_KEY = "full_name"
+
+
+class StarMatrix:
+    """Star counts indexed by (repo_id, day) with an explicit presence mask.
+
+    Layout on disk (``directory``):
+
+    * ``stars.npy`` - int64 matrix of shape (repo capacity, day capacity)
+    * ``mask.npy``  - bool matrix of the same shape, True where a repo was
+      present in that day's snapshot
+    * ``index.json`` - the repo-id dictionary (ordered ``owner/name`` keys,
+      see ``repo_key``) and date axis
+
+    Both matrices are stored in Fortran order so a day is one contiguous
+    column: appending a snapshot writes a single block in place through a
+    writable memory map, and reads slice the memory map without parsing JSON.
+    """
+
+    def __init__(self, directory: str = TIMESERIES_DIR):
+        self.directory = directory
+        self.repos: List[str] = []
+        self.repo_ids: Dict[str, int] = {}
+        self.dates: List[str] = []
+        self.key = None
+        self._stars = None
+        self._mask = None
+        self._signature = None
+
+    @property
+    def stars_path(self) -> str:
+        return os.path.join(self.directory, "stars.npy")
+
+    @property
+    def mask_path(self) -> str:
+        return os.path.join(self.directory, "mask.npy")
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, "index.json")
+
+    def _index_signature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self) -> bool:
+        """(Re)open the matrices read-only if the index changed on disk"""
+        signature = self._index_signature()
+        if signature is None:
+            self.repos, self.repo_ids, self.dates = [], {}, []
+            self.key = None
+            self._stars = self._mask = None
+            self._signature = None
+            return False
+
+        if signature != self._signature:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            self.repos = index["repos"]
+            self.repo_ids = {name: i for i, name in enumerate(self.repos)}
+            self.dates = index["dates"]
+            self.key = index.get("key")
+            self._stars = np.load(self.stars_path, mmap_mode="r")
+            self._mask = np.load(self.mask_path, mmap_mode="r")
+            self._signature = signature
+
+        return True
+
+    @property
+    def signature(self) -> Optional[tuple]:
+        """Signature of the index the loaded matrices belong to"""
+        return self._signature
+
+    @property
+    def stars(self) -> np.ndarray:
+        """Stars matrix trimmed to the populated (repos, days) region"""
+        self.load()
+        if self._stars is None:
+            return np.zeros((0, 0), dtype=np.int64)
+        return self._stars[: len(self.repos), : len(self.dates)]
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Presence mask trimmed to the populated (repos, days) region"""
+        self.load()
+        if self._mask is None:
+            return np.zeros((0, 0), dtype=bool)
+        return self._mask[: len(self.repos), : len(self.dates)]
+
+    def _temp_file(self, path: str):
+        """Unique temp file beside ``path``, so concurrent writers never share one"""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.directory, prefix=f".{os.path.basename(path)}."
+        )
+        return os.fdopen(fd, "wb"), tmp_path
+
+    def _write_index(self):
+        f, tmp_path = self._temp_file(self.index_path)
+        with f:
+            index = {"key": REPO_KEY, "repos": self.repos, "dates": self.dates}
+            f.write(json.dumps(index).encode())
+        os.replace(tmp_path, self.index_path)
+
+    def _save_arrays(self, stars: np.ndarray, mask: np.ndarray):
+        """Persist full arrays via temp files so open memory maps stay valid"""
+        os.makedirs(self.directory, exist_ok=True)
+        for path, array in ((self.stars_path, stars), (self.mask_path, mask)):
+            f, tmp_path = self._temp_file(path)
+            with f:
+                np.save(f, np.asfortranarray(array))
+            os.replace(tmp_path, path)
+
+    @staticmethod
+    def _grown(capacity: int, needed: int) -> int:
+        while capacity < needed:
+            capacity *= 2
+        return capacity
+
+    def rebuild(self, entries: Iterable[Dict]):
+        """Build the store from scratch out of an iterable of history entries"""
+        repos: List[str] = []
+        repo_ids: Dict[str, int] = {}
+        dates: List[str] = []
+        columns = []
+
+        for entry in entries:
+            if dates and dates[-1] == entry["date"]:
+                # Same-day re-run: the later snapshot wins
+                dates.pop()
+                columns.pop()
+            column = {}
+            for repo in entry["repositories"]:
+                name = repo_key(repo)
+                if name not in repo_ids:
+                    repo_ids[name] = len(repos)
+                    repos.append(name)
+                column[repo_ids[name]] = repo["stars"]
+            dates.append(entry["date"])
+            columns.append(column)
+
+        repo_capacity = self._grown(INITIAL_REPO_CAPACITY, len(repos))
+        day_capacity = self._grown(INITIAL_DAY_CAPACITY, len(dates))
+        stars = np.zeros((repo_capacity, day_capacity), dtype=np.int64, order="F")
+        mask = np.zeros((repo_capacity, day_capacity), dtype=bool, order="F")
+        for day, column in enumerate(columns):
+            if column:
+                ids = np.fromiter(column.keys(), dtype=np.int64)
+                stars[ids, day] = np.fromiter(column.values(), dtype=np.int64)
+                mask[ids, day] = True
+
+        self._save_arrays(stars, mask)
+        self.repos, self.dates = repos, dates
+        self._write_index()
+        self._signature = None
+        self.load()
+
+    def append_snapshot(self, entry: Dict):
+        """Add (or replace) one day's column, growing capacity when needed"""
+        self.load()
+        if self._stars is None:
+            self.rebuild([entry])
+            return
+
+        repos = list(self.repos)
+        repo_ids = dict(self.repo_ids)
+        keys = [repo_key(repo) for repo in entry["repositories"]]
+        for key in keys:
+            if key not in repo_ids:
+                repo_ids[key] = len(repos)
+                repos.append(key)
+
+        dates = list(self.dates)
+        if dates and dates[-1] == entry["date"]:
+            day = len(dates) - 1
+        else:
+            dates.append(entry["date"])
+            day = len(dates) - 1
+
+        repo_capacity, day_capacity = self._stars.shape
+        if len(repos) > repo_capacity or len(dates) > day_capacity:
+            new_shape = (
+                self._grown(repo_capacity, len(repos)),
+                self._grown(day_capacity, len(dates)),
+            )
+            stars = np.zeros(new_shape, dtype=np.int64, order="F")
+            mask = np.zeros(new_shape, dtype=bool, order="F")
+            stars[:repo_capacity, :day_capacity] = self._stars
+            mask[:repo_capacity, :day_capacity] = self._mask
+        else:
+            stars = np.load(self.stars_path, mmap_mode="r+")
+            mask = np.load(self.mask_path, mmap_mode="r+")
+
+        stars[:, day] = 0
+        mask[:, day] = False
+        for key, repo in zip(keys, entry["repositories"]):
+            stars[repo_ids[key], day] = repo["stars"]
+            mask[repo_ids[key], day] = True
+
+        if isinstance(stars, np.memmap):
+            stars.flush()
+            mask.flush()
+            del stars, mask
+        else:
+            self._save_arrays(stars, mask)
+
+        # The index is written last so readers never see a day whose column
+        # is not on disk yet
+        self.repos, self.dates = repos, dates
+        self._write_index()
+        self._signature = None
+        self.load()
+
+    def sync(self, history_log) -> bool:
+        """Rebuild from the history log when the store lags behind it.
+
+        Only the log's last line is read for the check (plus the index key,
+        so a store keyed on short names is rebuilt). Returns True when a
+        rebuild happened.
+        """
+        self.load()
+        tail = history_log.read_tail(1)
+        if not tail:
+            return False
+        if self.key == REPO_KEY and self.dates and self.dates[-1] == tail[-1]["date"]:
+            return False
+        self.rebuild(history_log.iter_entries())
+        return True
+
+    def series(
+        self, names: Optional[List[str]] = None, last_days: Optional[int] = None
+    ) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """Return the date axis and float star series (NaN where missing)"""
+        stars, mask = self.stars, self.mask
+        dates = self.dates
+        if last_days is not None:
+            start = max(0, len(dates) - last_days)
+            stars, mask, dates = stars[:, start:], mask[:, start:], dates[start:]
+
+        if names is None:
+            names = self.repos
+        ids = [self.repo_ids[name] for name in names if name in self.repo_ids]
+        values = np.where(mask[ids], stars[ids], np.nan)
+        return list(dates), {self.repos[i]: row for i, row in zip(ids, values)}
+
+    def deltas(self, window: int = 1) -> Dict[str, int]:
+        """Star change between the latest snapshot and ``window`` snapshots back.
+
+        Only repos present in both snapshots get an entry.
+        """
+        stars, mask = self.stars, self.mask
+        if stars.shape[1] <= window:
+            return {}
+
+        present = mask[:, -1] & mask[:, -1 - window]
+        change = stars[:, -1] - stars[:, -1 - window]
+        return {self.repos[i]: int(change[i]) for i in np.flatnonzero(present).tolist()}
+
+
+# Global store shared by the update scripts and the API
+star_matrix = StarMatrix()
@@ -0,0 +1,46 @@
+"""
+Shared pytest configuration for the StellarNexus test suite
+"""
+
+import os
+import sys
+
+import pytest
+
+# Make ``scripts.*`` and ``api.*`` importable regardless of how pytest is invoked
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def history_entry(day, *counts, owner=None, rank_by_stars=False, **stars):
+    """One history log entry for tests.
+
+    ``day`` is an ISO date or a ``date``. Stars are given by name (``a=10``)
+    or positionally, as ``repo-1``, ``repo-2``, ... Ranks follow argument
+    order unless ``rank_by_stars``. With an ``owner`` every repository also
+    carries its ``full_name`` and GitHub URL.
+    """
+    stars = {**{f"repo-{i}": s for i, s in enumerate(counts, 1)}, **stars}
+    items = list(stars.items())
+    if rank_by_stars:
+        items.sort(key=lambda item: -item[1])
+
+    repositories = []
+    for rank, (name, count) in enumerate(items, 1):
+        repo = {
+            "name": name,
+            "stars": count,
+            "rank": rank,
+            "url": "",
+            "description": "",
+        }
+        if owner is not None:
+            repo["full_name"] = f"{owner}/{name}"
+            repo["url"] = f"https://github.com/{owner}/{name}"
+        repositories.append(repo)
+    return {"date": str(day), "repositories": repositories}
+
+
+@pytest.fixture
+def make_entry():
+    """Factory for history log entries (see ``history_entry``)"""
+    return history_entry
@@ -4,7 +4,49 @@ Integration tests for StellarNexus
 These tests verify that different components work together correctly.
 """
 
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
 import pytest
+from fastapi.testclient import TestClient
+
+import api.main as api_main
+from scripts.database import Database, ingest_snapshot
+from scripts.history_store import HistoryLog, HistoryStore
+from scripts.shared_cache import LocalCache
+
+
+@pytest.fixture
+def client():
+    return TestClient(api_main.app)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    log = HistoryLog(str(tmp_path / "history.jsonl"), str(tmp_path / "legacy.json"))
+    store = HistoryStore(log)
+    for date, stars in (("2025-09-07", 3), ("2025-09-08", 5)):
+        store.publish(
+            {
+                "date": date,
+                "repositories": [
+                    {
+                        "name": "a",
+                        "stars": stars,
+                        "rank": 1,
+                        "url": "u",
+                        "description": "",
+                    }
+                ],
+            }
+        )
+    monkeypatch.setattr(api_main, "history_store", store)
+    return store
 
 
 class TestAPIIntegration:
@@ -14,4 +56,181 @@ class TestAPIIntegration:
         """Placeholder integration test"""
         # This is a placeholder to show integration test structure
         # Real integration tests would test API endpoints, database connections, etc.
-        assert True
\ No newline at end of file
+        assert True
+
+    def test_health_check(self, client):
+        response = client.get("/api/health")
+        assert response.status_code == 200
+        assert response.json()["status"] == "healthy"
+
+    def test_slow_ml_work_does_not_block_the_loop(self, monkeypatch):
+        release = threading.Event()
+
+        class SlowPredictor:
+            class prediction_cache:
+                @staticmethod
+                def metrics():
+                    release.wait(5)  # a cold model load
+                    return {"hits": 0}
+
+        monkeypatch.setattr(api_main, "get_predictor", lambda: SlowPredictor)
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=api_main.app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as http:
+                start = time.perf_counter()
+                slow = asyncio.create_task(http.get("/api/ml/cache-stats"))
+                await asyncio.sleep(0.05)
+                health = await http.get("/api/health")
+                elapsed = time.perf_counter() - start
+                release.set()
+                return health, elapsed, await slow
+
+        health, elapsed, slow = asyncio.run(scenario())
+        assert health.status_code == 200 and elapsed < 1
+        assert slow.json() == {"hits": 0}
+
+    def test_refresh_runs_as_background_job(self, client):
+        with patch.object(
+            api_main, "run_refresh", return_value={"repositories": 10}
+        ) as run_refresh:
+            response = client.post("/api/refresh-data")
+            assert response.status_code == 202
+            status_url = response.json()["status_url"]
+
+            for _ in range(100):
+                job = client.get(status_url).json()
+                if job["status"] in ("succeeded", "failed"):
+                    break
+                time.sleep(0.01)
+
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"repositories": 10}
+        run_refresh.assert_called_once()
+
+    def test_running_refresh_cannot_be_cancelled(self, client):
+        started, release = threading.Event(), threading.Event()
+
+        def refresh():
+            started.set()
+            release.wait(5)
+            return {"repositories": 1}
+
+        with patch.object(api_main, "run_refresh", side_effect=refresh):
+            job_id = client.post("/api/refresh-data").json()["job_id"]
+            started.wait(5)
+            response = client.delete(f"/api/jobs/{job_id}")
+            release.set()
+
+        assert response.status_code == 409
+
+    def test_unknown_job(self, client):
+        assert client.get("/api/jobs/missing").status_code == 404
+
+    def test_static_chart_revalidates_with_etag(self, client):
+        response = client.get("/static/stars_trend.png")
+        assert response.status_code == 200
+        assert "max-age" in response.headers["cache-control"]
+
+        etag = response.headers["etag"]
+        again = client.get("/static/stars_trend.png", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+
+    def test_chart_series_etag(self, client):
+        data = {"dates": ["2025-09-01"], "series": {"a": [10]}}
+        with patch.object(api_main, "chart_series", return_value=data):
+            response = client.get("/api/chart/series")
+            assert response.json() == data
+
+            etag = response.headers["etag"]
+            again = client.get("/api/chart/series", headers={"If-None-Match": etag})
+            assert again.status_code == 304
+
+    def test_import_leaves_heavy_modules_unloaded(self):
+        code = (
+            "import sys, api.main; "
+            "print([m for m in ('pandas', 'sklearn', 'matplotlib', "
+            "'scripts.ml_predictor') if m in sys.modules])"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "[]"
+
+    def test_top_repos_and_analytics_revalidate(self, client, store):
+        for path in ("/api/top-repos", "/api/analytics"):
+            response = client.get(path)
+            assert response.status_code == 200
+            etag = response.headers["etag"]
+
+            again = client.get(path, headers={"If-None-Match": etag})
+            assert again.status_code == 304 and not again.content
+
+        assert client.get("/api/top-repos").json()[0]["name"] == "a"
+        gainer = client.get("/api/analytics").json()["top_gainer"]
+        assert (gainer["stars"], gainer["stars_gained"]) == (5, 2)
+
+    def test_top_repos_rejects_out_of_range_limit(self, client):
+        for limit in (-1, 0, 1001):
+            response = client.get(f"/api/top-repos?limit={limit}")
+            assert response.status_code == 422
+
+    def test_database_backend_serves_reads(self, client, tmp_path, monkeypatch):
+        url = f"sqlite:///{tmp_path / 'stellar.db'}"
+        ingest_snapshot(
+            [
+                {
+                    "id": 7,
+                    "name": "b",
+                    "html_url": "u",
+                    "description": None,
+                    "stargazers_count": 9,
+                }
+            ],
+            url=url,
+        )
+        db = Database(url)
+        monkeypatch.setattr(api_main, "STORAGE_BACKEND", "database")
+        monkeypatch.setattr(api_main, "database", db)
+        monkeypatch.setattr(api_main, "shared_cache", LocalCache())
+        try:
+            assert client.get("/api/top-repos").json()[0]["name"] == "b"
+            assert client.get("/api/analytics").json()["total_repositories"] == 1
+        finally:
+            asyncio.run(db.close())
+
+    def test_movers_endpoint(self, client, monkeypatch):
+        result = {
+            "window": "7d",
+            "as_of": "2025-09-08",
+            "since": "2025-09-01",
+            "sort": "stars",
+            "movers": [],
+        }
+        engine = type("Engine", (), {"movers": lambda self, *args: result})()
+        monkeypatch.setattr(api_main, "movers_engine", engine)
+        assert client.get("/api/analytics/movers?window=7d").json() == result
+
+    def test_movers_rejects_unknown_window(self, client):
+        assert client.get("/api/analytics/movers?window=2w").status_code == 400
+
+    def test_history_endpoint(self, client, monkeypatch):
+        calls = []
+
+        class Rollups:
+            def history(self, *args):
+                calls.append(args)
+                return {"resolution": "week", "series": {}}
+
+        monkeypatch.setattr(api_main, "rollup_store", Rollups())
+        response = client.get(
+            "/api/history?repos=a,b&from=2025-01-01&to=2025-06-30"
+            "&resolution=week&points=100"
+        )
+        assert response.status_code == 200 and response.headers["etag"]
+        assert calls == [(["a", "b"], "2025-01-01", "2025-06-30", "week", 100, "lttb")]
+
+    def test_history_rejects_unknown_resolution(self, client):
+        assert client.get("/api/history?resolution=year").status_code == 400
@@ -0,0 +1,84 @@
+"""
+Tests for the chart series export and hash-skipping render stage
+"""
+
+import pytest
+
+import scripts.chart_render as chart_render
+from scripts.history_store import HistoryLog
+from scripts.timeseries_store import StarMatrix
+
+
+class History:
+    """Records snapshots the way update_history does: log, then matrix"""
+
+    def __init__(self, log, matrix):
+        self.log = log
+        self.matrix = matrix
+
+    def append(self, entry):
+        self.log.append(entry)
+        self.matrix.append_snapshot(entry)
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    log = HistoryLog(str(tmp_path / "history.jsonl"), str(tmp_path / "legacy.json"))
+    monkeypatch.setattr(chart_render, "history_log", log)
+    monkeypatch.setattr(chart_render, "star_matrix", StarMatrix(str(tmp_path / "ts")))
+    monkeypatch.setattr(chart_render, "CHART_FILE", str(tmp_path / "chart.png"))
+    monkeypatch.setattr(chart_render, "CHART_HASH_FILE", str(tmp_path / "chart.sha"))
+    return History(log, StarMatrix(str(tmp_path / "ts")))
+
+
+class TestChartRender:
+    """Test series export and render skipping"""
+
+    def test_series_marks_gaps(self, history, make_entry):
+        history.append(make_entry("2025-09-01", a=10, b=5))
+        history.append(make_entry("2025-09-02", a=12))
+        history.append(make_entry("2025-09-03", b=9, a=15))
+
+        data = chart_render.chart_series()
+        assert data["dates"] == ["2025-09-01", "2025-09-02", "2025-09-03"]
+        assert data["series"] == {"b": [5, None, 9], "a": [10, 12, 15]}
+
+    def test_series_never_writes_the_matrix(self, history, tmp_path, make_entry):
+        history.log.append(make_entry("2025-09-01", a=10))
+        assert chart_render.chart_series()["dates"] == []
+        assert not (tmp_path / "ts").exists()
+
+    def test_render_skipped_while_data_unchanged(
+        self, history, monkeypatch, make_entry
+    ):
+        rendered = []
+        monkeypatch.setattr(
+            chart_render, "render_png", lambda data: rendered.append(data)
+        )
+        monkeypatch.setattr(chart_render.os.path, "exists", lambda path: True)
+
+        history.append(make_entry("2025-09-01", a=10))
+        assert chart_render.render_chart()
+        assert not chart_render.render_chart()
+
+        history.append(make_entry("2025-09-02", a=11))
+        assert chart_render.render_chart()
+        assert len(rendered) == 2
+
+    def test_png_written(self, history, make_entry):
+        history.append(make_entry("2025-09-01", a=10))
+        history.append(make_entry("2025-09-02", a=11))
+        assert chart_render.render_chart()
+        with open(chart_render.CHART_FILE, "rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+    def test_render_timeout_is_skipped(self, monkeypatch):
+        def hang(*args, **kwargs):
+            raise chart_render.subprocess.TimeoutExpired(args[0], kwargs["timeout"])
+
+        monkeypatch.setattr(chart_render.subprocess, "run", hang)
+        assert chart_render.render_in_subprocess(timeout=1) is False
+
+    def test_no_history(self, history):
+        assert chart_render.chart_series() is None
+        assert not chart_render.render_chart()
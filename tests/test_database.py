@@ -0,0 +1,101 @@
+"""
+Tests for the database storage backend (SQLite stand-in)
+"""
+
+import asyncio
+from datetime import date, datetime, timezone
+
+from scripts.database import (
+    Database,
+    _timestamp,
+    ingest_snapshot,
+    sqlite_statement,
+)
+
+
+def _item(repo_id, name, stars, **extra):
+    return {
+        "id": repo_id,
+        "name": name,
+        "full_name": f"owner/{name}",
+        "description": f"{name} repo",
+        "html_url": f"https://github.com/owner/{name}",
+        "stargazers_count": stars,
+        "forks_count": 1,
+        "language": "Python",
+        "created_at": "2020-01-01T00:00:00Z",
+        **extra,
+    }
+
+
+def _run(db, *calls):
+    """Run coroutines from ``db`` on one loop and close it afterwards"""
+
+    async def scenario():
+        try:
+            return [await call(db) for call in calls]
+        finally:
+            await db.close()
+
+    return asyncio.run(scenario())
+
+
+def test_statement_rewrite_for_sqlite():
+    assert sqlite_statement("SELECT $2::date, $10") == "SELECT ?2, ?10"
+
+
+def test_github_timestamps_parse():
+    # "Z" suffixes only parse natively from Python 3.11
+    assert _timestamp("2020-01-01T00:00:00Z") == datetime(
+        2020, 1, 1, tzinfo=timezone.utc
+    )
+    assert _timestamp(None) is None
+
+
+def test_ingest_upserts_and_tracks_gains(tmp_path):
+    url = f"sqlite:///{tmp_path / 'stellar.db'}"
+    day1, day2 = date(2025, 9, 7), date(2025, 9, 8)
+    ingest_snapshot([_item(1, "a", 100), _item(2, "b", 50)], day1, url=url)
+    # Same day twice: rows are updated in place, not duplicated
+    ingest_snapshot([_item(1, "a", 100), _item(2, "b", 50)], day1, url=url)
+    ingest_snapshot([_item(2, "b", 120), _item(1, "a", 105)], day2, url=url)
+
+    top, analytics, rows = _run(
+        Database(url),
+        lambda db: db.top_repos(10),
+        lambda db: db.analytics(),
+        lambda db: db._driver.fetch(
+            "SELECT count(*) AS n, sum(stars_gained) AS gained FROM daily_stats"
+        ),
+    )
+
+    assert [(r["name"], r["stars"], r["rank"]) for r in top] == [
+        ("b", 120, 1),
+        ("a", 105, 2),
+    ]
+    assert analytics["total_repositories"] == 2
+    assert analytics["avg_stars"] == 112.5
+    assert analytics["last_updated"] == "2025-09-08"
+    assert analytics["top_gainer"]["name"] == "b"  # +70 beats +5
+    assert rows == [{"n": 4, "gained": 75}]
+
+
+def test_no_top_gainer_on_the_first_day(tmp_path):
+    url = f"sqlite:///{tmp_path / 'stellar.db'}"
+    ingest_snapshot([_item(1, "a", 100), _item(2, "b", 50)], date(2025, 9, 7), url=url)
+    (analytics,) = _run(Database(url), lambda db: db.analytics())
+    assert analytics["total_repositories"] == 2
+    assert analytics["top_gainer"] is None
+
+    # A repository entering on a later day has no gain yet either
+    ingest_snapshot([_item(3, "c", 900), _item(1, "a", 101)], date(2025, 9, 8), url=url)
+    (analytics,) = _run(Database(url), lambda db: db.analytics())
+    assert analytics["top_gainer"]["name"] == "a"
+
+
+def test_empty_database(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'empty.db'}")
+    assert _run(db, lambda db: db.top_repos(5), lambda db: db.analytics()) == [
+        [],
+        None,
+    ]
@@ -0,0 +1,210 @@
+"""
+Tests for the async enrichment crawler against a recorded-fixture server
+"""
+
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import pandas as pd
+import pytest
+
+from scripts.enrichment import (
+    EnrichmentCrawler,
+    EnrichmentStore,
+    TokenBucket,
+    sample_pages,
+    targets_from_entry,
+)
+from scripts.ml_predictor import GitHubPredictor
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "github_enrichment.json")
+REPOS = [
+    {"full_name": "octo/alpha", "stargazers_count": 5},
+    {"full_name": "octo/beta", "stargazers_count": 2},
+    {"full_name": "octo/gone", "stargazers_count": 3},
+]
+
+
+class RecordedHandler(BaseHTTPRequestHandler):
+    """Replays recorded responses keyed by path and sorted query"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = "&".join(f"{k}={v}" for k, v in sorted(parse_qsl(url.query)))
+        key = f"{url.path}?{query}"
+
+        with server.lock:
+            server.requests.append(key)
+            failing = server.fail_once.pop(key, None)
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        try:
+            recorded = server.responses.get(key, {"status": 404, "body": {}})
+            if failing is not None:
+                recorded = failing
+            body = b""
+            if recorded.get("body") is not None:
+                body = json.dumps(recorded["body"]).encode()
+            self.send_response(recorded["status"])
+            for name, value in recorded.get("headers", {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+@pytest.fixture
+def recorded_server():
+    with open(FIXTURE) as f:
+        fixture = json.load(f)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecordedHandler)
+    server.responses = fixture["responses"]
+    server.lock = threading.Lock()
+    server.requests = []
+    server.fail_once = {}
+    server.in_flight = server.peak = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _crawler(server, store, sleeps=None, **kwargs):
+    host, port = server.server_address
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    return EnrichmentCrawler(
+        base_url=f"http://{host}:{port}",
+        store=store,
+        rate=1000,
+        burst=1000,
+        page_size=2,
+        sleep=sleep if sleeps is not None else asyncio.sleep,
+        now=lambda: datetime(2025, 9, 1, tzinfo=timezone.utc),
+        **kwargs,
+    )
+
+
+class TestEnrichmentCrawler:
+    """Test record contents, checkpointing and retries"""
+
+    def test_crawls_recorded_repositories(self, recorded_server, tmp_path):
+        store = EnrichmentStore(str(tmp_path / "enrichment.jsonl"))
+        crawler = _crawler(recorded_server, store, concurrency=2)
+        summary = asyncio.run(crawler.crawl(REPOS))
+
+        assert summary["enriched"] == 2
+        assert summary["failed"] == ["octo/gone"]
+        assert recorded_server.peak <= 2
+
+        records = store.load()
+        alpha, beta = records["octo/alpha"], records["octo/beta"]
+        assert alpha["stargazer_samples"][-1] == [5, "2025-08-21T00:00:00Z"]
+        # 2 stars between 2025-06-01 and 2025-08-21
+        assert alpha["stargazer_velocity"] == round(2 / 81, 4)
+        assert (alpha["recent_commits"], alpha["recent_releases"]) == (42, 2)
+        assert alpha["contributors"] == 17
+        # An empty repository answers 409 for commits and 204 for contributors
+        assert beta["stargazer_velocity"] == 1.0
+        assert (beta["recent_commits"], beta["contributors"]) == (0, 0)
+
+    def test_resumes_from_checkpoint(self, recorded_server, tmp_path):
+        store = EnrichmentStore(str(tmp_path / "enrichment.jsonl"))
+        asyncio.run(_crawler(recorded_server, store).crawl(REPOS))
+        recorded_server.requests.clear()
+
+        summary = asyncio.run(_crawler(recorded_server, store).crawl(REPOS))
+        assert summary["skipped"] == 2
+        assert all("/octo/gone/" in key for key in recorded_server.requests)
+
+    def test_retries_server_errors(self, recorded_server, tmp_path):
+        key = "/repos/octo/beta/releases?per_page=100"
+        recorded_server.fail_once[key] = {"status": 502, "body": {}}
+        store = EnrichmentStore(str(tmp_path / "enrichment.jsonl"))
+        sleeps = []
+
+        crawler = _crawler(recorded_server, store, sleeps, backoff=0.5)
+        summary = asyncio.run(crawler.crawl(REPOS[1:2]))
+        assert summary["enriched"] == 1
+        assert summary["retries"] == 1
+        assert sleeps == [0.5]
+        assert recorded_server.requests.count(key) == 2
+
+
+def test_token_bucket_spaces_requests():
+    clock = [0.0]
+
+    async def sleep(seconds):
+        clock[0] += seconds
+
+    async def take(n):
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: clock[0], sleep=sleep)
+        for _ in range(n):
+            await bucket.acquire()
+
+    asyncio.run(take(6))
+    # The burst of 2 is free; the other 4 arrive at 2 per second
+    assert clock[0] == pytest.approx(2.0)
+
+
+def test_helpers():
+    assert sample_pages(1) == [1]
+    assert sample_pages(400) == [1, 200, 400]
+    entry = {
+        "repositories": [
+            {"name": "alpha", "url": "https://github.com/octo/alpha", "stars": 5},
+            {"name": "beta", "full_name": "octo/beta", "url": "", "stars": 3},
+        ]
+    }
+    assert targets_from_entry(entry) == [
+        {"full_name": "octo/alpha", "stargazers_count": 5},
+        {"full_name": "octo/beta", "stargazers_count": 3},
+    ]
+
+
+def test_predictor_joins_enrichment_columns(tmp_path):
+    predictor = GitHubPredictor(str(tmp_path))
+    assert predictor.enrichment.signature is None
+    predictor.enrichment.append(
+        {
+            "full_name": "octo/alpha",
+            "fetched_at": "2025-09-01",
+            "stargazer_velocity": 0.5,
+            "recent_commits": 42,
+            "recent_releases": 2,
+            "contributors": 17,
+        }
+    )
+    df = pd.DataFrame(
+        [
+            {
+                "full_name": full_name,
+                "name": full_name.split("/")[1],
+                "stargazers_count": 10,
+                "created_at": "2024-01-01T00:00:00Z",
+                "language": "Go",
+                "description": None,
+            }
+            for full_name in ("octo/alpha", "octo/beta")
+        ]
+    )
+
+    assert predictor.enrichment.signature is not None
+    X = predictor.features.feature_matrix(predictor.with_enrichment(df))
+    assert list(X["recent_commits"]) == [42, 0]
+    assert list(X["contributors"]) == [17, 0]
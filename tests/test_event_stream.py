@@ -0,0 +1,125 @@
+"""
+Tests for the SSE broadcast hub and snapshot deltas
+"""
+
+import asyncio
+import threading
+
+from scripts.event_stream import BroadcastHub, snapshot_deltas
+from scripts.history_store import HistoryLog, HistoryStore
+
+
+async def _never_disconnected():
+    return False
+
+
+async def _collect(hub, subscriber, count, heartbeat=5.0, on_idle=None):
+    """First ``count`` chunks of a subscriber's stream"""
+    chunks = []
+    stream = hub.stream(
+        subscriber,
+        snapshot=lambda: b"{}",
+        is_disconnected=_never_disconnected,
+        on_idle=on_idle,
+        heartbeat=heartbeat,
+    )
+    async for chunk in stream:
+        chunks.append(chunk)
+        if len(chunks) == count:
+            break
+    await stream.aclose()
+    return chunks
+
+
+class TestSnapshotDeltas:
+    """Test top-list change detection"""
+
+    def test_changed_entered_left(self, make_entry):
+        deltas = snapshot_deltas(
+            make_entry("2025-09-07", a=10, b=5, c=1),
+            make_entry("2025-09-08", a=12, c=1, d=3),
+        )
+        assert [r["name"] for r in deltas["changed"]] == ["a", "c"]  # c moved up
+        assert [r["name"] for r in deltas["entered"]] == ["d"]
+        assert deltas["left"] == ["b"]
+
+    def test_first_snapshot_enters_everything(self, make_entry):
+        deltas = snapshot_deltas(None, make_entry("2025-09-08", a=1, b=2))
+        assert len(deltas["entered"]) == 2 and deltas["left"] == []
+
+
+class TestBroadcastHub:
+    """Test fan-out, replay, heartbeats and slow consumers"""
+
+    def test_new_client_gets_snapshot_then_events(self):
+        hub = BroadcastHub()
+
+        async def scenario():
+            subscriber = hub.subscribe()
+            threading.Thread(target=hub.publish, args=("update", b"1")).start()
+            return await _collect(hub, subscriber, 3)
+
+        retry, snapshot, update = asyncio.run(scenario())
+        assert retry.startswith(b"retry:")
+        assert b"event: snapshot" in snapshot
+        assert update.endswith(b"event: update\ndata: 1\n\n")
+        assert hub.subscribers == 0
+
+    def test_reconnect_replays_missed_events(self):
+        hub = BroadcastHub()
+        first = hub.publish("update", b"1")
+        hub.publish("update", b"2")
+        hub.publish("update", b"3")
+
+        async def scenario(last_event_id):
+            return await _collect(hub, hub.subscribe(last_event_id), 3)
+
+        chunks = asyncio.run(scenario(first))
+        assert [c.split(b"data: ")[1] for c in chunks[1:]] == [b"2\n\n", b"3\n\n"]
+
+        # An id from another process (or a restart) gets a full snapshot
+        chunks = asyncio.run(scenario("deadbeef-2"))
+        assert b"event: snapshot" in chunks[1]
+
+    def test_heartbeat_when_idle(self):
+        hub = BroadcastHub()
+        idle = []
+
+        async def scenario():
+            subscriber = hub.subscribe(hub.last_event_id)
+            return await _collect(
+                hub, subscriber, 2, heartbeat=0.05, on_idle=lambda: idle.append(1)
+            )
+
+        assert asyncio.run(scenario())[1] == b": heartbeat\n\n"
+        assert idle
+
+    def test_slow_consumer_is_disconnected(self):
+        hub = BroadcastHub(queue_size=2)
+
+        async def scenario():
+            subscriber = hub.subscribe(hub.last_event_id)
+            for i in range(4):
+                hub.publish("update", b"%d" % i)
+            await asyncio.sleep(0)
+            return await _collect(hub, subscriber, 5)
+
+        assert asyncio.run(scenario()) == [b"retry: 5000\n\n"]
+
+
+class TestHistoryListeners:
+    """Test that new snapshots reach listeners exactly once"""
+
+    def test_publish_and_external_writes_notify(self, tmp_path, make_entry):
+        log = HistoryLog(str(tmp_path / "h.jsonl"), str(tmp_path / "legacy.json"))
+        log.append(make_entry("2025-09-07", a=1))
+        store = HistoryStore(log, check_interval=0)
+        seen = []
+        store.add_listener(lambda previous, latest: seen.append(latest["date"]))
+
+        store.get_latest()  # initial load is not an update
+        store.publish(make_entry("2025-09-08", a=2))
+        log.append(make_entry("2025-09-09", a=3))  # written by another process
+        store.get_latest()
+        store.get_latest()
+        assert seen == ["2025-09-08", "2025-09-09"]
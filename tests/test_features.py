@@ -0,0 +1,90 @@
+"""
+Tests for the shared feature pipeline
+"""
+
+from unittest.mock import patch
+
+import pandas as pd
+
+import scripts.features as features_module
+from scripts.features import FEATURE_COLUMNS, FeaturePipeline, snapshot_hash, utc_now
+
+
+def _snapshot():
+    return pd.DataFrame(
+        [
+            {
+                "name": "a",
+                "stargazers_count": 1000,
+                "created_at": "2020-01-01T00:00:00Z",
+                "language": "Python",
+                "description": "A repo",
+            },
+            {
+                "name": "b",
+                "stargazers_count": 10,
+                "created_at": "2024-06-01T12:00:00Z",
+                "language": "Zig",
+                "description": None,
+            },
+        ]
+    )
+
+
+class TestFeaturePipeline:
+    """Test vectorised features and per-snapshot caching"""
+
+    def test_features(self):
+        features = FeaturePipeline().transform(_snapshot())
+
+        assert list(features["language_encoded"]) == [2, 11]
+        assert list(features["has_description"]) == [1, 0]
+        assert list(features["description_length"]) == [6, 0]
+        assert features["created_at"].dt.tz is None
+        assert (features["growth_rate"] > 0).all()
+
+    def test_naive_and_aware_timestamps_agree(self):
+        aware = _snapshot()
+        naive = aware.assign(created_at=aware["created_at"].str.rstrip("Z"))
+        now = pd.Timestamp("2025-09-07")
+
+        a = FeaturePipeline.compute(aware, now)[FEATURE_COLUMNS]
+        b = FeaturePipeline.compute(naive, now)[FEATURE_COLUMNS]
+        pd.testing.assert_frame_equal(a, b)
+
+    def test_snapshot_is_computed_once(self):
+        pipeline = FeaturePipeline()
+        first = pipeline.transform(_snapshot())
+        second = pipeline.transform(_snapshot())
+
+        assert first is second
+        assert (pipeline.hits, pipeline.misses) == (1, 1)
+
+    def test_snapshot_id_skips_hashing(self):
+        pipeline = FeaturePipeline()
+        with patch.object(features_module, "snapshot_hash") as hashed:
+            first = pipeline.transform(_snapshot(), "checksum-1")
+            assert pipeline.transform(_snapshot(), "checksum-1") is first
+        hashed.assert_not_called()
+
+    def test_now_is_utc(self):
+        utc = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        assert utc_now().tzinfo is None
+        assert abs(utc_now() - utc) < pd.Timedelta(minutes=1)
+
+    def test_hash_changes_with_content_and_order(self):
+        df = _snapshot()
+        assert snapshot_hash(df) == snapshot_hash(_snapshot())
+        assert snapshot_hash(df) != snapshot_hash(df.iloc[::-1])
+        assert snapshot_hash(df) != snapshot_hash(df.assign(stargazers_count=[1, 2]))
+
+    def test_input_frame_is_not_mutated(self):
+        df = _snapshot()
+        FeaturePipeline().transform(df)
+        assert list(df.columns) == [
+            "name",
+            "stargazers_count",
+            "created_at",
+            "language",
+            "description",
+        ]
@@ -0,0 +1,133 @@
+"""
+Tests for the paginated GitHub search fetcher against a local stub server
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from scripts.github_search import GitHubSearchFetcher
+from scripts.http_cache import ConditionalCache
+
+TOTAL_REPOS = 250
+
+
+class StubSearchHandler(BaseHTTPRequestHandler):
+    """Serves /search/repositories pages over a fixed ranking"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query["page"][0])
+        per_page = int(query["per_page"][0])
+
+        with server.lock:
+            server.requests.append(page)
+            throttle = page in server.throttle_pages
+            server.throttle_pages.discard(page)
+
+        etag = f'"page-{page}-{per_page}"'
+        if self.headers.get("If-None-Match") == etag:
+            with server.lock:
+                server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        if throttle:
+            self.send_response(403)
+            self.send_header("Retry-After", "7")
+            self.end_headers()
+            return
+
+        start = (page - 1) * per_page
+        # Page 2 repeats the last repository of page 1, as happens when the
+        # ranking shifts between requests
+        if page == 2:
+            start -= 1
+        ids = range(start, min(start + per_page, TOTAL_REPOS))
+        body = {
+            "total_count": TOTAL_REPOS,
+            "incomplete_results": False,
+            "items": [{"id": i, "name": f"repo-{i}"} for i in ids],
+        }
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-RateLimit-Remaining", "29")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSearchHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.throttle_pages = set()
+    server.not_modified = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _fetcher(server, sleeps, cache=None):
+    host, port = server.server_address
+    return GitHubSearchFetcher(
+        base_url=f"http://{host}:{port}", sleep=sleeps.append, cache=cache
+    )
+
+
+class TestGitHubSearchFetcher:
+    """Test pagination, de-duplication and rate-limit handling"""
+
+    def test_single_page_for_small_limits(self, stub_server):
+        items = _fetcher(stub_server, []).fetch_top(10)
+        assert [item["id"] for item in items] == list(range(10))
+        assert stub_server.requests == [1]
+
+    def test_paginates_and_deduplicates(self, stub_server):
+        items = _fetcher(stub_server, []).fetch_top(1000)
+
+        ids = [item["id"] for item in items]
+        assert len(ids) == len(set(ids))
+        assert sorted(stub_server.requests) == [1, 2, 3]
+        assert ids[:100] == list(range(100))
+
+    def test_retry_after_is_honoured(self, stub_server):
+        stub_server.throttle_pages.add(2)
+        sleeps = []
+
+        items = _fetcher(stub_server, sleeps).fetch_top(200)
+        assert len(items) == 199
+        assert sleeps == [7.0]
+        assert stub_server.requests.count(2) == 2
+
+    def test_conditional_requests_served_from_cache(self, stub_server, tmp_path):
+        cache = ConditionalCache(str(tmp_path))
+        first = _fetcher(stub_server, [], cache).fetch_top(250)
+
+        # A fresh fetcher (new process) revalidates against the on-disk cache
+        second = _fetcher(stub_server, [], ConditionalCache(str(tmp_path)))
+        assert second.fetch_top(250) == first
+        assert stub_server.not_modified == 3
+        assert second.cache.stats["hits"] == 3
+        assert cache.stats["misses"] == 3
+
+    def test_iter_pages_skips_fetched_pages(self, stub_server):
+        pages = dict(_fetcher(stub_server, []).iter_pages(250, pages=3, skip=[1]))
+
+        assert sorted(pages) == [2, 3]
+        assert sorted(stub_server.requests) == [2, 3]
+        assert pages[3]["items"][-1]["id"] == TOTAL_REPOS - 1
@@ -0,0 +1,151 @@
+"""
+Tests for the JSON Lines history log and the in-memory snapshot cache
+"""
+
+import json
+import os
+
+from scripts.history_store import HistoryLog, HistoryStore
+
+
+def _log(tmp_path):
+    return HistoryLog(str(tmp_path / "history.jsonl"), str(tmp_path / "history.json"))
+
+
+class TestHistoryLog:
+    """Test the append-only history backend"""
+
+    def test_append_and_tail(self, tmp_path, make_entry):
+        log = _log(tmp_path)
+        for day in range(1, 6):
+            log.append(make_entry(f"2025-09-0{day}", day))
+
+        assert [e["date"] for e in log.read_tail(2)] == ["2025-09-04", "2025-09-05"]
+        assert len(log.read_tail(50)) == 5
+        assert len(list(log.iter_entries())) == 5
+
+    def test_tail_across_block_boundaries(self, tmp_path, monkeypatch, make_entry):
+        monkeypatch.setattr("scripts.history_store.TAIL_BLOCK_SIZE", 16)
+        log = _log(tmp_path)
+        for day in range(1, 10):
+            log.append(make_entry(f"2025-09-0{day}", day, day * 2))
+
+        tail = log.read_tail(3)
+        assert [e["date"] for e in tail] == ["2025-09-07", "2025-09-08", "2025-09-09"]
+
+    def test_torn_write_is_skipped_and_repaired(self, tmp_path, make_entry):
+        log = _log(tmp_path)
+        log.append(make_entry("2025-09-01", 1))
+        with open(log.path, "a") as f:
+            f.write('{"date": "2025-09-02", "repos')
+
+        assert [e["date"] for e in log.read_tail(5)] == ["2025-09-01"]
+
+        log.append(make_entry("2025-09-03", 3))
+        assert [e["date"] for e in log.iter_entries()] == ["2025-09-01", "2025-09-03"]
+
+    def test_migrates_legacy_array(self, tmp_path, make_entry):
+        log = _log(tmp_path)
+        with open(log.legacy_path, "w") as f:
+            json.dump(
+                [make_entry("2025-09-01", 1), make_entry("2025-09-02", 2)], f, indent=2
+            )
+
+        assert log.read_tail(1)[0]["date"] == "2025-09-02"
+        assert not os.path.exists(log.legacy_path)
+        assert os.path.exists(f"{log.legacy_path}.bak")
+        assert log.migrate_legacy() == 0
+
+
+class TestHistoryStore:
+    """Test snapshot caching and invalidation"""
+
+    def test_missing_file(self, tmp_path):
+        store = HistoryStore(_log(tmp_path))
+        assert store.get_latest() is None
+        assert store.get_repositories() == []
+        assert store.get_aggregates() is None
+
+    def test_aggregates_of_latest_snapshot(self, tmp_path, make_entry):
+        log = _log(tmp_path)
+        log.append(make_entry("2025-09-06", 1))
+        log.append(make_entry("2025-09-07", 300, 100))
+
+        aggregates = HistoryStore(log).get_aggregates()
+        assert aggregates["total_repositories"] == 2
+        assert aggregates["total_stars"] == 400
+        assert aggregates["avg_stars"] == 200
+        assert aggregates["top_gainer"]["name"] == "repo-1"
+        assert aggregates["last_updated"] == "2025-09-07"
+
+    def test_top_gainer_compares_with_previous_day(self, tmp_path, make_entry):
+        log = _log(tmp_path)
+        log.append(make_entry("2025-09-06", 100, 50))
+        log.append(make_entry("2025-09-07", 110, 90))
+        # Same-day re-run: still compared with 09-07, not with itself
+        log.append(make_entry("2025-09-08", 115, 95))
+        log.append(make_entry("2025-09-08", 120, 91))
+        store = HistoryStore(log, check_interval=0)
+
+        gainer = store.get_aggregates()["top_gainer"]
+        assert (gainer["name"], gainer["stars_gained"]) == ("repo-1", 10)
+
+        store.publish(make_entry("2025-09-09", 121, 111))
+        gainer = store.get_aggregates()["top_gainer"]
+        assert (gainer["name"], gainer["stars_gained"]) == ("repo-2", 20)
+
+    def test_no_top_gainer_without_previous_day(self, tmp_path, make_entry):
+        log = _log(tmp_path)
+        log.append(make_entry("2025-09-07", 300, 100))
+        assert HistoryStore(log).get_aggregates()["top_gainer"] is None
+
+    def test_reads_are_served_from_memory(self, tmp_path, make_entry):
+        log = _log(tmp_path)
+        log.append(make_entry("2025-09-07", 10))
+        store = HistoryStore(log, check_interval=0)
+
+        for _ in range(5):
+            store.get_latest()
+        assert store.reloads == 1
+
+    def test_reload_on_file_change(self, tmp_path, make_entry):
+        log = _log(tmp_path)
+        log.append(make_entry("2025-09-07", 10))
+        store = HistoryStore(log, check_interval=0)
+        assert store.get_latest()["date"] == "2025-09-07"
+
+        log.append(make_entry("2025-09-08", 12))
+        assert store.get_latest()["date"] == "2025-09-08"
+        assert store.reloads == 2
+
+    def test_publish_skips_reload(self, tmp_path, make_entry):
+        log = _log(tmp_path)
+        entry = make_entry("2025-09-08", 5)
+        log.append(entry)
+        store = HistoryStore(log, check_interval=0)
+
+        store.publish(entry)
+        assert store.get_latest() == entry
+        assert store.reloads == 0
+
+    def test_responses_encoded_once_per_snapshot(self, tmp_path, make_entry):
+        log = _log(tmp_path)
+        log.append(make_entry("2025-09-07", 4, 3, owner="test"))
+        entry = make_entry("2025-09-08", 5, 3, owner="test")
+        log.append(entry)
+        store = HistoryStore(log, check_interval=0)
+        store.publish(entry)
+
+        body, etag = store.get_top_repos_response()
+        assert json.loads(body) == entry["repositories"]
+        assert store.get_top_repos_response() == (body, etag)
+        assert store.get_top_repos_response(1)[1] != etag
+        assert store.get_top_repos_response(50) == store.get_top_repos_response(2)
+
+        analytics = json.loads(store.get_analytics_response()[0])
+        assert analytics["total_repositories"] == 2
+        assert analytics["top_gainer"]["name"] == "repo-1"
+        assert analytics["top_gainer"]["stars_gained"] == 1
+
+        store.publish(make_entry("2025-09-09", 6, 3, owner="test"))
+        assert store.get_top_repos_response()[1] != etag
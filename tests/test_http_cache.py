@@ -0,0 +1,49 @@
+"""
+Tests for the on-disk conditional response cache
+"""
+
+from scripts.http_cache import ConditionalCache
+
+
+class TestConditionalCache:
+    """Test validators, LRU eviction and counters"""
+
+    def test_key_ignores_param_order(self):
+        a = ConditionalCache.make_key("https://x/y", {"q": "a", "page": 1})
+        b = ConditionalCache.make_key("https://x/y", {"page": 1, "q": "a"})
+        assert a == b
+
+    def test_conditional_headers_and_body(self, tmp_path):
+        cache = ConditionalCache(str(tmp_path))
+        key = cache.make_key("https://x/y")
+        assert cache.conditional_headers(key) == {}
+
+        cache.store(key, "https://x/y", b"{}", etag='"v1"', last_modified="Mon")
+        assert cache.conditional_headers(key) == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon",
+        }
+        assert cache.read_body(key) == b"{}"
+        assert cache.stats["hits"] == 1
+
+    def test_responses_without_validators_are_not_stored(self, tmp_path):
+        cache = ConditionalCache(str(tmp_path))
+        key = cache.make_key("https://x/y")
+        cache.store(key, "https://x/y", b"{}")
+        assert cache.lookup(key) is None
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ConditionalCache(str(tmp_path), max_bytes=10)
+        keys = [cache.make_key(f"https://x/{i}") for i in range(3)]
+        cache.store(keys[0], "a", b"aaaa", etag="0")
+        cache.store(keys[1], "b", b"bbbb", etag="1")
+        cache.read_body(keys[0])  # keys[1] is now least recently used
+        cache.store(keys[2], "c", b"cccc", etag="2")
+
+        assert cache.lookup(keys[1]) is None
+        assert cache.lookup(keys[0]) and cache.lookup(keys[2])
+        assert cache.stats["evictions"] == 1
+
+        # The LRU index is rebuilt from disk by a new instance
+        reopened = ConditionalCache(str(tmp_path), max_bytes=10)
+        assert reopened.lookup(keys[0]) is not None
@@ -0,0 +1,119 @@
+"""
+Tests for the background job runner
+"""
+
+import threading
+
+from scripts.jobs import JobCancelled, JobManager
+from scripts.shared_cache import FileCache
+
+
+def _wait(manager, job):
+    for _ in range(200):
+        if manager.get(job.id).done:
+            return manager.get(job.id)
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+class TestJobManager:
+    """Test job lifecycle and single-flight collapsing"""
+
+    def test_successful_job(self):
+        manager = JobManager()
+        job = _wait(manager, manager.submit("sum", sum, [1, 2, 3]))
+
+        status = job.to_dict()
+        assert status["status"] == "succeeded"
+        assert status["result"] == 6
+        assert status["duration_seconds"] is not None
+
+    def test_failed_job_records_error(self):
+        def boom():
+            raise RuntimeError("boom")
+
+        manager = JobManager()
+        job = _wait(manager, manager.submit("boom", boom))
+        assert job.status == "failed"
+        assert job.error == "boom"
+
+    def test_concurrent_submissions_collapse(self):
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            release.wait(5)
+            return "done"
+
+        manager = JobManager()
+        first = manager.submit("refresh", work, dedupe_key="refresh")
+        second = manager.submit("refresh", work, dedupe_key="refresh")
+        assert first is second
+
+        release.set()
+        _wait(manager, first)
+        third = manager.submit("refresh", work, dedupe_key="refresh")
+        assert third is not first
+        _wait(manager, third)
+        assert len(calls) == 2
+
+    def test_cancel_queued_and_running_jobs(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking(job):
+            started.set()
+            while not job.cancel_requested:
+                release.wait(0.01)
+            raise JobCancelled()
+
+        manager = JobManager(max_workers=1)
+        running = manager.submit("train", blocking, pass_job=True)
+        queued = manager.submit("train", blocking, pass_job=True)
+        started.wait(5)
+
+        assert manager.cancel(queued.id)["status"] == "cancelled"
+        assert manager.cancel(running.id)["status"] == "cancelling"
+        assert _wait(manager, running).status == "cancelled"
+        assert queued.started_at is None
+
+    def test_running_job_without_cancel_checks_is_left_alone(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def refresh():
+            started.set()
+            release.wait(5)
+            return "done"
+
+        manager = JobManager()
+        job = manager.submit("refresh", refresh)
+        started.wait(5)
+
+        status = manager.cancel(job.id)
+        assert (status["status"], status["cancellable"]) == ("running", False)
+        release.set()
+        assert _wait(manager, job).status == "succeeded"
+
+    def test_status_and_cancel_across_workers(self, tmp_path):
+        started = threading.Event()
+
+        def blocking(job):
+            started.set()
+            while not job.cancel_requested:
+                threading.Event().wait(0.01)
+            raise JobCancelled()
+
+        # Two worker processes, each with its own manager, one shared cache
+        owner = JobManager(shared=FileCache(str(tmp_path)))
+        other = JobManager(shared=FileCache(str(tmp_path)))
+        job = owner.submit("train", blocking, pass_job=True)
+        started.wait(5)
+
+        assert other.get(job.id) is None
+        assert other.status(job.id)["status"] == "running"
+        assert other.cancel(job.id)["status"] == "cancelling"
+        assert _wait(owner, job).status == "cancelled"
+        assert other.status(job.id)["status"] == "cancelled"
+        assert other.status("missing") is None
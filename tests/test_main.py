@@ -19,32 +19,29 @@ from main import fetch_top_repos, update_history, generate_chart
 class TestGitHubAPI:
     """Test GitHub API functionality"""
 
-    @patch("main.requests.get")
-    def test_fetch_top_repos_success(self, mock_get):
+    @patch("main.search_fetcher.fetch_top")
+    def test_fetch_top_repos_success(self, mock_fetch_top):
         """Test successful API call"""
-        mock_response = Mock()
-        mock_response.json.return_value = {
-            "items": [
-                {
-                    "id": 1,
-                    "name": "test-repo",
-                    "stargazers_count": 1000,
-                    "html_url": "https://github.com/test/repo",
-                    "description": "Test repository",
-                }
-            ]
-        }
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_fetch_top.return_value = [
+            {
+                "id": 1,
+                "name": "test-repo",
+                "full_name": "test/test-repo",
+                "stargazers_count": 1000,
+                "html_url": "https://github.com/test/repo",
+                "description": "Test repository",
+            }
+        ]
 
-        result = fetch_top_repos()
+        result = fetch_top_repos(limit=1)
         assert len(result) == 1
         assert result[0]["name"] == "test-repo"
+        mock_fetch_top.assert_called_once_with(1)
 
-    @patch("main.requests.get")
-    def test_fetch_top_repos_error(self, mock_get):
+    @patch("main.search_fetcher.fetch_top")
+    def test_fetch_top_repos_error(self, mock_fetch_top):
         """Test API error handling"""
-        mock_get.side_effect = Exception("API Error")
+        mock_fetch_top.side_effect = Exception("API Error")
 
         result = fetch_top_repos()
         assert result is None
@@ -60,6 +57,7 @@ class TestDataPersistence:
             {
                 "id": 1,
                 "name": "test-repo",
+                "full_name": "test/test-repo",
                 "stargazers_count": 1000,
                 "html_url": "https://github.com/test/repo",
                 "description": "Test repository",
@@ -77,14 +75,15 @@ class TestDataPersistence:
             result = update_history(mock_items)
 
             # Check that file was created
-            assert os.path.exists("data/top_repos_history.json")
+            assert os.path.exists("data/top_repos_history.jsonl")
 
-            # Check content
-            with open("data/top_repos_history.json", "r") as f:
-                data = json.load(f)
+            # Check content (one snapshot per line)
+            with open("data/top_repos_history.jsonl", "r") as f:
+                data = [json.loads(line) for line in f]
 
             assert len(data) == 1
             assert data[0]["repositories"][0]["name"] == "test-repo"
+            assert data[0]["repositories"][0]["full_name"] == "test/test-repo"
 
         finally:
             os.chdir(original_cwd)
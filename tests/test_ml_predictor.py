@@ -0,0 +1,220 @@
+"""
+Tests for the ML predictor's batch prediction, model registry and training
+"""
+
+import json
+import multiprocessing
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from scripts.jobs import JobCancelled
+from scripts.ml_predictor import (
+    MODEL_COLUMNS,
+    GitHubPredictor,
+    PredictionCache,
+    summarize_training,
+)
+
+SNAPSHOT = "data/github_top_20250907_124243.json"
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    data_path = tmp_path_factory.mktemp("ml")
+    shutil.copy(SNAPSHOT, data_path)
+    predictor = GitHubPredictor(str(data_path))
+    df = predictor.load_historical_data()
+    predictor.train_growth_prediction_model(df)
+    return predictor, df
+
+
+class TestBatchPrediction:
+    """Test predict_batch against the per-repository path"""
+
+    def test_batch_matches_single_predictions(self, trained):
+        predictor, df = trained
+        batch = {p["repository"]: p for p in predictor.predict_batch(df)}
+
+        for _, repo in df.head(5).iterrows():
+            single = predictor.predict_future_growth(repo.to_dict())
+            assert batch[repo["name"]] == single
+
+    def test_top_n_is_sorted_prefix(self, trained):
+        predictor, df = trained
+        full = predictor.predict_batch(df)
+        top = predictor.predict_top_performers(df, 5)
+
+        rates = [p["growth_rate_percent"] for p in top]
+        assert rates == sorted(rates, reverse=True)
+        assert rates == [p["growth_rate_percent"] for p in full[:5]]
+
+    def test_warm_predictions_do_not_touch_disk(self, trained, monkeypatch):
+        predictor, df = trained
+        predictor.predict_batch(df)
+
+        import joblib
+
+        monkeypatch.setattr(joblib, "load", lambda *a, **k: pytest.fail("reload"))
+        assert predictor.predict_batch(df, top_n=3)
+
+
+class TestIndexedPrediction:
+    """Test lookups served from the per-snapshot prediction batch"""
+
+    def test_matches_single_prediction(self, trained):
+        predictor, df = trained
+        repo = predictor.repository_index().find_by_name(df["name"].iloc[3])[0]
+        indexed = predictor.predict_indexed(repo)
+        single = predictor.predict_future_growth(repo)
+        assert indexed["predicted_stars_30d"] == single["predicted_stars_30d"]
+        assert indexed["growth_rate_percent"] == single["growth_rate_percent"]
+
+    def test_warm_lookup_skips_the_model(self, trained, monkeypatch):
+        predictor, df = trained
+        repo = predictor.repository_index().get(df["full_name"].iloc[0])
+        first = predictor.predict_indexed(repo)
+
+        monkeypatch.setattr(
+            predictor, "_predict_stars", lambda *a: pytest.fail("re-predicted")
+        )
+        assert predictor.predict_indexed(repo) is first
+
+
+class TestPredictionCache:
+    """Test LRU/TTL behaviour, single-flight and invalidation"""
+
+    def test_lru_eviction_and_ttl(self):
+        now = [0.0]
+        cache = PredictionCache(max_entries=2, ttl=10, clock=lambda: now[0])
+        for key in ("a", "b", "a", "c"):
+            cache.get_or_compute((key,), lambda: key)
+        assert cache.stats["evictions"] == 1  # "b" was least recently used
+        assert cache.get_or_compute(("a",), lambda: "fresh") == "a"
+
+        now[0] = 11.0
+        assert cache.get_or_compute(("a",), lambda: "fresh") == "fresh"
+        metrics = cache.metrics()
+        assert metrics["hits"] == 2 and metrics["misses"] == 4
+        assert metrics["hit_ratio"] == round(2 / 6, 4)
+
+    def test_concurrent_misses_compute_once(self):
+        cache = PredictionCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(
+                pool.map(lambda _: cache.get_or_compute(("k",), compute), range(8))
+            )
+        assert results == ["value"] * 8
+        assert len(calls) == 1
+
+    def test_result_spanning_invalidation_is_not_kept(self):
+        cache = PredictionCache()
+        started, release = threading.Event(), threading.Event()
+
+        def compute():
+            started.set()
+            release.wait(5)
+            return "stale"
+
+        worker = threading.Thread(target=cache.get_or_compute, args=(("k",), compute))
+        worker.start()
+        started.wait(5)
+        cache.invalidate()
+        release.set()
+        worker.join()
+        assert cache.get_or_compute(("k",), lambda: "new") == "new"
+
+    def test_training_invalidates_cached_predictions(self, trained):
+        predictor, df = trained
+        first = predictor.cached_top_predictions(3)
+        assert predictor.cached_top_predictions(3) is first
+
+        predictor.train_growth_prediction_model(df)
+        assert predictor.prediction_cache.metrics()["entries"] == 0
+        assert predictor.cached_top_predictions(3) is not first
+
+
+class TestModelRegistry:
+    """Test versioned pipelines, manifests and restarts"""
+
+    def test_manifest_records_training_metadata(self, trained):
+        predictor, _ = trained
+        version, pipeline, manifest = predictor.registry.get_active()
+
+        assert manifest["version"] == version
+        assert manifest["features"] == MODEL_COLUMNS
+        assert set(manifest["metrics"]) == {"mae", "mse", "r2"}
+        assert len(manifest["data_fingerprint"]) == 16
+        assert hasattr(pipeline["scaler"], "mean_")
+
+    def test_restart_uses_persisted_scaler(self, trained):
+        predictor, df = trained
+        restarted = GitHubPredictor(predictor.data_path)
+
+        assert restarted.predict_batch(df) == predictor.predict_batch(df)
+
+    def test_retraining_hot_swaps_active_version(self, trained):
+        predictor, df = trained
+        before = predictor.registry.get_active()[0]
+
+        results = predictor.train_growth_prediction_model(df)
+        assert results["model_version"] != before
+        assert predictor.registry.get_active()[0] == results["model_version"]
+        assert len(predictor.registry.list_versions()) >= 2
+
+
+class TestParallelTraining:
+    """Test process-pool training, progress reporting and cancellation"""
+
+    def test_candidates_fit_in_process_pool(self, trained):
+        predictor, df = trained
+        progress = {}
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=3, mp_context=context) as pool:
+            results = predictor.train_growth_prediction_model(
+                df, n_jobs=2, executor=pool, progress=progress.__setitem__
+            )
+
+        assert set(progress) == {"RandomForest", "GradientBoosting", "LinearRegression"}
+        assert all(m["fit_seconds"] >= 0 for m in progress.values())
+        assert results["results"]["RandomForest"]["model"].n_jobs == 2
+        assert predictor.registry.get_active()[0] == results["model_version"]
+
+    def test_cancelled_training_registers_nothing(self, trained):
+        predictor, df = trained
+        before = predictor.registry.get_active()[0]
+
+        with pytest.raises(JobCancelled):
+            predictor.train_growth_prediction_model(df, should_cancel=lambda: True)
+        assert predictor.registry.get_active()[0] == before
+
+    def test_cancel_during_last_fit_registers_nothing(self, trained):
+        predictor, df = trained
+        before = predictor.registry.get_active()[0]
+        fitted = []
+
+        with pytest.raises(JobCancelled):
+            predictor.train_growth_prediction_model(
+                df,
+                progress=lambda name, metrics: fitted.append(name),
+                should_cancel=lambda: len(fitted) == 3,
+            )
+        assert len(fitted) == 3
+        assert predictor.registry.get_active()[0] == before
+
+    def test_summary_is_json_safe(self, trained):
+        predictor, df = trained
+        summary = summarize_training(predictor.train_growth_prediction_model(df))
+
+        json.dumps(summary)
+        assert "model" not in summary["results"]["LinearRegression"]
@@ -0,0 +1,70 @@
+"""
+Tests for star velocity, acceleration and rank movement
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from scripts.history_store import HistoryLog
+from scripts.movers import MoversEngine
+from scripts.timeseries_store import StarMatrix
+
+START = date(2025, 9, 1)
+
+
+@pytest.fixture
+def engine(tmp_path, make_entry):
+    log = HistoryLog(str(tmp_path / "h.jsonl"), str(tmp_path / "legacy.json"))
+    # a grows 10/day; b grows 1/day for a week, then 30/day; c leaves on day 13
+    for day in range(15):
+        b = 900 + min(day, 7) + 30 * max(day - 7, 0)
+        stars = {"a": 1000 + 10 * day, "b": b}
+        if day < 13:
+            stars["c"] = 950
+        log.append(make_entry(START + timedelta(days=day), rank_by_stars=True, **stars))
+    matrix = StarMatrix(str(tmp_path / "ts"))
+    matrix.sync(log)  # the daily update's write
+    return MoversEngine(StarMatrix(str(tmp_path / "ts")))
+
+
+def _by_name(result):
+    return {m["name"]: m for m in result["movers"]}
+
+
+class TestMovers:
+    """Test window deltas, acceleration, rank changes and upkeep"""
+
+    def test_seven_day_window(self, engine):
+        result = engine.movers("7d")
+        assert (result["as_of"], result["since"]) == ("2025-09-15", "2025-09-08")
+
+        movers = _by_name(result)
+        assert [m["name"] for m in result["movers"]] == ["b", "a"]  # c left
+        assert movers["b"]["star_delta"] == 210
+        assert movers["b"]["stars_per_day"] == 30.0
+        assert movers["b"]["acceleration"] == 29.0  # 30/day now, 1/day before
+        assert movers["a"]["acceleration"] == 0.0
+        # b was third behind c a week ago
+        assert (movers["b"]["rank"], movers["b"]["rank_change"]) == (2, 1)
+
+    def test_sort_and_window_validation(self, engine):
+        by_rank = engine.movers("1d", sort="rank")["movers"]
+        assert by_rank[0]["rank_change"] >= by_rank[-1]["rank_change"]
+        assert engine.movers("30d")["movers"] == []  # history too short
+        with pytest.raises(ValueError):
+            engine.movers("2w")
+        with pytest.raises(ValueError):
+            engine.movers("7d", sort="forks")
+
+    def test_recomputed_once_per_appended_day(self, engine, make_entry):
+        engine.movers("7d")
+        engine.movers("1d")
+        assert engine.recomputes == 1
+
+        writer = StarMatrix(engine.matrix.directory)
+        writer.append_snapshot(
+            make_entry(START + timedelta(days=15), rank_by_stars=True, a=1150, b=1157)
+        )
+        assert _by_name(engine.movers("1d"))["b"]["star_delta"] == 40
+        assert engine.recomputes == 2
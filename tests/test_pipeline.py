@@ -0,0 +1,183 @@
+"""
+Tests for the streaming pipeline runner and the resumable update pipeline
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+import scripts.main as main
+from scripts.pipeline import Checkpoint, Pipeline, PipelineError
+
+
+class FakeFetcher:
+    """Serves ``pages`` search pages of 10 repositories, failing listed pages once"""
+
+    def __init__(self, pages=3, fail=()):
+        self.pages = pages
+        self.fail = set(fail)
+        self.requested = []
+        self.on_page = None
+
+    page_count = staticmethod(lambda first, limit: 3)
+
+    def iter_pages(self, limit, query="stars:>0", pages=None, skip=()):
+        for page in range(1, self.pages + 1):
+            if page in skip:
+                continue
+            self.requested.append(page)
+            if page in self.fail:
+                self.fail.discard(page)
+                raise RuntimeError(f"page {page} failed")
+            items = [
+                {
+                    "id": i,
+                    "name": f"repo-{i}",
+                    "full_name": f"o/repo-{i}",
+                    "stargazers_count": 1000 - i,
+                    "html_url": f"https://github.com/o/repo-{i}",
+                    "description": None,
+                    "owner": {"login": "o"},
+                }
+                for i in range((page - 1) * 10, page * 10)
+            ]
+            yield page, {"total_count": self.pages * 10, "items": items}
+            if self.on_page:
+                self.on_page(page)
+
+
+class TestPipeline:
+    """Test streaming, backpressure and failure handling"""
+
+    def test_streams_items_with_bounded_buffers(self):
+        produced = []
+        lag = []
+
+        def source(_):
+            for i in range(20):
+                produced.append(i)
+                yield i
+
+        def slow_sink(items):
+            for i in items:
+                lag.append(len(produced) - i)
+                time.sleep(0.002)
+                yield i * 2
+
+        pipeline = Pipeline([("source", source), ("sink", slow_sink)], buffer_size=2)
+        assert pipeline.run() == [i * 2 for i in range(20)]
+
+        # The producer never runs more than the buffer (plus in-hand items) ahead
+        assert max(lag) <= 4
+        report = {stats["stage"]: stats for stats in pipeline.report()}
+        assert report["source"]["items_out"] == 20
+        assert report["sink"]["items_in"] == 20
+        assert report["sink"]["status"] == "succeeded"
+        assert report["sink"]["seconds"] > 0
+
+    def test_failure_stops_every_stage(self):
+        def source(_):
+            i = 0
+            while True:
+                yield i
+                i += 1
+
+        def broken(items):
+            for i in items:
+                if i == 3:
+                    raise ValueError("bad item")
+                yield i
+
+        pipeline = Pipeline(
+            [("source", source), ("broken", broken), ("sink", lambda xs: xs)]
+        )
+        with pytest.raises(PipelineError, match="'broken' failed: bad item") as err:
+            pipeline.run()
+
+        statuses = {stats["stage"]: stats["status"] for stats in err.value.stats}
+        assert statuses == {
+            "source": "aborted",
+            "broken": "failed",
+            "sink": "aborted",
+        }
+
+    def test_checkpoint_discards_other_runs(self, tmp_path):
+        checkpoint = Checkpoint("2025-01-01", str(tmp_path))
+        checkpoint.write_spool("page-1", [1])
+        checkpoint.mark("pages", 1)
+
+        assert Checkpoint("2025-01-01", str(tmp_path)).get("pages") == [1]
+        fresh = Checkpoint("2025-01-02", str(tmp_path))
+        assert not fresh.resumed
+        assert fresh.read_spool("page-1") is None
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    return tmp_path
+
+
+class TestUpdatePipeline:
+    """Test the fetch -> normalize -> persist -> derive update run"""
+
+    def test_pages_are_persisted_while_fetching(self, workdir, monkeypatch):
+        fetcher = FakeFetcher()
+        spooled = []
+        spool = os.path.join("data", "pipeline", "spool", "page-1.json")
+
+        def wait_for_spool(page):
+            if page == 1:
+                deadline = time.monotonic() + 5
+                while not os.path.exists(spool) and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                spooled.append(os.path.exists(spool))
+
+        fetcher.on_page = wait_for_spool
+        monkeypatch.setattr(main, "search_fetcher", fetcher)
+        built = []
+        summary = main.run_pipeline(
+            limit=25, outputs=[("record", built.append)], directory="data/pipeline"
+        )
+
+        assert spooled == [True]
+        assert summary["repositories"] == 25
+        assert summary["derived"] == ["record"]
+        assert built[0]["repositories"][0]["name"] == "repo-0"
+        assert [s["items_out"] for s in summary["stages"]] == [3, 3, 1, 1]
+        # A completed run leaves no checkpoint behind
+        assert not os.path.exists("data/pipeline/checkpoint.json")
+
+    def test_resumes_after_partial_failure(self, workdir, monkeypatch):
+        fetcher = FakeFetcher(fail=[3])
+        monkeypatch.setattr(main, "search_fetcher", fetcher)
+        built = []
+
+        def flaky_readme(today_data):
+            if not built:
+                built.append(None)
+                raise OSError("disk full")
+            built.append(today_data)
+
+        outputs = [("chart", lambda today_data: None), ("readme", flaky_readme)]
+        with pytest.raises(PipelineError, match="'fetch' failed"):
+            main.run_pipeline(limit=30, outputs=outputs, directory="data/pipeline")
+        with open("data/pipeline/checkpoint.json") as f:
+            assert json.load(f)["pages"] == [1, 2]
+
+        # Only the failed page is fetched again; the derive stage then fails
+        with pytest.raises(PipelineError, match="'derive' failed: disk full"):
+            main.run_pipeline(limit=30, outputs=outputs, directory="data/pipeline")
+        assert fetcher.requested == [1, 2, 3, 3]
+
+        summary = main.run_pipeline(
+            limit=30, outputs=outputs, directory="data/pipeline"
+        )
+        assert fetcher.requested == [1, 2, 3, 3]
+        assert summary["derived"] == ["readme"]
+        assert len(built[-1]["repositories"]) == 30
+        with open("data/top_repos_history.jsonl") as f:
+            assert len(f.readlines()) == 1
@@ -0,0 +1,50 @@
+"""
+Tests for the in-memory repository lookup index
+"""
+
+from datetime import datetime
+
+from scripts.repo_index import RepositoryIndex
+from scripts.snapshot_archive import SnapshotArchive
+
+
+def repo(repo_id, full_name, stars=10):
+    return {
+        "id": repo_id,
+        "name": full_name.split("/")[1],
+        "full_name": full_name,
+        "stargazers_count": stars,
+    }
+
+
+class TestRepositoryIndex:
+    """Test lookups and rebuilds on catalog change"""
+
+    def test_lookups_ignore_case(self, tmp_path):
+        catalog = SnapshotArchive(str(tmp_path), compression="gzip")
+        catalog.write([repo(1, "acme/Rocket"), repo(2, "other/rocket")])
+        index = RepositoryIndex(catalog)
+
+        assert [r["id"] for r in index.find_by_name("ROCKET")] == [1, 2]
+        assert index.get("ACME/rocket")["id"] == 1
+        assert index.get_by_id(2)["full_name"] == "other/rocket"
+        assert index.get("nobody/rocket") is None
+
+    def test_rebuilds_only_on_new_snapshot(self, tmp_path):
+        catalog = SnapshotArchive(str(tmp_path), compression="gzip")
+        catalog.write([repo(1, "acme/rocket")], datetime(2025, 9, 7))
+        index = RepositoryIndex(catalog, check_interval=0)
+
+        index.get("acme/rocket")
+        index.get("acme/rocket")
+        assert index.rebuilds == 1
+
+        catalog.write([repo(3, "acme/jet")], datetime(2025, 9, 8))
+        assert index.get("acme/rocket") is None
+        assert index.get("acme/jet")["id"] == 3
+        assert index.rebuilds == 2
+
+    def test_empty_catalog(self, tmp_path):
+        index = RepositoryIndex(SnapshotArchive(str(tmp_path)))
+        assert index.snapshot is None
+        assert index.find_by_name("anything") == []
@@ -0,0 +1,115 @@
+"""
+Tests for the weekly/monthly rollup tiers and history downsampling
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from scripts.history_store import HistoryLog
+from scripts.rollups import RollupStore, lttb_indices, minmax_indices
+from scripts.timeseries_store import StarMatrix
+
+START = date(2025, 1, 1)
+
+
+def _store(tmp_path, days, make_entry):
+    log = HistoryLog(str(tmp_path / "h.jsonl"), str(tmp_path / "legacy.json"))
+    for day in range(days):
+        stars = {"a": 100 + day}
+        if day % 10 != 3:  # b is missing now and then
+            stars["b"] = 50 + 2 * day
+        log.append(make_entry(START + timedelta(days=day), **stars))
+    matrix = StarMatrix(str(tmp_path / "ts"))
+    store = RollupStore(str(tmp_path / "ts" / "rollups"), matrix, log)
+    store.sync()  # the ingest writer
+    return store, log
+
+
+class TestRollupTiers:
+    """Test tier contents and incremental upkeep"""
+
+    def test_weekly_close_values(self, tmp_path, make_entry):
+        store, _ = _store(tmp_path, 14, make_entry)
+        result = store.history(["a", "b"], resolution="week")
+        # 2025-01-01 is a Wednesday: buckets start on the Mondays
+        assert result["series"]["a"]["dates"] == [
+            "2024-12-30",
+            "2025-01-06",
+            "2025-01-13",
+        ]
+        assert result["series"]["a"]["stars"] == [104, 111, 113]
+        # b is missing on the last day: the week closes on its last value
+        assert result["series"]["b"]["stars"] == [58, 72, 74]
+
+    def test_append_matches_full_rebuild(self, tmp_path, make_entry):
+        store, log = _store(tmp_path, 60, make_entry)
+        before = store.rebuilt_buckets
+
+        log.append(make_entry(START + timedelta(days=60), a=1, b=2, c=3))
+        store.sync()
+        assert store.rebuilt_buckets - before == 2  # one week and one month
+
+        fresh = RollupStore(str(tmp_path / "fresh"), store.matrix, log)
+        fresh.sync()
+        for resolution in ("week", "month"):
+            assert store.history(
+                ["a", "b", "c"], resolution=resolution
+            ) == fresh.history(["a", "b", "c"], resolution=resolution)
+
+    def test_readers_reload_without_writing(self, tmp_path, make_entry):
+        writer, log = _store(tmp_path, 14, make_entry)
+        directory = tmp_path / "ts" / "rollups"
+        reader = RollupStore(str(directory), StarMatrix(str(tmp_path / "ts")), log)
+        assert (
+            reader.history(["a"], resolution="week")["series"]["a"]["stars"][-1] == 113
+        )
+
+        log.append(make_entry(START + timedelta(days=14), a=500))
+        files = {p.name: p.stat().st_mtime_ns for p in directory.iterdir()}
+        assert (
+            reader.history(["a"], resolution="week")["series"]["a"]["stars"][-1] == 113
+        )
+        assert {p.name: p.stat().st_mtime_ns for p in directory.iterdir()} == files
+
+        writer.sync()
+        assert (
+            reader.history(["a"], resolution="week")["series"]["a"]["stars"][-1] == 500
+        )
+
+    def test_range_and_validation(self, tmp_path, make_entry):
+        store, _ = _store(tmp_path, 60, make_entry)
+        result = store.history(["a", "zz"], "2025-01-10", "2025-01-20")
+        assert result["series"]["a"]["dates"][0] == "2025-01-10"
+        assert result["series"]["a"]["dates"][-1] == "2025-01-20"
+        assert result["missing"] == ["zz"]
+        assert store.history(resolution="month")["series"].keys() == {"a", "b"}
+
+        for bad in ({"resolution": "year"}, {"points": 2}, {"method": "avg"}):
+            with pytest.raises(ValueError):
+                store.history(["a"], **bad)
+
+
+class TestDownsampling:
+    """Test LTTB and min/max point selection"""
+
+    def test_lttb_keeps_endpoints_and_spikes(self):
+        values = np.arange(1000, dtype=float)[None, :].repeat(2, axis=0)
+        values[0, 500] = 5000.0  # spike
+        values[1, :100] = np.nan  # series starts late
+        picked = lttb_indices(values, 50)
+
+        assert len(picked[0]) <= 50 and 500 in picked[0]
+        assert picked[0][0] == 0 and picked[0][-1] == 999
+        assert picked[1][0] == 100 and np.all(np.diff(picked[1]) > 0)
+
+    def test_minmax_keeps_extremes(self):
+        values = np.sin(np.linspace(0, 20, 1000))[None, :]
+        picked = minmax_indices(values, 40)[0]
+        assert len(picked) <= 40
+        assert values[0].argmax() in picked and values[0].argmin() in picked
+
+    def test_short_series_are_returned_whole(self):
+        values = np.array([[1.0, np.nan, 3.0]])
+        assert lttb_indices(values, 10)[0].tolist() == [0, 2]
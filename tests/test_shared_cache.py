@@ -0,0 +1,151 @@
+"""
+Tests for the shared cache tier and distributed lock
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+import scripts.main as main
+import scripts.ml_predictor as ml_predictor
+from scripts.ml_predictor import PredictionCache
+from scripts.shared_cache import (
+    FileCache,
+    LocalCache,
+    RedisCache,
+    create_shared_cache,
+    distributed_lock,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BrokenClient:
+    """Redis client whose server is unreachable"""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("connection refused")
+
+        return fail
+
+
+def test_local_cache_ttl_and_prefix_delete():
+    clock = FakeClock()
+    cache = LocalCache(clock=clock)
+    cache.set("snapshot:a", b"1", ttl=10)
+    cache.set("prediction:b", b"2", ttl=10)
+
+    assert cache.delete_prefix("snapshot:") == 1
+    assert cache.get("snapshot:a") is None
+    clock.now = 11
+    assert cache.get("prediction:b") is None
+
+
+def test_lock_is_exclusive_and_expires():
+    clock = FakeClock()
+    cache = LocalCache(clock=clock)
+    with distributed_lock(cache, "train", timeout=60) as first:
+        with distributed_lock(cache, "train", timeout=60) as second:
+            assert first and not second
+    with distributed_lock(cache, "train", timeout=60) as again:
+        assert again  # released on exit
+
+    assert cache.acquire("refresh", "crashed-holder", 60)
+    clock.now = 61
+    assert cache.acquire("refresh", "next-holder", 60)
+    cache.release("refresh", "crashed-holder")  # not the holder: no effect
+    assert not cache.acquire("refresh", "third", 60)
+
+
+def test_prediction_cache_shares_results_across_workers():
+    shared = LocalCache()
+    workers = [PredictionCache(shared=shared) for _ in range(2)]
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"count": np.int64(3), "rate": np.float64(1.5)}
+
+    results = [worker.get_or_compute(("trends", "abc"), compute) for worker in workers]
+    assert len(calls) == 1
+    assert results[1] == {"count": 3, "rate": 1.5}
+    assert workers[1].metrics()["shared_hits"] == 1
+    assert workers[1].metrics()["computes"] == 0
+
+
+def test_training_and_refresh_skip_while_locked(monkeypatch):
+    cache = LocalCache()
+    monkeypatch.setattr(ml_predictor, "shared_cache", cache)
+    monkeypatch.setattr(main, "shared_cache", cache)
+
+    with distributed_lock(cache, "train", 60), distributed_lock(cache, "refresh", 60):
+        assert ml_predictor.run_training_job()["skipped"]
+        assert main.run_refresh()["skipped"]
+
+
+def test_unreachable_redis_degrades_to_misses_and_local_locks():
+    cache = RedisCache(client=BrokenClient())
+    cache.set("k", b"v", ttl=1)
+    assert cache.get("k") is None
+
+    # The refresh still runs, serialised within this process
+    assert cache.acquire("train", "token", 60)
+    assert not cache.acquire("train", "other", 60)
+    assert cache.extend("train", "token", 60)
+    cache.release("train", "token")
+    assert cache.acquire("train", "other", 60)
+
+
+def test_lock_is_renewed_while_held():
+    cache = LocalCache()
+    with distributed_lock(cache, "refresh", timeout=0.3) as acquired:
+        assert acquired
+        time.sleep(0.6)  # work outliving the timeout
+        assert not cache.acquire("refresh", "second-run", 0.3)
+    assert cache.acquire("refresh", "second-run", 0.3)
+
+
+def test_file_cache_is_shared_between_instances(tmp_path):
+    clock = FakeClock()
+    first = FileCache(str(tmp_path), clock=clock)
+    second = FileCache(str(tmp_path), clock=clock)
+    first.set("job:a", b"running", ttl=10)
+    assert second.get("job:a") == b"running"
+    assert second.delete_prefix("job:") == 1
+    assert first.get("job:a") is None
+
+    assert first.acquire("train", "one", 60)
+    assert not second.acquire("train", "two", 60)
+    clock.now = 61
+    assert second.acquire("train", "two", 60)
+
+
+def test_local_fallback_without_redis_url():
+    assert isinstance(create_shared_cache("", ""), LocalCache)
+
+
+def test_file_cache_without_redis_url(tmp_path):
+    assert isinstance(create_shared_cache("", str(tmp_path)), FileCache)
+
+
+def test_redis_cache_with_fakeredis():
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    cache.set("snapshot:a", b"1", ttl=10)
+    assert cache.get("snapshot:a") == b"1"
+    assert cache.delete_prefix("snapshot:") == 1
+
+    assert cache.acquire("train", "one", 60)
+    assert not cache.acquire("train", "two", 60)
+    assert cache.extend("train", "one", 60)
+    assert not cache.extend("train", "two", 60)
+    cache.release("train", "one")
+    assert cache.acquire("train", "two", 60)
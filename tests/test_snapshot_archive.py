@@ -0,0 +1,140 @@
+"""
+Tests for the slim, compressed snapshot archive
+"""
+
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime
+
+from scripts.data_fetcher import save_data
+from scripts.ml_predictor import GitHubPredictor
+from scripts.snapshot_archive import ARCHIVE_FIELDS, SnapshotArchive
+
+SNAPSHOT = "data/github_top_20250907_124243.json"
+
+
+def raw_items():
+    with open(SNAPSHOT, "r") as f:
+        return json.load(f)["items"]
+
+
+class TestSnapshotArchive:
+    """Test projection, compression and the manifest"""
+
+    def test_items_are_projected_and_compressed(self, tmp_path):
+        archive = SnapshotArchive(str(tmp_path), compression="gzip")
+        entry = archive.write(raw_items(), datetime(2025, 9, 7, 12, 42, 43))
+
+        assert entry["path"] == "github_top_20250907_124243.jsonl.gz"
+        assert entry["rows"] == len(raw_items())
+        items = archive.latest_items()
+        assert all(list(item) == ARCHIVE_FIELDS for item in items)
+        assert items[0]["full_name"] == raw_items()[0]["full_name"]
+
+        archived = os.path.getsize(tmp_path / entry["path"])
+        assert archived * 10 < os.path.getsize(SNAPSHOT)
+        with gzip.open(tmp_path / entry["path"], "rt") as f:
+            assert len(f.readlines()) == entry["rows"]
+
+    def test_manifest_lists_snapshots_in_order(self, tmp_path):
+        archive = SnapshotArchive(str(tmp_path), compression="gzip")
+        assert archive.manifest() == []
+        assert archive.latest_items() is None
+
+        archive.write(raw_items()[:2], datetime(2025, 9, 7))
+        archive.write(raw_items()[:3], datetime(2025, 9, 8))
+        manifest = archive.manifest()
+        assert [e["timestamp"][:10] for e in manifest] == ["2025-09-07", "2025-09-08"]
+        assert len(archive.latest_items()) == 3
+
+    def test_same_second_writes_keep_both_files(self, tmp_path):
+        archive = SnapshotArchive(str(tmp_path), compression="gzip")
+        fetched_at = datetime(2025, 9, 7, 12, 0, 0)
+        first = archive.write(raw_items()[:2], fetched_at)
+        second = archive.write(raw_items()[:3], fetched_at)
+
+        assert first["path"] != second["path"]
+        assert second["path"] == "github_top_20250907_120000_1.jsonl.gz"
+        assert [archive.verify(e) for e in archive.manifest()] == [True, True]
+
+    def test_torn_manifest_line_is_skipped(self, tmp_path):
+        archive = SnapshotArchive(str(tmp_path), compression="gzip")
+        archive.write(raw_items()[:2], datetime(2025, 9, 7))
+        with open(archive.manifest_path, "a") as f:
+            f.write('{"timestamp": "2025-09-08T00:')  # crashed mid-append
+
+        assert len(archive.manifest()) == 1
+        assert len(archive.latest_items()) == 2
+
+    def test_save_data_archives_by_default(self, tmp_path):
+        archive = SnapshotArchive(str(tmp_path), compression="gzip")
+        entry = save_data({"items": raw_items()}, archive=archive)
+        assert entry["rows"] == len(raw_items())
+        assert not list(tmp_path.glob("*.json"))
+
+    def test_raw_dumps_join_a_populated_catalog(self, tmp_path, monkeypatch):
+        items = raw_items()
+        archive = SnapshotArchive(str(tmp_path / "snapshots"), compression="gzip")
+        archive.write(items[:2], datetime(2025, 9, 7))
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "data").mkdir()
+
+        entry = save_data({"items": items}, snapshot_format="raw", archive=archive)
+        assert archive.latest() == entry
+        assert len(archive.latest_items()) == len(items)
+
+    def test_predictor_loads_latest_archive(self, tmp_path):
+        archive = SnapshotArchive(str(tmp_path / "snapshots"), compression="gzip")
+        archive.write(raw_items()[:5])
+        df = GitHubPredictor(str(tmp_path)).load_historical_data()
+        assert len(df) == 5
+        assert "growth_rate" in df.columns
+
+
+class TestSnapshotCatalog:
+    """Test catalog queries, checksums and the raw-dump import"""
+
+    def test_latest_and_range_queries(self, tmp_path):
+        archive = SnapshotArchive(str(tmp_path), compression="gzip")
+        for day in (7, 8, 9):
+            archive.write(raw_items()[:day], datetime(2025, 9, day, 6))
+
+        assert archive.latest()["rows"] == 9
+        assert [e["rows"] for e in archive.between("2025-09-08")] == [8, 9]
+        assert [e["rows"] for e in archive.between(end="2025-09-08")] == [7, 8]
+        assert [
+            e["rows"] for e in archive.between(datetime(2025, 9, 8), "2025-09-08")
+        ] == [8]
+
+    def test_checksum_detects_corruption(self, tmp_path):
+        archive = SnapshotArchive(str(tmp_path), compression="gzip")
+        entry = archive.write(raw_items()[:3])
+        assert archive.verify(entry)
+
+        with open(tmp_path / entry["path"], "ab") as f:
+            f.write(b"junk")
+        assert not archive.verify(entry)
+
+    def test_raw_dumps_are_imported_once(self, tmp_path):
+        shutil.copy(SNAPSHOT, tmp_path)
+        archive = SnapshotArchive(str(tmp_path / "snapshots"), compression="gzip")
+
+        imported = archive.import_legacy(str(tmp_path))
+        assert [e["timestamp"] for e in imported] == ["2025-09-07T12:42:43"]
+        assert archive.import_legacy(str(tmp_path)) == []
+        assert len(archive.manifest()) == 1
+
+    def test_predictor_streams_longitudinal_range(self, tmp_path):
+        predictor = GitHubPredictor(str(tmp_path))
+        for day in (7, 8, 9):
+            predictor.snapshots.write(raw_items()[:4], datetime(2025, 9, day))
+
+        df = predictor.load_historical_data(start="2025-09-08")
+        assert len(df) == 8
+        assert sorted(df["snapshot"].unique()) == [
+            "2025-09-08T00:00:00",
+            "2025-09-09T00:00:00",
+        ]
+        assert "growth_rate" in df.columns
@@ -0,0 +1,140 @@
+"""
+Tests for the columnar repo x day star matrix
+"""
+
+import json
+
+import numpy as np
+
+import scripts.timeseries_store as timeseries_store
+from scripts.history_store import HistoryLog
+from scripts.timeseries_store import StarMatrix
+
+
+class TestStarMatrix:
+    """Test columnar storage, masks and incremental appends"""
+
+    def test_missing_days_are_masked(self, tmp_path, make_entry):
+        matrix = StarMatrix(str(tmp_path))
+        matrix.rebuild(
+            [
+                make_entry("2025-09-01", a=10, b=5),
+                make_entry("2025-09-02", a=12),
+                make_entry("2025-09-03", a=15, b=9),
+            ]
+        )
+
+        dates, series = matrix.series(["a", "b"])
+        assert dates == ["2025-09-01", "2025-09-02", "2025-09-03"]
+        assert series["a"].tolist() == [10, 12, 15]
+        assert series["b"][0] == 5 and np.isnan(series["b"][1])
+        assert matrix.mask.tolist() == [[True, True, True], [True, False, True]]
+
+    def test_arrays_are_memory_mapped(self, tmp_path, make_entry):
+        StarMatrix(str(tmp_path)).rebuild([make_entry("2025-09-01", a=1)])
+
+        reader = StarMatrix(str(tmp_path))
+        assert isinstance(reader.stars.base, np.memmap)
+
+    def test_same_named_repos_stay_apart(self, tmp_path):
+        def repo(key, stars, **extra):
+            return {"name": key.split("/")[1], "stars": stars, **extra}
+
+        matrix = StarMatrix(str(tmp_path))
+        matrix.rebuild(
+            [
+                # Recorded before full_name was stored: keyed via the URL
+                {
+                    "date": "2025-09-01",
+                    "repositories": [
+                        repo("x/app", 10, url="https://github.com/x/app"),
+                        repo("y/app", 20, url="https://github.com/y/app"),
+                    ],
+                },
+                {
+                    "date": "2025-09-02",
+                    "repositories": [
+                        repo("x/app", 11, full_name="x/app"),
+                        repo("y/app", 25, full_name="y/app"),
+                    ],
+                },
+            ]
+        )
+        assert matrix.repos == ["x/app", "y/app"]
+        assert matrix.deltas(1) == {"x/app": 1, "y/app": 5}
+
+    def test_sync_rebuilds_an_index_keyed_on_short_names(self, tmp_path, make_entry):
+        log = HistoryLog(str(tmp_path / "h.jsonl"), str(tmp_path / "h.json"))
+        entry = make_entry("2025-09-01", a=1)
+        entry["repositories"][0]["full_name"] = "o/a"
+        log.append(entry)
+
+        matrix = StarMatrix(str(tmp_path / "ts"))
+        matrix.rebuild([make_entry("2025-09-01", a=1)])
+        with open(matrix.index_path, "w") as f:
+            json.dump({"repos": ["a"], "dates": ["2025-09-01"]}, f)
+
+        assert matrix.sync(log)
+        assert matrix.repos == ["o/a"] and not matrix.sync(log)
+
+    def test_writers_use_unique_temp_files(self, tmp_path, make_entry):
+        # A stale temp file of the old fixed name must not be picked up
+        (tmp_path / "stars.npy.tmp.npy").write_bytes(b"torn")
+        matrix = StarMatrix(str(tmp_path))
+        matrix.rebuild([make_entry("2025-09-01", a=1)])
+        matrix.append_snapshot(make_entry("2025-09-02", a=2, b=3))
+
+        assert StarMatrix(str(tmp_path)).series(["a"])[1]["a"].tolist() == [1, 2]
+        leftovers = {p.name for p in tmp_path.iterdir()} - {"stars.npy.tmp.npy"}
+        assert leftovers == {"stars.npy", "mask.npy", "index.json"}
+
+    def test_append_matches_rebuild_across_growth(
+        self, tmp_path, monkeypatch, make_entry
+    ):
+        monkeypatch.setattr(timeseries_store, "INITIAL_REPO_CAPACITY", 2)
+        monkeypatch.setattr(timeseries_store, "INITIAL_DAY_CAPACITY", 2)
+        entries = [
+            make_entry("2025-09-01", a=1, b=2),
+            make_entry("2025-09-02", b=3, c=4),
+            make_entry("2025-09-03", a=5, c=6, d=7),
+            make_entry("2025-09-03", a=6, c=6, d=8),
+        ]
+
+        appended = StarMatrix(str(tmp_path / "appended"))
+        for entry in entries:
+            appended.append_snapshot(entry)
+        rebuilt = StarMatrix(str(tmp_path / "rebuilt"))
+        rebuilt.rebuild(entries)
+
+        assert (
+            appended.dates
+            == rebuilt.dates
+            == [
+                "2025-09-01",
+                "2025-09-02",
+                "2025-09-03",
+            ]
+        )
+        assert appended.repos == rebuilt.repos
+        assert np.array_equal(appended.stars, rebuilt.stars)
+        assert np.array_equal(appended.mask, rebuilt.mask)
+        assert appended.stars[0, 2] == 6
+
+    def test_deltas_only_for_repos_present_in_both_days(self, tmp_path, make_entry):
+        matrix = StarMatrix(str(tmp_path))
+        matrix.rebuild(
+            [make_entry("2025-09-01", a=10, b=5), make_entry("2025-09-02", a=14, c=1)]
+        )
+
+        assert matrix.deltas(1) == {"a": 4}
+        assert matrix.deltas(5) == {}
+
+    def test_sync_from_history_log(self, tmp_path, make_entry):
+        log = HistoryLog(str(tmp_path / "h.jsonl"), str(tmp_path / "h.json"))
+        log.append(make_entry("2025-09-01", a=1))
+        log.append(make_entry("2025-09-02", a=3))
+
+        matrix = StarMatrix(str(tmp_path / "ts"))
+        assert matrix.sync(log) is True
+        assert matrix.sync(log) is False
+        assert matrix.dates == ["2025-09-01", "2025-09-02"]
@@ -0,0 +1,33 @@
+"""
+Tests for the web server launcher options
+"""
+
+import os
+
+import web_server
+
+
+class TestWebServer:
+    """Test mode selection and production tuning"""
+
+    def test_dev_is_default(self):
+        args = web_server.parse_args([])
+        assert args.mode == "dev"
+        assert args.workers == (os.cpu_count() or 1)
+
+    def test_production_options(self, monkeypatch):
+        args = web_server.parse_args(
+            ["--mode", "production", "--keep-alive", "10", "--backlog", "512"]
+        )
+        monkeypatch.setattr(web_server.importlib.util, "find_spec", lambda name: None)
+        options = web_server.server_options(args)
+        assert options["loop"] == "asyncio" and options["http"] == "h11"
+        assert options["timeout_keep_alive"] == 10
+        assert options["backlog"] == 512
+
+    def test_shared_socket_is_inheritable(self):
+        sock = web_server.bind_socket("127.0.0.1", 0, 16)
+        try:
+            assert sock.get_inheritable()
+        finally:
+            sock.close()
@@ -1,28 +1,48 @@
 #!/usr/bin/env python3
 """
 StellarNexus Web Server Launcher
-Starts the FastAPI web application with auto-reload
+Starts the FastAPI web application with auto-reload (dev) or as a
+pre-forked multi-worker server (production)
 """
 
+import argparse
+import importlib.util
 import os
+import signal
+import socket
 import sys
 import subprocess
+import time
 from pathlib import Path
 
+# Production tuning
+DEFAULT_BACKLOG = 2048
+DEFAULT_KEEP_ALIVE = 5
 
-def main():
-    """Launch the FastAPI web server"""
-    # Add the api directory to Python path
-    api_dir = Path(__file__).parent / "api"
-    sys.path.insert(0, str(api_dir))
 
-    # Change to the project root directory
-    project_root = Path(__file__).parent
-    os.chdir(project_root)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Launch the StellarNexus server")
+    parser.add_argument("--mode", choices=["dev", "production"], default="dev")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="production worker processes (default: CPU count)",
+    )
+    parser.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG)
+    parser.add_argument(
+        "--keep-alive",
+        type=int,
+        default=DEFAULT_KEEP_ALIVE,
+        help="seconds an idle keep-alive connection stays open",
+    )
+    return parser.parse_args(argv)
 
-    print("🚀 Starting StellarNexus Web Server...")
-    print("📊 Dashboard will be available at: http://localhost:8000")
-    print("📚 API documentation at: http://localhost:8000/docs")
+
+def run_dev(args):
+    """Single uvicorn process with auto-reload"""
     print("🔄 Press Ctrl+C to stop the server")
 
     # Launch uvicorn with auto-reload
@@ -32,9 +52,9 @@ def main():
         "uvicorn",
         "api.main:app",
         "--host",
-        "0.0.0.0",
+        args.host,
         "--port",
-        "8000",
+        str(args.port),
         "--reload",
         "--log-level",
         "info",
@@ -49,5 +69,143 @@ def main():
         sys.exit(1)
 
 
+def server_options(args) -> dict:
+    """uvicorn settings for production, preferring uvloop/httptools"""
+    has = lambda module: importlib.util.find_spec(module) is not None  # noqa: E731
+    return {
+        "loop": "uvloop" if has("uvloop") else "asyncio",
+        "http": "httptools" if has("httptools") else "h11",
+        "timeout_keep_alive": args.keep_alive,
+        "backlog": args.backlog,
+        "log_level": "info",
+        "access_log": False,
+    }
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Listening socket created once in the parent and shared by every worker"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve_worker(app, sock: socket.socket, options: dict):
+    """Worker body: serve the preloaded app on the inherited socket"""
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    server = uvicorn.Server(uvicorn.Config(app, **options))
+    server.run(sockets=[sock])
+
+
+def run_production(args):
+    """Preload the app and shared data, then fork ``args.workers`` workers.
+
+    The API module, active model and snapshot index are loaded in the parent
+    before forking, so workers start warm and share those pages
+    copy-on-write. The preload starts no threads: job pools and executors
+    are created on first use, after the fork. Job status lives in the shared
+    cache (Redis, else ``data/shared``) so any worker can answer for any
+    job. The parent only supervises: it restarts workers that die and stops
+    them all on SIGINT/SIGTERM.
+    """
+    options = server_options(args)
+    print(
+        f"⚙️  Production mode: {args.workers} workers, "
+        f"loop={options['loop']}, http={options['http']}"
+    )
+
+    if not os.getenv("REDIS_URL"):
+        os.environ.setdefault("SHARED_CACHE_DIR", "data/shared")
+    from api.main import app, warm_up
+
+    if not hasattr(os, "fork"):
+        # No fork (Windows): uvicorn's spawn-based workers warm up themselves
+        import uvicorn
+
+        os.environ.setdefault("API_WARMUP", "1")
+        uvicorn.run(
+            "api.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            **options,
+        )
+        return
+
+    warm_up()
+    sock = bind_socket(args.host, args.port, args.backlog)
+    workers = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                serve_worker(app, sock, options)
+            finally:
+                os._exit(0)
+        workers.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(args.workers):
+        spawn()
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"⚠️  Worker {pid} exited ({status}); restarting")
+            time.sleep(1)  # don't spin if workers crash on startup
+            spawn()
+
+    sock.close()
+    print("\n👋 Server stopped")
+
+
+def main(argv=None):
+    """Launch the FastAPI web server"""
+    args = parse_args(argv)
+
+    # Add the api directory to Python path
+    api_dir = Path(__file__).parent / "api"
+    sys.path.insert(0, str(api_dir))
+
+    # Change to the project root directory
+    project_root = Path(__file__).parent
+    os.chdir(project_root)
+    sys.path.insert(0, str(project_root))
+
+    print("🚀 Starting StellarNexus Web Server...")
+    print(f"📊 Dashboard will be available at: http://localhost:{args.port}")
+    print(f"📚 API documentation at: http://localhost:{args.port}/docs")
+
+    if args.mode == "production":
+        run_production(args)
+    else:
+        run_dev(args)
+
+
 if __name__ == "__main__":
     main()